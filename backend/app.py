@@ -2,18 +2,40 @@
 Application principale EcoMarché pour la réduction du gaspillage alimentaire
 """
 import os
-from flask import Flask, jsonify, render_template, request, send_from_directory
+from flask import Flask, jsonify, render_template, request
 from flask_cors import CORS
-from flask_migrate import Migrate
+from flask_migrate import Migrate, upgrade
 from flask_restful import Api
 
-from config.constant import CORS_ORIGINS, APP_NAME, APP_VERSION, APP_DESCRIPTION
-from config.db import db
-from model.ecomarche_db import Produit, generer_donnees_test
+from config.constant import (
+    CORS_ORIGINS, APP_NAME, APP_VERSION, APP_DESCRIPTION, APP_DEBUG, DATABASE_URL,
+    RISK_BATCHING_ENABLED, RISK_BATCH_MAX_SIZE, RISK_BATCH_MAX_WAIT_MS, RISK_BATCH_MAX_QUEUE,
+    PROMOTION_SCHEDULER_ENABLED, PROMOTION_SCHEDULER_INTERVAL_SECONDS, SALES_STORAGE, SALES_CSV_PATH,
+    FRONTEND_DIST
+)
+from config.db import db, init_db
+from config.json_provider import init_json, shaped
+from config.metrics import init_metrics, metrics, timed
+from config.profiling import init_profiling
+from config.conditional import init_conditional_get
+from model.ecomarche_db import Produit, generer_donnees_test, check_promotion_consistency
 from model.pricing_model import pricing_model
+from model.prediction_model import demand_model
 from resources.produits import ProduitsApi
 from resources.risques import RisquesApi, predict_for_product
-import pandas as pd
+from model.ml_model import RiskModel
+from model.feature_store import FeatureStore, file_version
+from model.batching import MicroBatcher
+from model.promotion_scheduler import PromotionScheduler
+from model.product_cache import product_cache
+from helpers.static_assets import StaticManifest
+from helpers.sales import (
+    SALES_STORAGE_DATABASE, SqlSalesStore, compact_sales_frame, create_sales_store, get_sales_store, load_sales_table,
+    read_sales_file,
+    summary_payload, top_products_payload, kpi_overview_payload, seasonality_payload,
+    popular_by_season_payload, by_age_groups_payload, dashboard_sales_payload, DASHBOARD_SALES_PANELS
+)
+from datetime import date
 import joblib
 import math
 from flask import current_app
@@ -21,16 +43,30 @@ from flask import current_app
 # Initialisation de l'application Flask
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
-app.config['DEBUG'] = True
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///ecomarche.db'
+app.config['DEBUG'] = APP_DEBUG
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Initialisation de l'API
 api = Api(app)
 
-# Initialisation de la base de données
-db.init_app(app)
-migrate = Migrate(app, db)
+# Encodage JSON des réponses (orjson si disponible, forme colonnes avec ?shape=columns)
+init_json(app, api)
+
+# Initialisation de la base de données (DATABASE_URL, pool, PRAGMA SQLite)
+init_db(app, DATABASE_URL)
+migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(__file__), 'migrations'))
+
+# Métriques Prometheus sur /metrics (METRICS_ENABLED=1) : latence, requêtes SQL, sections pandas / modèles
+init_metrics(app)
+metrics.gauge('product_cache_entries', 'Serialized products held by the product cache',
+              lambda: product_cache.stats()['size'])
+metrics.gauge('product_cache_hit_rate', 'Product cache hit rate since start', lambda: product_cache.stats()['hit_rate'])
+
+# Profilage d'une requête à la demande (X-Profile: <PROFILING_TOKEN>), piles repliées pour flame graph
+init_profiling(app)
+
+# ETag / Last-Modified sur les endpoints de lecture, 304 sans recalcul si les données n'ont pas changé
+init_conditional_get(app)
 
 # Configuration CORS
 CORS(app, resources={r"/api/*": {"origins": CORS_ORIGINS}})
@@ -49,15 +85,11 @@ api.add_resource(RisquesApi, '/api/risques/<string:route>', endpoint='risques_re
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_frontend(path):
-    frontend_path = '../ecomarche-frontend/dist/ecomarche-frontend'
-    
-    if os.path.exists(frontend_path):
-        # Si le fichier existe, le servir
-        if path != "" and os.path.exists(os.path.join(frontend_path, path)):
-            return send_from_directory(frontend_path, path)
-        else:
-            # Sinon servir index.html (routing Angular)
-            return send_from_directory(frontend_path, 'index.html')
+    # Fichiers du build Angular depuis le manifeste en mémoire (index.html pour le routing Angular)
+    manifest = getattr(app, 'static_assets', None)
+    response = manifest.response(path, request) if manifest is not None else None
+    if response is not None:
+        return response
     else:
         # Si pas de frontend, page d'accueil simple
         return '''
@@ -72,6 +104,7 @@ def serve_frontend(path):
                     <li><a href="/api/kpi/overview">/api/kpi/overview</a> - KPIs globaux</li>
                     <li><a href="/api/kpi/waste_recommendations">/api/kpi/waste_recommendations</a> - Recommandations</li>
                     <li><a href="/api/sales/summary">/api/sales/summary</a> - Ventes</li>
+                    <li><a href="/api/dashboard/snapshot">/api/dashboard/snapshot</a> - Dashboard complet</li>
                 </ul>
                 <p><em>Frontend Angular non disponible - mode API uniquement</em></p>
             </body>
@@ -102,20 +135,61 @@ def initialize_database():
     Initialise la base de données et génère des données de test
     """
     with app.app_context():
+        # Schema: pending Alembic migrations (safe on bases created by create_all), then any missing table
+        try:
+            upgrade()
+        except Exception as e:
+            print(f"Database migrations not applied: {e}")
         db.create_all()
         if Produit.query.count() == 0:
             generer_donnees_test()
+            product_cache.invalidate_all()
+        # Repair drift between produits.promotion_* and the promotions table
+        try:
+            drift = check_promotion_consistency(repair=True)
+            if drift:
+                product_cache.invalidate_all()
+                print(f"Promotion columns repaired for {len(drift)} product(s)")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Promotion consistency check failed: {e}")
         # Load sales dataset for visualization if available
-        sales_csv = os.path.join(os.path.dirname(__file__), 'asstes', 'data', 'supermarche_historique_ventes.csv')
+        sales_csv = SALES_CSV_PATH
+        current_app.sales_df = None
+        if SALES_STORAGE == SALES_STORAGE_DATABASE:
+            # history in the `ventes` fact table: loaded once, aggregated in SQL, no per-worker copy
+            try:
+                if SqlSalesStore().row_count() == 0 and os.path.exists(sales_csv):
+                    print(f"Sales table loaded from {sales_csv} (rows={load_sales_table(sales_csv)})")
+            except Exception as e:
+                print(f"Sales table not loaded: {e}")
+        else:
+            try:
+                # categorical text columns: the arrays stay shared between forked workers
+                current_app.sales_df = compact_sales_frame(read_sales_file(sales_csv))
+                print(f"Sales data loaded from {sales_csv} (rows={len(current_app.sales_df)})")
+            except Exception as e:
+                print(f"Sales data not loaded: {e}")
+        # version of the in-memory dataset (ETag of the sales endpoints); the ventes table has its own counter
+        current_app.sales_version = file_version(sales_csv) if current_app.sales_df is not None else None
         try:
-            current_app.sales_df = pd.read_csv(sales_csv, parse_dates=['Date'])
-            print(f"Sales data loaded from {sales_csv} (rows={len(current_app.sales_df)})")
+            current_app.sales_store = create_sales_store(SALES_STORAGE, current_app.sales_df)
+        except Exception as e:
+            current_app.sales_store = None
+            print(f"Sales store not available: {e}")
+        # Per-product model features, read from (or rebuilt into) the on-disk feature store
+        try:
+            if SALES_STORAGE == SALES_STORAGE_DATABASE:
+                # built from the ventes table (streamed), keyed by its version: the CSV is not read
+                current_app.feature_store = FeatureStore.load_or_build_from_table(db.session)
+            else:
+                current_app.feature_store = FeatureStore.load_or_build(sales_csv, current_app.sales_df) \
+                    if current_app.sales_df is not None or os.path.exists(sales_csv) else None
         except Exception as e:
-            current_app.sales_df = None
-            print(f"Sales data not loaded: {e}")
+            current_app.feature_store = None
+            print(f"Feature store not loaded: {e}")
         # Load ML model (defensive). Path can be overridden with ML_MODEL_PATH env var
         try:
-            from model.ml_model import RiskModel
             model_env = os.environ.get('ML_MODEL_PATH')
             default_model = os.path.join(os.path.dirname(__file__), 'model', 'saved_models', 'waste_predictor.joblib')
             model_path = model_env if model_env is not None else default_model
@@ -127,113 +201,69 @@ def initialize_database():
         except Exception as e:
             current_app.risk_model = None
             print(f"Failed to initialize risk model: {e}")
+        # Coalesce concurrent per-product predictions into batched model calls
+        current_app.risk_batcher = None
+        if RISK_BATCHING_ENABLED and current_app.risk_model is not None and current_app.risk_model.is_loaded():
+            current_app.risk_batcher = MicroBatcher(
+                current_app.risk_model.predict_proba,
+                max_batch=RISK_BATCH_MAX_SIZE,
+                max_wait_ms=RISK_BATCH_MAX_WAIT_MS,
+                max_queue=RISK_BATCH_MAX_QUEUE
+            )
+    # Frontend build: manifest, compressed variants and ETags computed once (shared by forked workers)
+    app.static_assets = StaticManifest.build(FRONTEND_DIST)
+    if app.static_assets is not None:
+        print(f"Frontend assets loaded from {app.static_assets.root} ({len(app.static_assets.assets)} files)")
+    # Promotion lifecycle: one pass now, then periodically in the background
+    app.promotion_scheduler = PromotionScheduler(app, PROMOTION_SCHEDULER_INTERVAL_SECONDS)
+    app.promotion_scheduler.run_once()
+    if PROMOTION_SCHEDULER_ENABLED:
+        app.promotion_scheduler.start()
 
 
 @app.route('/api/sales/summary')
 def sales_summary():
     """Return a simple time series summary (daily total sales) for visualization."""
-    df = getattr(current_app, 'sales_df', None)
-    if df is None:
+    store = get_sales_store()
+    if store is None:
         return jsonify({'error': 'Sales dataset not available'}), 404
-    daily = df.groupby(df['Date'].dt.date)['Daily_Sales'].sum().reset_index()
-    # return last 90 days
-    daily = daily.tail(90)
-    return jsonify({ 'daily': daily.to_dict(orient='records') })
+    return jsonify(shaped(summary_payload(store)))
 
 
 @app.route('/api/sales/top_products')
 def sales_top_products():
     """Return top N products by total sales for simple visualization."""
-    df = getattr(current_app, 'sales_df', None)
-    if df is None:
+    store = get_sales_store()
+    if store is None:
         return jsonify({'error': 'Sales dataset not available'}), 404
-    top = df.groupby('Product_Name')['Daily_Sales'].sum().reset_index().sort_values('Daily_Sales', ascending=False).head(10)
-    return jsonify({ 'top_products': top.to_dict(orient='records') })
+    return jsonify(shaped(top_products_payload(store)))
 
 
 @app.route('/api/kpi/overview')
 def kpi_overview():
     """Return key KPIs useful for decision-making: total revenue, avg daily sales, top categories."""
-    df = getattr(current_app, 'sales_df', None)
-    if df is None:
+    store = get_sales_store()
+    if store is None:
         return jsonify({'error': 'Sales dataset not available'}), 404
-
-    # Ensure numeric
-    df['Daily_Sales'] = pd.to_numeric(df['Daily_Sales'], errors='coerce').fillna(0)
-    df['Unit_Price'] = pd.to_numeric(df['Unit_Price'], errors='coerce').fillna(0)
-
-    # Total revenue (approx): sum(unit_price * daily_sales)
-    df['Revenue'] = df['Unit_Price'] * df['Daily_Sales']
-    total_revenue = float(df['Revenue'].sum())
-
-    # Average daily sales (overall)
-    daily = df.groupby(df['Date'].dt.date)['Daily_Sales'].sum().reset_index()
-    avg_daily_sales = float(daily['Daily_Sales'].mean()) if len(daily) > 0 else 0.0
-
-    # Top categories by sales
-    if 'Category' in df.columns:
-        top_categories = df.groupby('Category')['Daily_Sales'].sum().reset_index().sort_values('Daily_Sales', ascending=False).head(5)
-        top_categories_records = top_categories.to_dict(orient='records')
-    else:
-        top_categories_records = []
-
-    # Monthly series (last 12 months)
-    df['YearMonth'] = df['Date'].dt.to_period('M').dt.to_timestamp()
-    monthly = df.groupby('YearMonth')['Daily_Sales'].sum().reset_index().sort_values('YearMonth')
-    monthly_series = monthly.tail(12).to_dict(orient='records')
-
-    return jsonify({
-        'total_revenue': total_revenue,
-        'avg_daily_sales': avg_daily_sales,
-        'top_categories': top_categories_records,
-        'monthly_series': monthly_series
-    })
+    return jsonify(shaped(kpi_overview_payload(store)))
 
 
 @app.route('/api/sales/seasonality')
 def sales_seasonality():
     """Return seasonality breakdown by month and by category for visualization."""
-    df = getattr(current_app, 'sales_df', None)
-    if df is None:
+    store = get_sales_store()
+    if store is None:
         return jsonify({'error': 'Sales dataset not available'}), 404
-
-    df['Month'] = df['Date'].dt.month
-    seasonality = df.groupby('Month')['Daily_Sales'].sum().reset_index().sort_values('Month')
-
-    # optionally breakdown by top categories
-    category_season = None
-    if 'Category' in df.columns:
-        top_cats = df.groupby('Category')['Daily_Sales'].sum().reset_index().sort_values('Daily_Sales', ascending=False).head(5)['Category'].tolist()
-        cat_breakdown = df[df['Category'].isin(top_cats)].groupby(['Month','Category'])['Daily_Sales'].sum().reset_index()
-        category_season = cat_breakdown.to_dict(orient='records')
-
-    return jsonify({'seasonality_by_month': seasonality.to_dict(orient='records'), 'category_season': category_season})
+    return jsonify(shaped(seasonality_payload(store)))
 
 
 @app.route('/api/sales/popular_by_season')
 def sales_popular_by_season():
     """Return top products per season (DJF, MAM, JJA, SON)."""
-    df = getattr(current_app, 'sales_df', None)
-    if df is None:
+    store = get_sales_store()
+    if store is None:
         return jsonify({'error': 'Sales dataset not available'}), 404
-
-    # define seasons by month
-    def month_to_season(m):
-        if m in [12,1,2]: return 'DJF'
-        if m in [3,4,5]: return 'MAM'
-        if m in [6,7,8]: return 'JJA'
-        return 'SON'
-
-    df['Month'] = df['Date'].dt.month
-    df['Season'] = df['Month'].apply(month_to_season)
-
-    grouped = df.groupby(['Season','Product_Name'])['Daily_Sales'].sum().reset_index()
-    result = {}
-    for season in ['DJF','MAM','JJA','SON']:
-        top = grouped[grouped['Season']==season].sort_values('Daily_Sales', ascending=False).head(10)
-        result[season] = top.to_dict(orient='records')
-
-    return jsonify({'popular_by_season': result})
+    return jsonify(shaped(popular_by_season_payload(store)))
 
 
 @app.route('/api/sales/by_age_groups')
@@ -243,47 +273,10 @@ def sales_by_age_groups():
     If the sales dataset contains user demographic columns, they should be used. Otherwise
     a simple deterministic split is returned to allow the dashboard to present age-based KPIs.
     """
-    df = getattr(current_app, 'sales_df', None)
-    if df is None:
+    store = get_sales_store()
+    if store is None:
         return jsonify({'error': 'Sales dataset not available'}), 404
-
-    # Check for real demographic columns
-    age_col = None
-    for candidate in ['Age','User_Age','Customer_Age']:
-        if candidate in df.columns:
-            age_col = candidate
-            break
-
-    # Define age buckets
-    age_buckets = ['18-25','26-45','46-65','65+']
-
-    if age_col:
-        df['age_bucket'] = pd.cut(df[age_col], bins=[0,25,45,65,200], labels=age_buckets, right=True)
-        agg = df.groupby('age_bucket')['Daily_Sales'].sum().reset_index()
-        overall = agg.to_dict(orient='records')
-    else:
-        # synthetic distribution: percentages
-        total_sales = float(pd.to_numeric(df['Daily_Sales'], errors='coerce').fillna(0).sum())
-        # deterministic distribution
-        shares = [0.20, 0.45, 0.25, 0.10]
-        overall = []
-        for bucket, share in zip(age_buckets, shares):
-            overall.append({'age_bucket': bucket, 'Daily_Sales': total_sales * share})
-
-    # also provide top products with age split (synthetic)
-    top_products = df.groupby('Product_Name')['Daily_Sales'].sum().reset_index().sort_values('Daily_Sales', ascending=False).head(10)
-    top_products_list = []
-    for _, row in top_products.iterrows():
-        prod = row['Product_Name']
-        sales = float(row['Daily_Sales'])
-        # distribute sales across age groups proportionally but deterministic using hash
-        h = abs(hash(prod))
-        # create slight variation
-        weights = [0.2 + ((h % 10) / 100.0), 0.45 - ((h % 7)/100.0), 0.25 + ((h % 5)/100.0), 0.10]
-        svals = [sales * w / sum(weights) for w in weights]
-        top_products_list.append({'product': prod, 'total_sales': sales, 'by_age': [{'age_bucket': b, 'sales': s} for b,s in zip(age_buckets, svals)]})
-
-    return jsonify({'overall_by_age': overall, 'top_products_by_age': top_products_list})
+    return jsonify(shaped(by_age_groups_payload(store)))
 
 
 @app.route('/api/kpi/waste_recommendations')
@@ -297,23 +290,38 @@ def waste_recommendations():
 
     Returns top recommendations with a suggested action and discount.
     """
-    df = getattr(current_app, 'sales_df', None)
+    return jsonify(shaped(waste_recommendations_payload(get_sales_store(), Produit.query.all())))
 
+
+def waste_recommendations_payload(sales_store, produits):
+    """Top 20 waste recommendations for `produits` (sales statistics from `sales_store`, or None)."""
     # compute some global stats from sales data when available
-    if df is not None:
-        df['Daily_Sales'] = pd.to_numeric(df['Daily_Sales'], errors='coerce').fillna(0)
-        overall_daily = df.groupby(df['Date'].dt.date)['Daily_Sales'].sum().reset_index()
-        overall_avg_daily = float(overall_daily['Daily_Sales'].mean()) if len(overall_daily) > 0 else 0.0
-        # median unit price as a simple benchmark
-        median_price = float(pd.to_numeric(df['Unit_Price'], errors='coerce').median()) if 'Unit_Price' in df.columns else 0.0
+    if sales_store is not None:
+        with timed('sales.waste_stats'):
+            overall_avg_daily = sales_store.avg_daily_sales()
+            # median unit price as a simple benchmark
+            median_price = sales_store.median_unit_price()
+            # average daily sales of every product, in one aggregation
+            product_avg = sales_store.product_daily_avg()
     else:
         overall_avg_daily = 0.0
         median_price = 0.0
+        product_avg = {}
 
-    produits = Produit.query.all()
     recommendations = []
     eps = 1e-6
 
+    # expected 7-day demand for every product, forecast in a single batch
+    try:
+        forecast, _ = demand_model.forecast_matrix(
+            [p.categorie_id or 0 for p in produits],
+            [p.prix_unitaire for p in produits],  # None -> DEFAULT_PRICE, as in /api/produits/predict
+            days=7
+        )
+        expected_demand = forecast.sum(axis=1)
+    except Exception:
+        expected_demand = None
+
     def format_action_for_discount(discount):
         try:
             d = float(discount)
@@ -333,17 +341,12 @@ def waste_recommendations():
             return f'Petite promotion ({int(d)}%)'
         return f'Remise {int(d)}% ({int(d)}%)'
 
-    for p in produits:
+    for idx, p in enumerate(produits):
         prod_name = p.nom
 
         # estimate recent average daily sales for this product
-        if df is not None and 'Product_Name' in df.columns:
-            prod_df = df[df['Product_Name'] == prod_name]
-            if len(prod_df) > 0:
-                prod_daily = prod_df.groupby(prod_df['Date'].dt.date)['Daily_Sales'].sum().reset_index()
-                prod_avg = float(prod_daily['Daily_Sales'].mean()) if len(prod_daily) > 0 else 0.0
-            else:
-                prod_avg = max(0.0, overall_avg_daily * 0.1)
+        if prod_name in product_avg:
+            prod_avg = product_avg[prod_name]
         else:
             prod_avg = max(0.0, overall_avg_daily * 0.1)
 
@@ -357,8 +360,12 @@ def waste_recommendations():
         else:
             expiry_score = max(0.0, (30.0 - float(jr)) / 30.0) if jr < 30 else 0.0
 
-        # stock score: ratio of stock to expected 7-day demand
-        stock_ratio = float(p.stock) / (prod_avg * 7.0 + eps)
+        # stock score: ratio of stock to expected 7-day demand (forecast, else historical average)
+        if expected_demand is not None:
+            demand_7d = float(expected_demand[idx])
+        else:
+            demand_7d = prod_avg * 7.0
+        stock_ratio = float(p.stock) / (demand_7d + eps)
         stock_score = min(1.0, stock_ratio)
 
         # price score: penalize high price combined with low velocity
@@ -379,23 +386,13 @@ def waste_recommendations():
         # If a trained model is present, compute predicted risk probability and blend with heuristic
         model_prob = None
         try:
-            model = getattr(current_app, 'waste_model', None)
-            if model is not None:
-                # Prepare the features expected by the minimal training script
-                # Features: avg_daily_sales (approx prod_avg), price_rel (unit_price / median_price), sales_cv, days_present
-                avg_daily_sales = prod_avg
-                median_price = float(pd.to_numeric(df['Unit_Price'], errors='coerce').median()) if df is not None and 'Unit_Price' in df.columns else 1.0
-                price_rel = unit_price / (median_price + 1e-6)
-                sales_std = float(prod_df['Daily_Sales'].std()) if (df is not None and 'Product_Name' in df.columns and len(prod_df)>0) else 0.0
-                sales_cv = sales_std / (avg_daily_sales + 1e-6)
-                days_present = float(prod_df['Date'].nunique()) if (df is not None and 'Product_Name' in df.columns and len(prod_df)>0) else 0.0
-                feat = [[avg_daily_sales, price_rel, sales_cv, days_present]]
-                prob = None
-                try:
-                    prob = float(model.predict_proba(feat)[0][1]) if hasattr(model, 'predict_proba') else float(model.predict(feat)[0])
-                except Exception:
-                    # fallback if model expects other features
-                    prob = None
+            model = getattr(current_app, 'risk_model', None)
+            if model is not None and model.is_loaded():
+                # Features come from the shared feature store (same definitions as training)
+                store = getattr(current_app, 'feature_store', None)
+                feat = RiskModel.build_features_for_product(p, getattr(current_app, 'sales_df', None), store)
+                proba = model.predict_proba_cached([feat], data_version=store.dataset_hash if store is not None else None)
+                prob = proba[0] if proba is not None else None
                 if prob is not None and (not math.isnan(prob)):
                     model_prob = max(0.0, min(1.0, prob))
         except Exception as e:
@@ -456,6 +453,7 @@ def waste_recommendations():
             'jours_restants': jr,
             'expiry_score': round(expiry_score, 3),
             'stock_score': round(stock_score, 3),
+            'forecast_demand_7d': round(demand_7d, 1),
             'price_score': round(price_score, 3),
             # Provide both heuristic and (if available) model probability
             'risk_score': round(heuristic_risk, 3),
@@ -468,20 +466,51 @@ def waste_recommendations():
         })
 
     recommendations_sorted = sorted(recommendations, key=lambda x: x['risk_score'], reverse=True)
-    return jsonify({'recommendations': recommendations_sorted[:20]})
+    return {'recommendations': recommendations_sorted[:20]}
+
+
+@app.route('/api/dashboard/snapshot')
+def dashboard_snapshot():
+    """Every panel of the dashboard in one response.
+
+    One product query and one pass over the sales history (`store.rollup()`), shared
+    by all panels; each panel is identical to the response of its own endpoint
+    (sales panels are null when the sales dataset is not available).
+    """
+    produits = Produit.query.all()
+    store = get_sales_store()
+    rollup = store.rollup() if store is not None else None
+    if rollup is not None:
+        snapshot = dashboard_sales_payload(rollup)
+    else:
+        snapshot = dict.fromkeys(DASHBOARD_SALES_PANELS)
+    snapshot['produits'] = [p.to_dict() for p in produits]
+    snapshot['waste_recommendations'] = waste_recommendations_payload(rollup, produits)['recommendations']
+    return jsonify(shaped(snapshot))
 
 
 @app.route('/api/produits/<int:produit_id>/apply_discount', methods=['POST'])
 def apply_discount(produit_id):
     """Apply a discount percentage to a produit's prix_unitaire and persist it.
 
-    Request JSON: { "discount_percent": 20 }
+    Request JSON: { "discount_percent": 20, "start_date": "2025-01-10", "end_date": "2025-01-15" }
+    Dates are optional: without start_date (or with a past one) the promotion is
+    active immediately and supersedes the product's current one; a future
+    start_date schedules it (activated by the promotion scheduler).
     Returns updated produit dict.
     """
     data = request.get_json() or {}
     discount = float(data.get('discount_percent', 0))
     if discount <= 0:
         return jsonify({'error': 'discount_percent must be > 0'}), 400
+    try:
+        start_date = date.fromisoformat(data['start_date']) if data.get('start_date') else None
+        end_date = date.fromisoformat(data['end_date']) if data.get('end_date') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'start_date / end_date must be YYYY-MM-DD'}), 400
+    today = date.today()
+    if end_date is not None and (end_date < today or (start_date is not None and end_date < start_date)):
+        return jsonify({'error': 'end_date must be >= start_date and >= today'}), 400
 
     produit = Produit.query.get(produit_id)
     if not produit:
@@ -493,21 +522,58 @@ def apply_discount(produit_id):
         prom = Promotion(
             produit_id=produit.id,
             discount_percent=discount,
-            start_date=None,
-            end_date=None,
-            active=True
+            start_date=start_date,
+            end_date=end_date,
+            active=start_date is None or start_date <= today
         )
         db.session.add(prom)
+        db.session.flush()
+        if prom.active:
+            # same transaction: previous promotions are archived and the product row carries the new one
+            prom.supersede_previous()
+            produit.set_active_promotion(prom)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    product_cache.invalidate(produit_id)
 
     # return product with active promotion included
     return jsonify({'status': 'success', 'produit': produit.to_dict(), 'promotion': prom.to_dict()})
 
+
+@app.route('/api/promotions/<int:promotion_id>/deactivate', methods=['POST'])
+def deactivate_promotion(promotion_id):
+    """Deactivate (archive) a promotion; the product falls back to its previous active promotion, if any."""
+    from model.ecomarche_db import Promotion
+    prom = db.session.get(Promotion, promotion_id)
+    if not prom:
+        return jsonify({'error': 'Promotion not found'}), 404
+    payload = dict(prom.to_dict(), active=False)
+    try:
+        produit = prom.deactivate()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    product_cache.invalidate(payload['produit_id'])
+    return jsonify({'status': 'success', 'promotion': payload,
+                    'produit': produit.to_dict() if produit is not None else None})
+
+
+@app.route('/api/promotions/scheduler', methods=['GET', 'POST'])
+def promotion_scheduler():
+    """GET: scheduler stats; POST: run one lifecycle pass now."""
+    scheduler = getattr(app, 'promotion_scheduler', None)
+    if scheduler is None:
+        return jsonify({'enabled': False, 'stats': None})
+    if request.method == 'POST':
+        scheduler.run_once()
+    return jsonify({'enabled': PROMOTION_SCHEDULER_ENABLED, 'stats': scheduler.stats()})
+
 # Exécuter l'initialisation au démarrage
 initialize_database()
 
 if __name__ == '__main__':
-    app.run(debug=True, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # serveur de développement ; en production : python start.py (gunicorn)
+    app.run(debug=APP_DEBUG, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Point d'entrée ASGI de l'API EcoMarché (uvicorn asgi:app).
+
+Les lectures les plus sollicitées par le dashboard sont servies par des handlers
+asynchrones :
+
+- produits (`/api/produits/all`, `/api/produits/<id>`) et risques
+  (`/api/risques/recommandations`, `/api/risques/predict/<id>`) : accès base via
+  le pilote asynchrone (aiosqlite / asyncpg), inférence dans un pool de threads ;
+- ventes et KPI (`/api/sales/*`, `/api/kpi/overview`) : agrégations pandas dans
+  le pool de threads, ou GROUP BY SQL via la session asynchrone en mode
+  SALES_STORAGE=database.
+
+Les requêtes conditionnelles (ETag / Last-Modified, 304) y sont traitées comme
+dans l'application Flask (config/conditional.py).
+
+La boucle d'événements n'exécute jamais de calcul lourd : un worker sert de
+nombreux clients simultanés. Toutes les autres routes (écritures, promotions,
+recommandations anti-gaspillage, fichiers statiques) restent servies par
+l'application Flask, montée en WSGI (exécutée elle aussi dans un pool de threads).
+"""
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+from app import app as flask_app
+from config.conditional import conditional_headers, current_versions, dependencies_for, is_not_modified, validators
+from config.constant import ASGI_ANALYTICS_WORKERS, CONDITIONAL_GET_ENABLED, CORS_ORIGINS
+from config.db import create_async_db_engine, db
+from config.json_provider import requested_shape, shaped
+from config.metrics import begin_request, end_request, metrics
+from helpers.sales import SALES_ENDPOINTS, SALES_STORAGE_DATABASE, SqlSalesStore
+from model.ecomarche_db import Produit
+from model.product_cache import product_cache
+from resources.risques import risk_for_product, risk_recommendations
+
+executor = ThreadPoolExecutor(max_workers=ASGI_ANALYTICS_WORKERS, thread_name_prefix='asgi-analytics')
+Session = None
+
+
+class JSONResponse(Response):
+    """JSON encoded by Flask's provider, as jsonify does (orjson, dates as HTTP dates, sorted keys)."""
+    media_type = 'application/json'
+
+    def render(self, content) -> bytes:
+        return flask_app.json.dumps_bytes(content) + b'\n'
+
+
+def _in_app_context(fn, *args):
+    with flask_app.app_context():
+        return fn(*args)
+
+
+async def offload(fn, *args):
+    """Run blocking / CPU-bound work in the analytics pool, inside the Flask app context."""
+    loop = asyncio.get_running_loop()
+    # copy the context so that SQL run in the pool is counted for the current request
+    return await loop.run_in_executor(executor, contextvars.copy_context().run, _in_app_context, fn, *args)
+
+
+def instrumented(path, endpoint):
+    """Latency / SQL metrics for an async endpoint (config/metrics.py), labelled with its path template."""
+    if not metrics.enabled:
+        return endpoint
+
+    async def wrapper(request):
+        start = time.perf_counter()
+        token = begin_request(path)
+        status = 500
+        try:
+            response = await endpoint(request)
+            status = response.status_code
+            return response
+        finally:
+            end_request(token, request.method, status, time.perf_counter() - start)
+    return wrapper
+
+
+def conditional(endpoint):
+    """ETag / Last-Modified, and 304 without running `endpoint` when the client's version is current."""
+    if not CONDITIONAL_GET_ENABLED:
+        return endpoint
+
+    async def wrapper(request):
+        dependencies = dependencies_for(request.url.path)
+        if dependencies is None:
+            return await endpoint(request)
+        async with Session() as session:
+            versions = await session.run_sync(lambda sync_session: current_versions(flask_app, sync_session))
+        etag, last_modified = validators(versions, dependencies, request.url.path, request.url.query)
+        headers = conditional_headers(etag, last_modified)
+        if is_not_modified(etag, last_modified, request.headers.get('if-none-match'),
+                           request.headers.get('if-modified-since')):
+            return Response(status_code=304, headers=headers)
+        response = await endpoint(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
+    return wrapper
+
+
+async def load_produit(session: AsyncSession, produit_id: int):
+    """Serialized product through the product cache, loaded asynchronously on a miss."""
+    payload = product_cache.get(produit_id)
+    if payload is not None:
+        return payload
+    version = product_cache.snapshot(produit_id)
+    produit = await session.get(Produit, produit_id)
+    payload = produit.to_dict() if produit is not None else None
+    product_cache.put(produit_id, payload, version)
+    return payload
+
+
+# ----------------------------------------------------------------------------
+# Produits
+# ----------------------------------------------------------------------------
+
+async def produits_all(request):
+    try:
+        async with Session() as session:
+            produits = (await session.execute(select(Produit))).scalars().all()
+        payload = {'status': 'success', 'produits': [p.to_dict() for p in produits]}
+        return JSONResponse(shaped(payload, requested_shape(request.query_params)))
+    except Exception as e:
+        return JSONResponse({'status': 'error', 'error_description': str(e)})
+
+
+async def produit_by_id(request):
+    async with Session() as session:
+        produit = await load_produit(session, request.path_params['produit_id'])
+    if produit is None:
+        return JSONResponse({'status': 'error', 'error_description': 'Produit non trouvé'})
+    return JSONResponse({'status': 'success', 'produit': produit})
+
+
+# ----------------------------------------------------------------------------
+# Risques
+# ----------------------------------------------------------------------------
+
+async def risques_recommandations(request):
+    async with Session() as session:
+        produits = (await session.execute(select(Produit))).scalars().all()
+    payload = {'recommendations': await offload(risk_recommendations, produits)}
+    return JSONResponse(shaped(payload, requested_shape(request.query_params)))
+
+
+async def risques_predict(request):
+    async with Session() as session:
+        payload = await load_produit(session, request.path_params['produit_id'])
+    if not payload:
+        return JSONResponse({'error': 'Produit not found'}, status_code=404)
+    body, status = await offload(risk_for_product, payload)
+    return JSONResponse(body, status_code=status)
+
+
+# ----------------------------------------------------------------------------
+# Ventes / KPI
+# ----------------------------------------------------------------------------
+
+def sales_endpoint(build_payload):
+    async def endpoint(request):
+        store = getattr(flask_app, 'sales_store', None)
+        if store is None:
+            return JSONResponse({'error': 'Sales dataset not available'}, status_code=404)
+        if store.storage == SALES_STORAGE_DATABASE:
+            # GROUP BY queries on the async driver's connection
+            async with Session() as session:
+                payload = await session.run_sync(lambda sync_session: build_payload(SqlSalesStore(sync_session)))
+        else:
+            payload = await offload(build_payload, store)
+        return JSONResponse(shaped(payload, requested_shape(request.query_params)))
+    return endpoint
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global Session
+    with flask_app.app_context():
+        database_url = db.engine.url
+    engine = create_async_db_engine(database_url)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        yield
+    finally:
+        await engine.dispose()
+        executor.shutdown(wait=False)
+
+
+async_endpoints = {
+    '/api/produits/all': produits_all,
+    '/api/produits/{produit_id:int}': produit_by_id,
+    '/api/risques/recommandations': risques_recommandations,
+    '/api/risques/predict/{produit_id:int}': risques_predict,
+}
+async_endpoints.update({path: sales_endpoint(build_payload) for path, build_payload in SALES_ENDPOINTS.items()})
+
+routes = [
+    Route(path, instrumented(path, conditional(endpoint)), methods=['GET'])
+    for path, endpoint in async_endpoints.items()
+] + [
+    # everything else: the Flask application
+    Mount('/', app=WSGIMiddleware(flask_app)),
+]
+
+app = Starlette(
+    routes=routes,
+    lifespan=lifespan,
+    middleware=[Middleware(CORSMiddleware, allow_origins=CORS_ORIGINS, allow_methods=['*'], allow_headers=['*'])],
+)
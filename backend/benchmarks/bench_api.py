@@ -0,0 +1,359 @@
+"""
+End-to-end API load test: p50/p95/p99 latency and throughput per route, across
+catalog sizes and client concurrency levels.
+
+For every catalog size, a fresh SQLite database (migrations + products) and
+sales history are generated with helpers/synthetic_data.py in a temporary
+directory, which also receives the feature store (FEATURE_STORE_DIR): the
+files under model/saved_models are left untouched. The app is then
+driven by a pool of client threads:
+
+- `--target inprocess` (default): the Flask app runs in a child process, each
+  client thread using its own test client; measures the application alone
+  (no network, no server), one process, through the Flask routes;
+- `--target server`: `python start.py` (gunicorn, SERVER_APP / SERVER_WORKERS
+  as configured) is started on a free local port and driven over HTTP keep-alive
+  connections; with the default SERVER_APP=asgi:app the async handlers of
+  asgi.py serve the routes they cover, so the two targets do not run the same
+  handlers (the report records which ones were measured);
+- `--url http://host:port`: an already running server, with its own dataset
+  (no size sweep).
+
+Results are written as JSON; `--baseline <previous.json>` prints the p50 / p99 /
+throughput delta of every (size, route, concurrency) cell and returns a non
+zero exit code when p50 or p99 is slower than `--tolerance` (20 % by default).
+
+Usage:
+    python benchmarks/bench_api.py [--sizes 1000,10000,100000] [--concurrency 1,8,32]
+                                   [--routes /api/produits/all,...] [--duration 3]
+                                   [--target inprocess|server] [--url URL] [--workers 4]
+                                   [--output benchmarks/results/api.json]
+                                   [--baseline previous.json] [--tolerance 0.2]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_CONCURRENCY = [1, 8, 32]
+DEFAULT_ROUTES = [
+    '/api/produits/all',
+    '/api/kpi/waste_recommendations',
+    '/api/risques/recommandations',
+    '/api/sales/summary',
+    '/api/sales/top_products',
+    '/api/kpi/overview',
+    '/api/sales/seasonality',
+    '/api/sales/popular_by_season',
+    '/api/sales/by_age_groups',
+]
+SERVER_START_TIMEOUT = 600
+
+
+def parse_list(value, cast=str):
+    return [cast(v) for v in value.split(',') if v]
+
+
+def latency_summary(samples, errors, elapsed):
+    samples = np.asarray(samples)
+    if not len(samples):
+        return {'requests': 0, 'errors': errors}
+    return {
+        'requests': int(len(samples)),
+        'errors': errors,
+        'p50_ms': float(np.percentile(samples, 50)) * 1000.0,
+        'p95_ms': float(np.percentile(samples, 95)) * 1000.0,
+        'p99_ms': float(np.percentile(samples, 99)) * 1000.0,
+        'throughput_rps': len(samples) / elapsed if elapsed > 0 else None,
+    }
+
+
+def run_load(make_client, route, concurrency, duration):
+    """`concurrency` threads call `client(route)` (-> status) in a loop for `duration` s, one request at least."""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    barrier = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def worker(i):
+        client = make_client()
+        barrier.wait()
+        while True:
+            t0 = time.perf_counter()
+            try:
+                ok = 200 <= client(route) < 300
+            except Exception:
+                ok = False
+            t1 = time.perf_counter()
+            if ok:
+                latencies[i].append(t1 - t0)
+            else:
+                errors[i] += 1
+            if t1 >= deadline[0]:
+                break
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    start = time.perf_counter()
+    deadline[0] = start + duration
+    barrier.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return latency_summary([s for per_thread in latencies for s in per_thread], sum(errors), elapsed)
+
+
+def sweep(make_client, routes, concurrency_levels, duration, label=''):
+    results = {}
+    for route in routes:
+        # warm-up: caches, lazy imports, first-request setup
+        make_client()(route)
+        results[route] = {}
+        for c in concurrency_levels:
+            summary = run_load(make_client, route, c, duration)
+            results[route][str(c)] = summary
+            print(f"  {label}{route:<34} c={c:<3} " + format_summary(summary), flush=True)
+    return results
+
+
+def format_summary(s):
+    if not s.get('requests'):
+        return f"no successful request ({s.get('errors', 0)} errors)"
+    return (f"p50={s['p50_ms']:9.2f}ms p99={s['p99_ms']:9.2f}ms {s['throughput_rps']:9.1f} req/s"
+            + (f" errors={s['errors']}" if s['errors'] else ''))
+
+
+# ----------------------------------------------------------------------------
+# Clients
+# ----------------------------------------------------------------------------
+
+def http_client_factory(base_url):
+    parts = urlsplit(base_url)
+
+    def make_client():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+
+        def get(route):
+            nonlocal conn
+            try:
+                conn.request('GET', route, headers={'Accept-Encoding': 'identity'})
+                response = conn.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+                raise
+        return get
+    return make_client
+
+
+def wait_until_ready(base_url, process=None, timeout=SERVER_START_TIMEOUT):
+    client = http_client_factory(base_url)()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            client('/api/sales/summary')
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# ----------------------------------------------------------------------------
+# Datasets
+# ----------------------------------------------------------------------------
+
+def prepare_dataset(directory, n_products, sales_days, max_sales_rows, seed):
+    """Migrated SQLite database with `n_products` products and the matching sales CSV; returns the app env."""
+    from flask import Flask
+    from flask_migrate import Migrate, upgrade
+    from config.db import db, init_db
+    from helpers.synthetic_data import generate_products, generate_sales, load_products, write_sales
+
+    database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    sales_path = os.path.join(directory, 'sales.csv')
+    products = generate_products(n_products, seed=seed)
+    write_sales(generate_sales(products, min(n_products * sales_days, max_sales_rows), seed=seed), sales_path)
+
+    app = Flask(__name__, instance_path=directory)
+    init_db(app, database_url)
+    Migrate(app, db, directory=os.path.join(BASE_DIR, 'migrations'))
+    with app.app_context():
+        upgrade()
+        db.create_all()
+        load_products(products, replace=True)
+        db.session.remove()
+        db.engine.dispose()
+    return {'DATABASE_URL': database_url, 'SALES_CSV_PATH': sales_path, 'SALES_STORAGE': 'memory',
+            'FEATURE_STORE_DIR': directory, 'PROMOTION_SCHEDULER_ENABLED': '0', 'APP_DEBUG': '0'}
+
+
+def run_inprocess(env, args, routes, concurrency_levels):
+    """Run the sweep in a child process importing the app with the dataset's environment."""
+    with tempfile.NamedTemporaryFile('r', suffix='.json', delete=False) as out:
+        output = out.name
+    try:
+        command = [sys.executable, os.path.abspath(__file__), '--child', output, '--routes', ','.join(routes),
+                   '--concurrency', ','.join(str(c) for c in concurrency_levels), '--duration', str(args.duration)]
+        subprocess.run(command, env={**os.environ, **env}, cwd=BASE_DIR, check=True)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def child_main(output, routes, concurrency_levels, duration):
+    from app import app
+    results = sweep(lambda: make_test_client_caller(app), routes, concurrency_levels, duration)
+    with open(output, 'w') as f:
+        json.dump(results, f)
+
+
+def make_test_client_caller(app):
+    client = app.test_client()
+    return lambda route: client.get(route).status_code
+
+
+def run_server(env, args, routes, concurrency_levels):
+    port = free_port()
+    server_env = {**os.environ, **env, 'SERVER_BIND': f'127.0.0.1:{port}', 'SERVER_WORKERS': str(args.workers)}
+    process = subprocess.Popen([sys.executable, os.path.join(BASE_DIR, 'start.py')], env=server_env, cwd=BASE_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_ready(base_url, process)
+        return sweep(http_client_factory(base_url), routes, concurrency_levels, args.duration)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# ----------------------------------------------------------------------------
+# Baseline comparison
+# ----------------------------------------------------------------------------
+
+def compare(results, baseline, tolerance):
+    """Return one row per cell present in both runs: (size, route, c, before, after, regressed)."""
+    rows = []
+    for size, routes in results['results'].items():
+        for route, levels in routes.items():
+            for c, after in levels.items():
+                before = baseline.get('results', {}).get(size, {}).get(route, {}).get(c)
+                if not before or 'p50_ms' not in before or 'p50_ms' not in after:
+                    continue
+                regressed = any(after[k] > before[k] * (1.0 + tolerance) for k in ('p50_ms', 'p99_ms'))
+                rows.append((size, route, c, before, after, regressed))
+    return rows
+
+
+def print_comparison(rows):
+    print(f"\n{'size':>8} {'route':<34} {'c':>3} {'p50 before/after':>22} {'p99 before/after':>22} {'req/s':>8}")
+    for size, route, c, before, after, regressed in rows:
+        rps = (after['throughput_rps'] / before['throughput_rps'] - 1) * 100 if before['throughput_rps'] else 0.0
+        p50 = f"{before['p50_ms']:.2f}/{after['p50_ms']:.2f}ms"
+        p99 = f"{before['p99_ms']:.2f}/{after['p99_ms']:.2f}ms"
+        print(f"{size:>8} {route:<34} {c:>3} {p50:>22} {p99:>22} {rps:+7.1f}%" + ('  REGRESSION' if regressed else ''))
+
+
+def handlers(args):
+    """Which request handlers the sweep measures."""
+    if args.url:
+        return 'external server'
+    if args.target == 'inprocess':
+        return 'flask routes (app.py, test client)'
+    from config.constant import SERVER_APP
+    return f'{SERVER_APP} under gunicorn' + (' (async handlers of asgi.py)' if SERVER_APP.startswith('asgi:') else '')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API load test across catalog sizes and concurrency levels")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES), help="catalog sizes (products)")
+    parser.add_argument('--concurrency', default=','.join(str(c) for c in DEFAULT_CONCURRENCY))
+    parser.add_argument('--routes', default=','.join(DEFAULT_ROUTES))
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds per (route, concurrency) cell")
+    parser.add_argument('--target', choices=['inprocess', 'server'], default='inprocess')
+    parser.add_argument('--url', default=None, help="running server to drive instead (its own dataset)")
+    parser.add_argument('--workers', type=int, default=4, help="gunicorn workers with --target server")
+    parser.add_argument('--sales-days', type=int, default=365)
+    parser.add_argument('--max-sales-rows', type=int, default=2000000, help="cap on the generated sales history")
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'api.json'))
+    parser.add_argument('--baseline', default=None, help="previous results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p50 / p99 slowdown vs baseline")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    routes = parse_list(args.routes)
+    concurrency_levels = parse_list(args.concurrency, int)
+    if args.child:
+        child_main(args.child, routes, concurrency_levels, args.duration)
+        return 0
+
+    results = {}
+    if args.url:
+        print(f"{args.url}")
+        wait_until_ready(args.url, timeout=30)
+        results['external'] = sweep(http_client_factory(args.url), routes, concurrency_levels, args.duration)
+    else:
+        for size in parse_list(args.sizes, int):
+            with tempfile.TemporaryDirectory(prefix=f'bench-api-{size}-') as directory:
+                start = time.perf_counter()
+                env = prepare_dataset(directory, size, args.sales_days, args.max_sales_rows, args.seed)
+                print(f"{size} products: dataset ready in {time.perf_counter() - start:.1f}s ({args.target})",
+                      flush=True)
+                run = run_inprocess if args.target == 'inprocess' else run_server
+                results[str(size)] = run(env, args, routes, concurrency_levels)
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {'python': platform.python_version(), 'machine': platform.machine(), 'cpu_count': os.cpu_count()},
+        'config': {'target': 'url' if args.url else args.target, 'url': args.url, 'workers': args.workers,
+                   'handlers': handlers(args), 'duration': args.duration, 'sales_days': args.sales_days,
+                   'max_sales_rows': args.max_sales_rows},
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(report, json.load(f), args.tolerance)
+        print_comparison(rows)
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
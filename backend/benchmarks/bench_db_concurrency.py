@@ -0,0 +1,135 @@
+"""
+Concurrent read/write throughput of the SQLite engine: default settings vs the tuned
+configuration from config/db.py (WAL, synchronous=NORMAL, mmap, busy timeout, pool).
+
+Writers mimic `apply_discount` and the product PATCH endpoint (UPDATE produits +
+INSERT promotions + COMMIT); readers mimic the product list (SELECT produits and
+their active promotion). Each configuration runs on its own temporary database.
+
+Usage:
+    python benchmarks/bench_db_concurrency.py [--readers 8] [--writers 2] [--duration 5]
+                                              [--products 1000] [--output results/db.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, event, text
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from config.db import db, engine_options, set_sqlite_pragmas
+import model.ecomarche_db  # noqa: F401  (registers the tables on db.metadata)
+
+
+def make_engine(path, tuned):
+    url = f'sqlite:///{path}'
+    if not tuned:
+        return create_engine(url)
+    engine = create_engine(url, **engine_options(url))
+    event.listen(engine, 'connect', set_sqlite_pragmas)
+    return engine
+
+
+def seed(engine, products):
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO produits (nom, categorie_id, stock, prix_unitaire, fournisseur) "
+            "VALUES (:nom, :cat, :stock, :prix, :four)"),
+            [{'nom': f'Produit {i}', 'cat': i % 10 + 1, 'stock': 100, 'prix': 1.0 + i % 7, 'four': 'Bench'}
+             for i in range(products)])
+
+
+def run(engine, readers, writers, duration, products):
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {'reads': [], 'writes': [], 'errors': 0}
+
+    def reader():
+        rnd = random.Random()
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    start = rnd.randint(1, max(1, products - 200))
+                    conn.execute(text("SELECT * FROM produits WHERE id BETWEEN :a AND :b"), {'a': start, 'b': start + 200}).fetchall()
+                    conn.execute(text("SELECT * FROM promotions WHERE produit_id = :p AND active = 1 "
+                                      "ORDER BY created_at DESC LIMIT 1"), {'p': start}).fetchall()
+                with lock:
+                    stats['reads'].append(time.perf_counter() - t0)
+            except Exception:
+                with lock:
+                    stats['errors'] += 1
+
+    def writer():
+        rnd = random.Random()
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            pid = rnd.randint(1, products)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text("UPDATE produits SET stock = stock - 1 WHERE id = :id"), {'id': pid})
+                    conn.execute(text("INSERT INTO promotions (produit_id, discount_percent, active) VALUES (:id, 10, 1)"), {'id': pid})
+                with lock:
+                    stats['writes'].append(time.perf_counter() - t0)
+            except Exception:
+                with lock:
+                    stats['errors'] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + \
+              [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    def summary(samples):
+        if not samples:
+            return {'ops': 0, 'ops_s': 0.0}
+        arr = np.asarray(samples) * 1000.0
+        return {'ops': len(samples), 'ops_s': len(samples) / duration,
+                'p50_ms': float(np.percentile(arr, 50)), 'p99_ms': float(np.percentile(arr, 99))}
+
+    return {'reads': summary(stats['reads']), 'writes': summary(stats['writes']), 'errors': stats['errors']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite concurrency benchmark: default vs tuned engine")
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, tuned in (('default', False), ('tuned', True)):
+            engine = make_engine(os.path.join(tmp, f'{name}.db'), tuned)
+            seed(engine, args.products)
+            results[name] = run(engine, args.readers, args.writers, args.duration, args.products)
+            engine.dispose()
+
+    for name, res in results.items():
+        print(f"{name:>8}: reads {res['reads']['ops_s']:9.1f}/s (p99 {res['reads'].get('p99_ms', 0):7.2f}ms)  "
+              f"writes {res['writes']['ops_s']:8.1f}/s (p99 {res['writes'].get('p99_ms', 0):7.2f}ms)  errors {res['errors']}")
+    if results['default']['reads']['ops_s'] and results['default']['writes']['ops_s']:
+        print(f"   gain: reads x{results['tuned']['reads']['ops_s'] / results['default']['reads']['ops_s']:.2f}  "
+              f"writes x{results['tuned']['writes']['ops_s'] / results['default']['writes']['ops_s']:.2f}")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Response encoding benchmark, per endpoint: Flask's default JSON provider vs
+FastJSONProvider (orjson), in records and columns shape (`?shape=columns`).
+
+Payloads are built by the same functions as the endpoints (helpers/sales.py
+payload builders, Produit.to_dict, waste-style recommendation rows) from a
+synthetic sales history and catalog. The sales payloads hold the aggregation
+DataFrames, so each timing covers frame -> response bytes:
+
+- flask-json: DataFrame.to_dict(orient='records') then Flask's json provider
+  (the previous pipeline);
+- orjson-to_dict: DataFrame.to_dict(orient='records') then orjson;
+- fast: the frames serialized by FastJSONProvider, column by column;
+- fast-columns: `?shape=columns`, numeric columns written from their NumPy arrays.
+
+A second table times the sales endpoints end to end (store -> aggregation ->
+bytes). Reports p50 latency, speed-up and response size.
+
+Usage:
+    python benchmarks/bench_json.py [--products 100,1000,10000] [--days 730] [--sales-products 300]
+                                    [--output benchmarks/results/json.json]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from benchmarks.bench_models import time_calls
+from config.json_provider import FastJSONProvider, to_columns
+from helpers.sales import SALES_ENDPOINTS, PandasSalesStore, compact_sales_frame
+from model.ecomarche_db import Produit
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+
+
+def synthetic_sales(days, n_products, rng):
+    dates = pd.date_range('2022-01-01', periods=days, freq='D')
+    n = days * n_products
+    return pd.DataFrame({
+        'Date': np.repeat(dates, n_products),
+        'Product_ID': np.tile([f'P{p:04d}' for p in range(n_products)], days),
+        'Product_Name': np.tile([f'Produit {p}' for p in range(n_products)], days),
+        'Category': np.tile([f'Categorie {p % 12}' for p in range(n_products)], days),
+        'Daily_Sales': rng.gamma(2.0, 5.0, n),
+        'Unit_Price': np.round(rng.uniform(0.5, 20.0, n), 2),
+    })
+
+
+def synthetic_produits(n, rng):
+    today = date.today()
+    return [Produit(id=i + 1, nom=f'Produit {i}', categorie_id=int(rng.integers(1, 11)), stock=int(rng.integers(0, 200)),
+                    prix_unitaire=float(np.round(rng.uniform(0.5, 20.0), 2)), fournisseur='Bench',
+                    date_peremption=today + timedelta(days=int(rng.integers(0, 30))))
+            for i in range(n)]
+
+
+def as_records(obj):
+    """The payload with every DataFrame converted by DataFrame.to_dict (previous pipeline)."""
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient='records')
+    if isinstance(obj, dict):
+        return {key: as_records(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [as_records(value) for value in obj]
+    return obj
+
+
+def endpoint_payloads(store, produits_sizes, rng):
+    payloads = {path: build(store) for path, build in SALES_ENDPOINTS.items()}
+    for n in produits_sizes:
+        produits = [p.to_dict() for p in synthetic_produits(n, rng)]
+        payloads[f'/api/produits/all (n={n})'] = {'status': 'success', 'produits': produits}
+        payloads[f'/api/kpi/waste_recommendations-like (n={n})'] = {'recommendations': [
+            {'product_id': p['id'], 'nom': p['nom'], 'stock': p['stock'], 'jours_restants': p['jours_restants'],
+             'risk_score': float(rng.random()), 'driver': 'expiry', 'forecast_demand_7d': float(rng.integers(0, 300))}
+            for p in produits]}
+    return payloads
+
+
+def time_encoders(encoders, make_payload):
+    """p50/p99 of encode(make_payload()) for each encoder, speed-up against flask-json."""
+    res = {}
+    for name, encode in encoders.items():
+        run = time_calls(lambda: encode(make_payload()), 1, min_time=0.3)
+        res[name] = {'p50_ms': run['p50_ms'], 'p99_ms': run['p99_ms'], 'bytes': len(encode(make_payload()))}
+    base = res['flask-json']['p50_ms']
+    for name in encoders:
+        res[name]['speedup'] = base / res[name]['p50_ms'] if res[name]['p50_ms'] > 0 else None
+    return res
+
+
+def print_table(results, encoders, title):
+    print(f"{title:<46} {'flask-json':>11}" + ''.join(f" {name:>17}" for name in list(encoders)[1:])
+          + f" {'bytes rec/col':>17}")
+    for endpoint, res in results.items():
+        print(f"{endpoint:<46} {res['flask-json']['p50_ms']:9.3f}ms"
+              + ''.join(f" {res[name]['p50_ms']:9.3f}ms x{res[name]['speedup']:5.1f}" for name in list(encoders)[1:])
+              + f" {res['fast']['bytes']:>8}/{res['fast-columns']['bytes']:<8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON response encoding benchmark per endpoint")
+    parser.add_argument('--products', default='100,1000,10000', help="catalog sizes for /api/produits/all")
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--sales-products', type=int, default=300)
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'json.json'))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    store = PandasSalesStore(compact_sales_frame(synthetic_sales(args.days, args.sales_products, rng)))
+    payloads = endpoint_payloads(store, [int(s) for s in args.products.split(',') if s], rng)
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    if not fast_provider.use_orjson:
+        print("orjson not installed: FastJSONProvider falls back to the standard json module")
+
+    encoders = {
+        'flask-json': lambda p: default_provider.dumps(as_records(p)).encode('utf-8'),
+        'orjson-to_dict': lambda p: fast_provider.dumps_bytes(as_records(p)),
+        'fast': fast_provider.dumps_bytes,
+        'fast-columns': lambda p: fast_provider.dumps_bytes(to_columns(p)),
+    }
+    results = {endpoint: time_encoders(encoders, lambda: payload) for endpoint, payload in payloads.items()}
+    print_table(results, encoders, 'endpoint (payload -> bytes)')
+
+    end_to_end = {endpoint: time_encoders(encoders, lambda: build(store)) for endpoint, build in SALES_ENDPOINTS.items()}
+    print()
+    print_table(end_to_end, encoders, 'endpoint (store -> bytes)')
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'orjson': fast_provider.use_orjson, 'results': results,
+                   'end_to_end': end_to_end}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Inference benchmark for the ML models across batch sizes.
+
+For each model entry point (and alternate engine) the harness generates a synthetic
+feature matrix, times repeated calls for every batch size and reports latency
+percentiles (p50/p95/p99) and throughput (rows/s). Results are written as JSON so
+successive releases can be compared.
+
+Usage:
+    python benchmarks/bench_models.py [--sizes 1,10,100,1000,10000,100000]
+                                      [--output benchmarks/results/models.json]
+                                      [--baseline previous.json] [--tolerance 0.2]
+                                      [--risk-model path/to/model.joblib]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000, 100000]
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+
+
+def percentile_summary(samples, batch_size):
+    samples = np.asarray(samples)
+    p50 = float(np.percentile(samples, 50))
+    return {
+        'batch_size': batch_size,
+        'runs': int(len(samples)),
+        'p50_ms': p50 * 1000.0,
+        'p95_ms': float(np.percentile(samples, 95)) * 1000.0,
+        'p99_ms': float(np.percentile(samples, 99)) * 1000.0,
+        'throughput_rows_s': batch_size / p50 if p50 > 0 else None,
+    }
+
+
+def time_calls(fn, batch_size, min_time=0.5, max_runs=200, min_runs=3):
+    """Call fn() repeatedly (after one warm-up call) and return per-call wall times."""
+    fn()
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return percentile_summary(samples, batch_size)
+
+
+# ----------------------------------------------------------------------------
+# Synthetic inputs
+# ----------------------------------------------------------------------------
+
+def synthetic_risk_features(n, rng):
+    X = np.empty((n, 4))
+    X[:, 0] = rng.gamma(2.0, 1.5, n)          # avg_daily_sales
+    X[:, 1] = rng.lognormal(0.0, 0.4, n)      # price_rel
+    X[:, 2] = rng.uniform(0.0, 2.0, n)        # sales_cv
+    X[:, 3] = rng.integers(1, 365, n)         # days_present
+    return X
+
+
+def load_risk_model(path, rng):
+    from model.ml_model import RiskModel
+    if path:
+        model = RiskModel.load(path)
+        if model.is_loaded():
+            return model
+    # synthetic model with the deployed configuration
+    from sklearn.ensemble import RandomForestClassifier
+    X = synthetic_risk_features(2000, rng)
+    y = ((X[:, 0] < 1.0) & (X[:, 2] > 1.0)).astype(int)
+    clf = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=1).fit(X, y)
+    return RiskModel(clf, version='synthetic')
+
+
+# ----------------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------------
+
+def bench_risk(sizes, rng, model_path=None):
+    from model.compact_forest import CompactForest
+    from model.ml_model import RiskModel
+    model = load_risk_model(model_path, rng)
+    results = {'RiskModel.predict_proba': [], 'RiskModel.predict_proba_cached(warm)': []}
+    compact = None
+    if hasattr(model.model, 'estimators_'):
+        compact = RiskModel(CompactForest.from_sklearn(model.model), version='compact')
+        results['RiskModel.predict_proba(compact)'] = []
+    for n in sizes:
+        rows = synthetic_risk_features(n, rng).tolist()
+        results['RiskModel.predict_proba'].append(time_calls(lambda: model.predict_proba(rows), n))
+        if compact is not None:
+            results['RiskModel.predict_proba(compact)'].append(time_calls(lambda: compact.predict_proba(rows), n))
+        model.cache.max_size = max(model.cache.max_size, n)
+        model.predict_proba_cached(rows)
+        results['RiskModel.predict_proba_cached(warm)'].append(time_calls(lambda: model.predict_proba_cached(rows), n))
+    return results
+
+
+def bench_pricing(sizes, rng, max_scalar=1000):
+    from model.pricing_model import pricing_model
+    results = {'DynamicPricingModel.calculate_price': []}
+    today = datetime.now()
+    for n in sizes:
+        if n > max_scalar:
+            results['DynamicPricingModel.calculate_price'].append({'batch_size': n, 'skipped': 'scalar API, above --max-scalar'})
+            continue
+        expiry = [(today + timedelta(days=int(d))).strftime('%Y-%m-%d') for d in rng.integers(0, 30, n)]
+        stock = rng.integers(0, 100, n)
+        demand = rng.integers(1, 50, n)
+        price = rng.uniform(1, 50, n)
+        category = rng.integers(0, 5, n)
+
+        def run():
+            for i in range(n):
+                pricing_model.calculate_price(i, expiry[i], int(stock[i]), int(demand[i]), float(price[i]), int(category[i]))
+        results['DynamicPricingModel.calculate_price'].append(time_calls(run, n, max_runs=50))
+    return results
+
+
+def bench_demand(sizes, rng, days=7, max_scalar=1000):
+    from model.prediction_model import demand_model
+    results = {'DemandPredictionModel.predict': [], 'DemandPredictionModel.forecast_matrix': []}
+    for n in sizes:
+        categories = rng.integers(0, 5, n)
+        prices = rng.uniform(1, 20, n)
+        if n > max_scalar:
+            results['DemandPredictionModel.predict'].append({'batch_size': n, 'skipped': 'scalar API, above --max-scalar'})
+        else:
+            def run():
+                for i in range(n):
+                    demand_model.predict(i, days, int(categories[i]), float(prices[i]))
+            results['DemandPredictionModel.predict'].append(time_calls(run, n, max_runs=50))
+        results['DemandPredictionModel.forecast_matrix'].append(
+            time_calls(lambda: demand_model.forecast_matrix(categories, prices, days), n))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the (engine, batch_size, baseline_p50, p50) entries slower than baseline by more than tolerance."""
+    regressions = []
+    for engine, runs in results['benchmarks'].items():
+        previous = {r['batch_size']: r for r in baseline.get('benchmarks', {}).get(engine, [])}
+        for run in runs:
+            prev = previous.get(run['batch_size'])
+            if not prev or 'p50_ms' not in prev or 'p50_ms' not in run:
+                continue
+            if run['p50_ms'] > prev['p50_ms'] * (1.0 + tolerance):
+                regressions.append((engine, run['batch_size'], prev['p50_ms'], run['p50_ms']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark model inference across batch sizes")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument('--models', default='risk,pricing,demand', help="comma separated subset")
+    parser.add_argument('--risk-model', default=None, help="joblib artifact (synthetic RandomForest by default)")
+    parser.add_argument('--max-scalar', type=int, default=1000, help="largest batch for per-row APIs")
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'models.json'))
+    parser.add_argument('--baseline', default=None, help="previous results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p50 slowdown vs baseline")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    selected = set(args.models.split(','))
+    rng = np.random.default_rng(args.seed)
+
+    benchmarks = {}
+    if 'risk' in selected:
+        benchmarks.update(bench_risk(sizes, rng, args.risk_model))
+    if 'pricing' in selected:
+        benchmarks.update(bench_pricing(sizes, rng, args.max_scalar))
+    if 'demand' in selected:
+        benchmarks.update(bench_demand(sizes, rng, max_scalar=args.max_scalar))
+
+    import sklearn
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'benchmarks': benchmarks,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for engine, runs in benchmarks.items():
+        print(engine)
+        for r in runs:
+            if 'skipped' in r:
+                print(f"  n={r['batch_size']:>7}  skipped ({r['skipped']})")
+            else:
+                print(f"  n={r['batch_size']:>7}  p50={r['p50_ms']:9.3f}ms  p95={r['p95_ms']:9.3f}ms  "
+                      f"p99={r['p99_ms']:9.3f}ms  {r['throughput_rows_s']:12.0f} rows/s")
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for engine, n, before, after in regressions:
+            print(f"REGRESSION {engine} n={n}: p50 {before:.3f}ms -> {after:.3f}ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Requêtes conditionnelles sur les endpoints de lecture : ETag, Last-Modified et
+`304 Not Modified` sans exécuter la vue.
+
+La version d'une réponse est celle des données dont elle dépend, lue sans
+recalcul :
+
+- `produits`, `promotions` : compteurs de la table `data_versions`, incrémentés
+  dans la transaction de chaque écriture (model/ecomarche_db.py) ;
+- `sales` : hash du fichier de l'historique (SALES_STORAGE=memory) ou compteur
+  `ventes` (database) ;
+- `date` : jour courant, pour les réponses qui contiennent `jours_restants` ;
+- `model` : version du modèle de risque chargé.
+
+L'ETag (faible) combine ces versions, le chemin et la query string (`?shape=columns`) ;
+Last-Modified est la modification la plus récente. Une requête dont
+`If-None-Match` (ou à défaut `If-Modified-Since`) est à jour reçoit 304 ; la
+vérification coûte une requête sur `data_versions`. Les dates HTTP sont à la
+seconde : les compteurs sont datés à la seconde entière et If-Modified-Since est
+comparé à la date tronquée à la seconde. Deux écritures dans la même seconde
+partagent donc le même Last-Modified ; l'ETag, qui change à chaque écriture,
+reste le validateur exact (les navigateurs envoient les deux et If-None-Match
+prime). Les réponses portent
+`Cache-Control: no-cache` : le navigateur revalide à chaque appel et réutilise
+le corps en cache sur 304.
+"""
+import hashlib
+import re
+from datetime import date, datetime, time, timezone
+from typing import Dict, Optional, Tuple
+
+from flask import g, request
+from werkzeug.http import http_date, parse_date, parse_etags
+
+from config.constant import APP_VERSION, CONDITIONAL_GET_ENABLED
+from config.db import db
+from helpers.sales import SALES_STORAGE_DATABASE
+from model.ecomarche_db import read_data_versions
+from model.product_cache import product_cache
+
+PRODUCTS = ('produits', 'promotions', 'date')
+SALES = ('sales',)
+RISK = PRODUCTS + SALES + ('model',)
+
+# chemin -> données dont dépend la réponse
+CONDITIONAL_ROUTES = [
+    (re.compile(r'^/api/produits/(all|changes|\d+)$'), PRODUCTS),
+    (re.compile(r'^/api/sales/(summary|top_products|seasonality|popular_by_season|by_age_groups)$'), SALES),
+    (re.compile(r'^/api/kpi/overview$'), SALES),
+    (re.compile(r'^/api/kpi/waste_recommendations$'), RISK),
+    (re.compile(r'^/api/risques/(recommandations|predict/\d+)$'), RISK),
+    (re.compile(r'^/api/dashboard/snapshot$'), RISK),
+]
+
+
+def dependencies_for(path: str) -> Optional[Tuple[str, ...]]:
+    """Dépendances de la réponse de `path`, None si elle n'est pas versionnée."""
+    for pattern, dependencies in CONDITIONAL_ROUTES:
+        if pattern.match(path):
+            return dependencies
+    return None
+
+
+def current_versions(app, session=None) -> Dict[str, tuple]:
+    """{dépendance: (jeton, date de modification UTC ou None)}."""
+    stored = read_data_versions(session)
+    today = date.today()
+    versions = {name: stored.get(name, (0, None)) for name in ('produits', 'promotions')}
+    # le cache des produits (par processus) suit les mêmes compteurs que l'ETag
+    product_cache.sync((versions['produits'][0], versions['promotions'][0]))
+    # jours_restants change à minuit (heure locale)
+    versions['date'] = (today.isoformat(),
+                        datetime.combine(today, time()).astimezone(timezone.utc).replace(tzinfo=None))
+    store = getattr(app, 'sales_store', None)
+    if store is None:
+        versions['sales'] = (None, None)
+    elif store.storage == SALES_STORAGE_DATABASE:
+        versions['sales'] = stored.get('ventes', (0, None))
+    else:
+        versions['sales'] = getattr(app, 'sales_version', None) or (None, None)
+    model = getattr(app, 'risk_model', None)
+    versions['model'] = (model.version if model is not None and model.is_loaded() else None, None)
+    return versions
+
+
+def validators(versions: Dict[str, tuple], dependencies, path: str,
+               query_string: str = '') -> Tuple[str, Optional[datetime]]:
+    """(ETag, Last-Modified) de la réponse de `path`."""
+    parts = [APP_VERSION, path, query_string] + [f'{name}={versions[name][0]}' for name in dependencies]
+    etag = hashlib.sha1('|'.join(parts).encode()).hexdigest()[:20]
+    modified = [versions[name][1] for name in dependencies if versions[name][1] is not None]
+    return etag, (max(modified) if modified else None)
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime],
+                    if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """Le client a-t-il déjà cette version ? If-None-Match prime sur If-Modified-Since."""
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(etag)
+    if if_modified_since and last_modified is not None:
+        since = parse_date(if_modified_since)
+        return since is not None and last_modified.replace(microsecond=0) <= since.replace(tzinfo=None)
+    return False
+
+
+def conditional_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {'ETag': f'W/"{etag}"', 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.replace(tzinfo=timezone.utc))
+    return headers
+
+
+def init_conditional_get(app, enabled: Optional[bool] = None):
+    """Installe la vérification (avant la vue) et les en-têtes ETag / Last-Modified (après)."""
+    enabled = CONDITIONAL_GET_ENABLED if enabled is None else enabled
+    if not enabled:
+        return
+
+    @app.before_request
+    def _conditional_check():
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        dependencies = dependencies_for(request.path)
+        if dependencies is None:
+            return None
+        try:
+            versions = current_versions(app)
+        except Exception:
+            # table data_versions absente (base non migrée) : réponse complète, sans validateurs
+            db.session.rollback()
+            return None
+        g.conditional = validators(versions, dependencies, request.path, request.query_string.decode('latin-1'))
+        if is_not_modified(*g.conditional, request.headers.get('If-None-Match'),
+                           request.headers.get('If-Modified-Since')):
+            return app.response_class(status=304)
+        return None
+
+    @app.after_request
+    def _conditional_headers(response):
+        conditional = g.pop('conditional', None)
+        if conditional is not None and response.status_code in (200, 304):
+            response.headers.update(conditional_headers(*conditional))
+        return response
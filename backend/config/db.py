@@ -1,7 +1,98 @@
 """
 Configuration de la base de données Flask-SQLAlchemy
 """
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from config.constant import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    SQLITE_WAL, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE, SQLITE_BUSY_TIMEOUT_MS
+)
 
 # Créer l'instance SQLAlchemy
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+
+def is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def engine_options(url) -> dict:
+    """Options du moteur SQLAlchemy (pool, pre-ping) adaptées au backend."""
+    url = make_url(url)
+    options = {'pool_pre_ping': DB_POOL_PRE_PING}
+    if url.get_backend_name() == 'sqlite':
+        options['connect_args'] = {
+            'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000.0,
+            'check_same_thread': False,
+        }
+        # SQLite en mémoire : pool à connexion unique, pas de taille de pool
+        if url.database in (None, '', ':memory:'):
+            return options
+    options.update({
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_recycle': DB_POOL_RECYCLE,
+    })
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """PRAGMA appliqués à chaque nouvelle connexion SQLite.
+
+    WAL laisse les lecteurs travailler pendant une écriture, synchronous=NORMAL
+    suffit en WAL, mmap réduit les copies en lecture et busy_timeout fait attendre
+    les écrivains concurrents au lieu d'échouer immédiatement.
+    """
+    # sqlite3, ou l'adaptateur aiosqlite de SQLAlchemy (point d'entrée ASGI)
+    if not isinstance(dbapi_connection, sqlite3.Connection) \
+            and not type(dbapi_connection).__module__.startswith('sqlalchemy.dialects.sqlite'):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        if SQLITE_WAL:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def init_db(app, database_url=None):
+    """Configure l'URL et le moteur de l'application puis initialise Flask-SQLAlchemy."""
+    url = database_url or app.config.get('SQLALCHEMY_DATABASE_URI') or DATABASE_URL
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(url))
+    db.init_app(app)
+    if is_sqlite(url):
+        with app.app_context():
+            event.listen(db.engine, 'connect', set_sqlite_pragmas)
+
+
+# Pilotes asynchrones équivalents (point d'entrée ASGI)
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg'}
+
+
+def async_database_url(url) -> str:
+    """URL équivalente avec le pilote asynchrone (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Pas de pilote asynchrone configuré pour {backend}")
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}').render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url=None):
+    """Moteur SQLAlchemy asynchrone avec les mêmes options de pool et PRAGMA que le moteur synchrone."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url(database_url or DATABASE_URL)
+    engine = create_async_engine(url, **engine_options(url))
+    if is_sqlite(url):
+        event.listen(engine.sync_engine, 'connect', set_sqlite_pragmas)
+    return engine
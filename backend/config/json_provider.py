@@ -0,0 +1,163 @@
+"""
+Encodage JSON des réponses de l'API (jsonify, ressources Flask-RESTful, point d'entrée ASGI).
+
+`FastJSONProvider` remplace le provider par défaut de Flask :
+
+- avec JSON_ENCODER=orjson (défaut, si orjson est installé), la sérialisation est
+  faite par orjson, directement en bytes ; les tableaux et scalaires NumPy sont
+  encodés nativement, sans passer par `.tolist()` ;
+- sinon, le module json standard, comme le provider de Flask.
+
+Dans les deux cas, les DataFrame et Series pandas sont acceptés dans les
+réponses : les agrégations de helpers/sales.py renvoient des DataFrame et c'est
+ici qu'elles sont sérialisées, colonne par colonne (`frame_records`), sans
+passer par `DataFrame.to_dict`. Les dates restent au format HTTP de Flask et
+les clés sont triées : la sortie est la même qu'avant (seule différence, avec
+orjson : NaN est écrit `null`, en JSON valide).
+
+Forme colonnes : avec `?shape=columns`, `shaped()` remplace chaque DataFrame de
+la réponse par `{col: valeurs}` (`frame_columns` : les colonnes numériques
+restent des tableaux NumPy, qu'orjson écrit directement) et chaque liste
+d'enregistrements (`[{col: v}, ...]`) par `{col: [v, ...]}` ; les noms de
+colonnes ne sont plus répétés à chaque ligne.
+"""
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from config.constant import JSON_ENCODER
+
+try:
+    import orjson
+except ImportError:  # optional dependency: standard json without it
+    orjson = None
+
+SHAPE_RECORDS = 'records'
+SHAPE_COLUMNS = 'columns'
+
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def http_date(value) -> str:
+    """Même sortie que werkzeug.http.http_date (naïf = UTC), sans passer par email.utils."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        hour, minute, second = value.hour, value.minute, value.second
+    else:
+        hour = minute = second = 0
+    return (f'{_WEEKDAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} '
+            f'{hour:02d}:{minute:02d}:{second:02d} GMT')
+
+
+def frame_columns(df) -> dict:
+    """{colonne: valeurs} : tableaux NumPy pour les colonnes numériques, listes pour les autres."""
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        columns[col] = np.ascontiguousarray(values) if values.dtype.kind in 'biuf' else df[col].tolist()
+    return columns
+
+
+def frame_records(df) -> list:
+    """[{colonne: valeur}, ...], construit à partir des colonnes (un `tolist()` par colonne)."""
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[col].tolist() for col in columns))]
+
+
+def encode_default(o):
+    """Types non natifs : pandas, NumPy (chemin json standard), dates au format HTTP."""
+    if isinstance(o, pd.DataFrame):
+        return frame_records(o)
+    if isinstance(o, pd.Series):
+        return o.tolist()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    if o is pd.NaT:
+        return None
+    if isinstance(o, (date, datetime)):
+        return http_date(o)
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provider JSON de Flask servi par orjson quand il est disponible."""
+
+    default = staticmethod(encode_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and JSON_ENCODER == 'orjson'
+
+    def _orjson_options(self, indent=None):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent=None) -> bytes:
+        if self.use_orjson:
+            return orjson.dumps(obj, default=encode_default, option=self._orjson_options(indent))
+        return self.dumps(obj, indent=indent).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        if self.use_orjson and set(kwargs) <= {'indent'}:
+            return self.dumps_bytes(obj, kwargs.get('indent')).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+def to_columns(obj):
+    """Forme colonnes, récursivement : DataFrame et listes d'enregistrements -> {colonne: valeurs}."""
+    if isinstance(obj, pd.DataFrame):
+        return frame_columns(obj)
+    if isinstance(obj, dict):
+        return {key: to_columns(value) for key, value in obj.items()}
+    if isinstance(obj, list) and obj and all(isinstance(row, dict) for row in obj):
+        keys = obj[0].keys()
+        if all(row.keys() == keys for row in obj):
+            return {key: [row[key] for row in obj] for key in keys}
+        return [to_columns(row) for row in obj]
+    return obj
+
+
+def requested_shape(args=None) -> str:
+    """Forme demandée par `?shape=` (records par défaut)."""
+    args = request.args if args is None else args
+    return SHAPE_COLUMNS if args.get('shape', SHAPE_RECORDS).lower() == SHAPE_COLUMNS else SHAPE_RECORDS
+
+
+def shaped(payload, shape=None):
+    """La réponse dans la forme demandée."""
+    shape = requested_shape() if shape is None else shape
+    return to_columns(payload) if shape == SHAPE_COLUMNS else payload
+
+
+def init_json(app, api=None):
+    """Installe le provider sur l'application et sur les ressources Flask-RESTful."""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    if api is not None:
+        @api.representation('application/json')
+        def output_json(data, code, headers=None):
+            response = app.json.response(data)
+            response.status_code = code
+            response.headers.extend(headers or {})
+            return response
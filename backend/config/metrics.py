@@ -0,0 +1,266 @@
+"""
+Instrumentation de l'API exposée au format texte Prometheus (GET /metrics).
+
+Activée par METRICS_ENABLED=1 (désactivée par défaut) :
+
+- `http_request_duration_seconds{method, route, status}` : histogramme de
+  latence par endpoint (gabarit de route, ex. `/api/produits/<string:route>`) ;
+- `http_request_sql_statements{route}` : requêtes SQL par requête HTTP (repère
+  les N+1) ; `sql_statement_duration_seconds{route}` : durée de chaque requête SQL,
+  comptée via les événements `before/after_cursor_execute` de SQLAlchemy et
+  attribuée à la route en cours (`background` hors requête : scheduler...) ;
+- `section_duration_seconds{section}` : sections pandas et modèles, mesurées avec
+  `timed("...")` (gestionnaire de contexte) ou `@timed_function("...")`.
+
+Désactivée, aucune de ces mesures n'est installée : pas de hook de requête, pas
+d'écouteur SQL, et `timed()` renvoie un gestionnaire de contexte vide partagé.
+
+Les valeurs sont propres à chaque processus (comme les autres statistiques de
+l'API) ; avec plusieurs workers gunicorn, chaque scrape voit le worker qui répond.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.constant import METRICS_ENABLED
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+BACKGROUND = 'background'
+
+# route de la requête en cours et compteurs SQL associés : [route, statements, seconds]
+_current_request: ContextVar[Optional[list]] = ContextVar('metrics_request', default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Histogramme à seaux fixes, une série par combinaison de labels."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [counts per bucket (+Inf last), sum, count]
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> Dict[Tuple, Tuple[list, float, int]]:
+        with self._lock:
+            return {labels: (list(counts), total, n) for labels, (counts, total, n) in self._series.items()}
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, (counts, total, n) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f'{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labels, labels)} {n}'
+
+
+class MetricsRegistry:
+    """Histogrammes de l'API et jauges calculées au moment du scrape."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.http_latency = Histogram('http_request_duration_seconds', 'HTTP request latency by endpoint',
+                                      ('method', 'route', 'status'))
+        self.http_sql = Histogram('http_request_sql_statements', 'SQL statements executed per HTTP request',
+                                  ('route',), COUNT_BUCKETS)
+        self.sql_latency = Histogram('sql_statement_duration_seconds', 'SQL statement duration by endpoint',
+                                     ('route',), SQL_BUCKETS)
+        self.sections = Histogram('section_duration_seconds', 'Duration of timed pandas / model sections',
+                                  ('section',))
+        self._gauges: Dict[str, tuple] = {}
+
+    @property
+    def histograms(self):
+        return (self.http_latency, self.http_sql, self.sql_latency, self.sections)
+
+    def clear(self):
+        for histogram in self.histograms:
+            histogram.clear()
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], float]):
+        """Jauge lue au scrape (`collect()` renvoie la valeur courante)."""
+        self._gauges[name] = (help_text, collect)
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.render())
+        for name, (help_text, collect) in sorted(self._gauges.items()):
+            try:
+                value = collect()
+            except Exception:
+                continue
+            if value is None:
+                continue
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {_format_value(value)}'])
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+class _Timer:
+    __slots__ = ('section', 'start')
+
+    def __init__(self, section: str):
+        self.section = section
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        metrics.sections.observe(time.perf_counter() - self.start, self.section)
+        return False
+
+
+_NOOP = nullcontext()
+
+
+def timed(section: str):
+    """`with timed("pandas.top_products"):` mesure la section (rien si les métriques sont désactivées)."""
+    return _Timer(section) if metrics.enabled else _NOOP
+
+
+def timed_function(section: str):
+    """Décorateur équivalent à `timed(section)` autour de chaque appel."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.sections.observe(time.perf_counter() - start, section)
+        return wrapper
+    return decorator
+
+
+# ----------------------------------------------------------------------------
+# Requêtes HTTP et SQL
+# ----------------------------------------------------------------------------
+
+def begin_request(route: str):
+    """Début d'une requête (Flask ou handler ASGI) : ouvre les compteurs SQL de la route."""
+    return _current_request.set([route, 0, 0.0])
+
+
+def end_request(token, method: str, status: int, elapsed: float):
+    current = _current_request.get()
+    _current_request.reset(token)
+    if current is None:
+        return
+    route, statements, _ = current
+    metrics.http_latency.observe(elapsed, method, route, str(status))
+    metrics.http_sql.observe(statements, route)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # one statement at a time per connection: a single start time
+    conn.info['metrics_query_start'] = time.perf_counter()
+
+
+def _handle_cursor_error(exception_context):
+    # failed statement: no after_cursor_execute, drop its start time
+    if exception_context.connection is not None:
+        exception_context.connection.info.pop('metrics_query_start', None)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop('metrics_query_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    current = _current_request.get()
+    if current is not None:
+        current[1] += 1
+        current[2] += elapsed
+    metrics.sql_latency.observe(elapsed, current[0] if current is not None else BACKGROUND)
+
+
+def _route_of(req) -> str:
+    rule = req.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def init_metrics(app, enabled: Optional[bool] = None):
+    """Installe les hooks de requête, les écouteurs SQL et la route /metrics."""
+    if enabled is not None:
+        metrics.enabled = enabled
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        if not metrics.enabled:
+            return Response('metrics disabled (METRICS_ENABLED=0)\n', status=404, mimetype='text/plain')
+        return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+    if not metrics.enabled:
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        # every engine, including the async engine's sync core (asgi.py)
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_cursor_error)
+
+    @app.before_request
+    def _metrics_begin():
+        g.metrics_start = time.perf_counter()
+        g.metrics_token = begin_request(_route_of(request))
+
+    @app.after_request
+    def _metrics_end(response):
+        token = g.pop('metrics_token', None)
+        if token is not None:
+            end_request(token, request.method, response.status_code, time.perf_counter() - g.pop('metrics_start'))
+        return response
@@ -0,0 +1,251 @@
+"""
+Profilage à la demande d'une requête Flask, en production.
+
+Actif uniquement si PROFILING_TOKEN est défini ; une requête est profilée si elle
+porte l'en-tête `X-Profile: <token>` (ou `?profile=<token>`) :
+
+- `sample` (défaut) : un thread échantillonne la pile du thread de la requête
+  toutes les PROFILING_SAMPLE_INTERVAL_MS et écrit des piles repliées
+  (`module:fonction;module:fonction N`), le format de flamegraph.pl, speedscope
+  ou inferno ; coût négligeable pour la requête profilée ;
+- `cprofile` (`X-Profile-Mode: cprofile` ou `?profile_mode=cprofile`) : cProfile
+  déterministe, statistiques `.prof` (pstats, snakeviz) ; plus précis mais
+  ralentit nettement la requête.
+
+Le résultat est écrit dans PROFILING_DIR (les PROFILING_KEEP_FILES plus récents
+sont gardés) et nommé dans l'en-tête `X-Profile-File` ; avec
+`X-Profile-Output: inline` (ou `?profile_output=inline`) il remplace le corps de
+la réponse.
+
+Garde-fous : au plus un profil à la fois et un profil par
+PROFILING_MIN_INTERVAL_SECONDS par worker (les autres requêtes sont servies
+normalement avec `X-Profile: rate-limited`), échantillonnage borné à
+PROFILING_MAX_SECONDS. Sans jeton, aucun hook n'est installé.
+
+Les handlers asynchrones de asgi.py ne sont pas couverts (ils partagent la boucle
+d'événements) ; les routes Flask, y compris servies par asgi.py, le sont.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+from flask import Response, g, request
+
+from config.constant import (
+    PROFILING_DIR,
+    PROFILING_KEEP_FILES,
+    PROFILING_MAX_SECONDS,
+    PROFILING_MIN_INTERVAL_SECONDS,
+    PROFILING_SAMPLE_INTERVAL_MS,
+    PROFILING_TOKEN,
+)
+
+MODES = ('sample', 'cprofile')
+MAX_STACK_DEPTH = 200
+PSTATS_LINES = 40
+
+
+def frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+def collapse_stack(frame, max_depth: int = MAX_STACK_DEPTH) -> str:
+    """Pile d'un frame, de la racine à la feuille, séparée par des `;`."""
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def collapsed_text(counts: Counter) -> str:
+    return ''.join(f'{stack} {count}\n' for stack, count in counts.most_common())
+
+
+class StackSampler:
+    """Échantillonne la pile d'un thread à intervalle fixe."""
+
+    def __init__(self, thread_id: int, interval: float, max_seconds: float = PROFILING_MAX_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self.counts[collapse_stack(frame)] += 1
+            self.samples += 1
+            del frame
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+
+class ProfileGate:
+    """Un profil à la fois, et au plus un toutes les `min_interval` secondes."""
+
+    def __init__(self, min_interval: float = PROFILING_MIN_INTERVAL_SECONDS):
+        self.min_interval = min_interval
+        self.last_started: Optional[float] = None
+        self.profiles = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        if not self._lock.acquire(blocking=False):
+            self.rate_limited += 1
+            return False
+        now = time.monotonic()
+        if self.last_started is not None and now - self.last_started < self.min_interval:
+            self._lock.release()
+            self.rate_limited += 1
+            return False
+        self.last_started = now
+        self.profiles += 1
+        return True
+
+    def release(self):
+        self._lock.release()
+
+    def stats(self) -> Dict[str, object]:
+        return {'profiles': self.profiles, 'rate_limited': self.rate_limited, 'min_interval_seconds': self.min_interval}
+
+
+class RequestProfile:
+    """Profil en cours d'une requête (échantillonneur ou cProfile)."""
+
+    def __init__(self, mode: str, sample_interval: float):
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.sampler = None
+        self.profiler = None
+        if mode == 'cprofile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.sampler = StackSampler(threading.get_ident(), sample_interval).start()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self.started
+        if self.profiler is not None:
+            self.profiler.disable()
+        else:
+            self.sampler.stop()
+
+    def text(self) -> str:
+        if self.profiler is None:
+            return collapsed_text(self.sampler.counts)
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(PSTATS_LINES)
+        return out.getvalue()
+
+    def save(self, directory: str, endpoint: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        name = f"{stamp}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', endpoint)}"
+        if self.profiler is not None:
+            name += '.prof'
+            self.profiler.dump_stats(os.path.join(directory, name))
+        else:
+            name += '.collapsed'
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+                f.write(collapsed_text(self.sampler.counts))
+        return name
+
+
+def prune_profiles(directory: str, keep: int = PROFILING_KEEP_FILES):
+    names = sorted(n for n in os.listdir(directory) if n.endswith(('.collapsed', '.prof')))
+    for name in names[:max(len(names) - keep, 0)]:
+        os.remove(os.path.join(directory, name))
+
+
+def _option(header: str, arg: str) -> Optional[str]:
+    return request.headers.get(header) or request.args.get(arg)
+
+
+def init_profiling(app, token: str = PROFILING_TOKEN, directory: str = PROFILING_DIR,
+                   min_interval: float = PROFILING_MIN_INTERVAL_SECONDS,
+                   sample_interval_ms: float = PROFILING_SAMPLE_INTERVAL_MS) -> Optional[ProfileGate]:
+    """Installe les hooks de profilage (rien sans jeton). Renvoie le limiteur, gardé dans app.extensions."""
+    if not token:
+        return None
+    gate = ProfileGate(min_interval)
+    app.extensions['profiling'] = gate
+    expected = token.encode()
+
+    @app.before_request
+    def _profile_begin():
+        supplied = _option('X-Profile', 'profile')
+        if not supplied or not hmac.compare_digest(supplied.encode(), expected):
+            return
+        mode = _option('X-Profile-Mode', 'profile_mode') or 'sample'
+        if mode not in MODES:
+            mode = 'sample'
+        if not gate.try_acquire():
+            g.profile_status = 'rate-limited'
+            return
+        try:
+            g.profile = RequestProfile(mode, sample_interval_ms / 1000.0)
+        except ValueError:
+            # another profiler is already active in this process (cProfile)
+            gate.release()
+            g.profile_status = 'unavailable'
+
+    @app.after_request
+    def _profile_end(response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            if 'profile_status' in g:
+                response.headers['X-Profile'] = g.pop('profile_status')
+            return response
+        name = None
+        try:
+            profile.stop()
+            name = profile.save(directory, request.endpoint or 'unmatched')
+            prune_profiles(directory)
+        except OSError as e:
+            app.logger.warning('profile not saved in %s: %s', directory, e)
+        finally:
+            gate.release()
+        if _option('X-Profile-Output', 'profile_output') == 'inline':
+            response = Response(profile.text(), mimetype='text/plain')
+        response.headers['X-Profile'] = profile.mode
+        if name is not None:
+            response.headers['X-Profile-File'] = name
+        response.headers['X-Profile-Duration-Ms'] = f'{profile.duration * 1000:.1f}'
+        if profile.sampler is not None:
+            response.headers['X-Profile-Samples'] = str(profile.sampler.samples)
+        return response
+
+    @app.teardown_request
+    def _profile_cleanup(exc):
+        # request aborted before after_request
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.stop()
+            gate.release()
+
+    return gate
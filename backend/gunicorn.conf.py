@@ -0,0 +1,71 @@
+"""
+Configuration gunicorn de l'API EcoMarché (python start.py, ou gunicorn -c gunicorn.conf.py).
+
+Avec SERVER_PRELOAD=1 (défaut), l'application est importée une seule fois, dans le
+master : migrations, données de test, CSV des ventes, feature store et modèles
+sont chargés avant le fork. Les workers partagent ensuite ces pages en
+copy-on-write au lieu de refaire chacun `initialize_database()`.
+
+- `when_ready` (master) : ferme les connexions du master, puis `gc.freeze()`
+  déplace les objets chargés hors du ramasse-miettes, dont les passages
+  écriraient dans leurs en-têtes et recopieraient les pages dans chaque worker ;
+- `post_fork` (worker) : pool de connexions et verrou du cache produits neufs ;
+- `post_worker_init` : mémoire du worker (rss / pss / uss / partagée) dans le log.
+
+Le scheduler des promotions tourne dans le master : un seul passage par
+intervalle, quel que soit le nombre de workers. Ce qu'il fait n'est visible des
+workers qu'à travers la base :
+
+- son `product_cache.invalidate` ne vide que le cache du master ; les workers
+  voient ses écritures par les compteurs `produits` / `promotions` de
+  `data_versions` (resynchronisation du cache produits à chaque lecture
+  versionnée, ou expiration PRODUCT_CACHE_TTL_SECONDS) ;
+- chaque passage incrémente le compteur `promotion_scheduler` :
+  `GET /api/promotions/scheduler`, servi par un worker, en déduit `running`,
+  `passes` et `last_pass_at` (les autres statistiques sont celles du worker).
+"""
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config.constant import (
+    SERVER_APP, SERVER_BIND, SERVER_PIDFILE, SERVER_PRELOAD, SERVER_THREADS, SERVER_TIMEOUT, SERVER_WORKERS
+)
+from helpers.memory import format_memory, process_memory
+
+wsgi_app = SERVER_APP
+bind = SERVER_BIND
+workers = SERVER_WORKERS
+worker_class = 'uvicorn.workers.UvicornWorker' if SERVER_APP.startswith('asgi:') else 'gthread'
+threads = SERVER_THREADS
+preload_app = SERVER_PRELOAD
+timeout = SERVER_TIMEOUT
+pidfile = SERVER_PIDFILE
+
+
+def when_ready(server):
+    if preload_app:
+        from app import app
+        from config.db import db
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        gc.collect()
+        gc.freeze()
+    server.log.info("Master %s: %s", os.getpid(), format_memory(process_memory()))
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import app
+        from config.db import db
+        from model.product_cache import product_cache
+        with app.app_context():
+            # the master's connections stay open for the master, the worker opens its own
+            db.engine.dispose(close=False)
+        product_cache.after_fork()
+
+
+def post_worker_init(worker):
+    worker.log.info("Worker %s: %s", worker.pid, format_memory(process_memory()))
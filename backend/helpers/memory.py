@@ -0,0 +1,84 @@
+"""
+Mémoire réelle des processus du serveur (master gunicorn et workers).
+
+Lecture de /proc/<pid>/smaps_rollup (Linux) :
+
+- `rss` : pages résidentes, y compris celles partagées avec le master ;
+- `pss` : part proportionnelle des pages partagées (somme des PSS = mémoire réelle) ;
+- `uss` : pages privées du processus (ce que coûte un worker de plus) ;
+- `shared` : pages encore partagées (copy-on-write intact).
+
+Sur un système sans /proc, les fonctions renvoient None / une liste vide.
+"""
+import os
+from typing import Dict, List, Optional
+
+SMAPS_FIELDS = {
+    'Rss': 'rss', 'Pss': 'pss',
+    'Shared_Clean': 'shared_clean', 'Shared_Dirty': 'shared_dirty',
+    'Private_Clean': 'private_clean', 'Private_Dirty': 'private_dirty',
+}
+
+
+def process_memory(pid: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """rss / pss / uss / shared (kB) d'un processus, None si indisponible."""
+    pid = os.getpid() if pid is None else pid
+    values = {name: 0 for name in SMAPS_FIELDS.values()}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in SMAPS_FIELDS:
+                    values[SMAPS_FIELDS[key]] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return {
+        'pid': pid,
+        'rss_kb': values['rss'],
+        'pss_kb': values['pss'],
+        'uss_kb': values['private_clean'] + values['private_dirty'],
+        'shared_kb': values['shared_clean'] + values['shared_dirty'],
+    }
+
+
+def child_pids(pid: int) -> List[int]:
+    """Processus dont le parent est `pid` (workers d'un master gunicorn)."""
+    children = []
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # "pid (comm) state ppid ..." ; comm peut contenir des espaces
+                ppid = int(f.read().rpartition(')')[2].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def worker_memory_report(master_pid: int) -> Dict[str, object]:
+    """Mémoire du master et de chacun de ses workers, avec les totaux."""
+    master = process_memory(master_pid)
+    workers = [m for m in (process_memory(pid) for pid in child_pids(master_pid)) if m is not None]
+    processes = ([master] if master is not None else []) + workers
+    return {
+        'master': master,
+        'workers': workers,
+        'total_rss_kb': sum(p['rss_kb'] for p in processes),
+        'total_pss_kb': sum(p['pss_kb'] for p in processes),
+        'avg_worker_uss_kb': sum(w['uss_kb'] for w in workers) / len(workers) if workers else 0,
+        'avg_worker_shared_kb': sum(w['shared_kb'] for w in workers) / len(workers) if workers else 0,
+    }
+
+
+def format_memory(mem: Optional[Dict[str, int]]) -> str:
+    if mem is None:
+        return 'mémoire indisponible'
+    return (f"rss={mem['rss_kb'] / 1024:.1f}MB pss={mem['pss_kb'] / 1024:.1f}MB "
+            f"uss={mem['uss_kb'] / 1024:.1f}MB shared={mem['shared_kb'] / 1024:.1f}MB")
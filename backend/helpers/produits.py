@@ -4,8 +4,11 @@ Logique métier pour la gestion des produits
 from flask import request, jsonify
 from datetime import datetime
 from config.db import db
-from model.ecomarche_db import Produit
+from model.ecomarche_db import Produit, catalog_changes
+from model.product_cache import product_cache, get_produit_dict
 from model.pricing_model import pricing_model
+from model.prediction_model import demand_model
+from config.constant import DEFAULT_PREDICTION_DAYS, MAX_PREDICTION_DAYS
 
 def get_all_produits():
     """
@@ -24,17 +27,38 @@ def get_all_produits():
     
     return response
 
+def get_produit_changes():
+    """
+    Changements du catalogue depuis ?since=<version> : produits et promotions
+    insérés ou modifiés, ids supprimés ; `version` est à renvoyer au prochain appel
+    """
+    response = {}
+    since = request.args.get('since', '0')
+    if not since.isdigit():
+        response['status'] = 'error'
+        response['error_description'] = 'since doit être un entier positif'
+        return response, 400
+    try:
+        changes = catalog_changes(int(since))
+        response['status'] = 'success'
+        response.update(changes)
+    except Exception as e:
+        response['status'] = 'error'
+        response['error_description'] = str(e)
+
+    return response
+
 def get_produit_by_id(produit_id):
     """
     Récupère un produit par son ID
     """
     response = {}
     try:
-        produit = Produit.query.filter_by(id=produit_id).first()
+        produit = get_produit_dict(produit_id)
         
         if produit:
             response['status'] = 'success'
-            response['produit'] = produit.to_dict()
+            response['produit'] = produit
         else:
             response['status'] = 'error'
             response['error_description'] = 'Produit non trouvé'
@@ -114,6 +138,7 @@ def update_produit(produit_id):
         
         # Sauvegarder les modifications
         db.session.commit()
+        product_cache.invalidate(produit_id)
         
         response['status'] = 'success'
         response['produit'] = produit.to_dict()
@@ -141,6 +166,7 @@ def delete_produit(produit_id):
         # Supprimer le produit
         db.session.delete(produit)
         db.session.commit()
+        product_cache.invalidate(produit_id)
         
         response['status'] = 'success'
         response['message'] = f'Produit {produit_id} supprimé avec succès'
@@ -153,15 +179,56 @@ def delete_produit(produit_id):
 
 def predict_demand():
     """
-    Endpoint de prédiction désactivé.
-    Cette API était utilisée pour prévoir la demande. La fonctionnalité a été
-    retirée côté frontend : renvoyer une réponse explicite 410 (Gone).
+    Prévoit la demande journalière de plusieurs produits en un seul lot
+
+    Corps JSON optionnel : { "product_ids": [1, 2], "days": 7 }
+    (ou "product_id" pour un seul produit ; tous les produits par défaut)
     """
-    response = {
-        'status': 'error',
-        'error_description': 'La fonctionnalité de prédiction de la demande a été désactivée',
-    }
-    return (response, 410)
+    response = {}
+    try:
+        data = request.get_json(silent=True) or {}
+
+        days = int(data.get('days', DEFAULT_PREDICTION_DAYS))
+        if days < 1 or days > MAX_PREDICTION_DAYS:
+            response['status'] = 'error'
+            response['error_description'] = f'days doit être compris entre 1 et {MAX_PREDICTION_DAYS}'
+            return response, 400
+
+        product_ids = data.get('product_ids')
+        if product_ids is None and data.get('product_id') is not None:
+            product_ids = [data['product_id']]
+
+        query = Produit.query
+        if product_ids is not None:
+            query = query.filter(Produit.id.in_(product_ids))
+        produits = query.order_by(Produit.id).all()
+
+        if product_ids is not None and not produits:
+            response['status'] = 'error'
+            response['error_description'] = 'Produit non trouvé'
+            return response
+
+        forecasts = demand_model.predict_batch(
+            [{'product_id': p.id, 'category_id': p.categorie_id, 'price': p.prix_unitaire} for p in produits],
+            days
+        )
+
+        response['status'] = 'success'
+        response['jours'] = days
+        response['previsions'] = [
+            {
+                'product_id': p.id,
+                'nom': p.nom,
+                'demande_totale': sum(f['prediction'] for f in forecasts[p.id]),
+                'previsions': forecasts[p.id]
+            }
+            for p in produits
+        ]
+    except Exception as e:
+        response['status'] = 'error'
+        response['error_description'] = str(e)
+
+    return response
 
 def calculate_pricing():
     """
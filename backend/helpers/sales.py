@@ -0,0 +1,560 @@
+"""
+Agrégations de l'historique des ventes pour les endpoints /api/sales/* et /api/kpi/*.
+
+Deux implémentations de la même interface, choisies par SALES_STORAGE :
+
+- `PandasSalesStore` (memory, défaut) : le CSV est chargé en DataFrame dans
+  chaque worker et agrégé avec pandas ;
+- `SqlSalesStore` (database) : l'historique est chargé une fois dans la table de
+  faits `ventes` et chaque agrégation est un GROUP BY exécuté par la base ; les
+  workers ne gardent aucune copie des données.
+
+Les deux renvoient les mêmes DataFrame (mêmes colonnes, mêmes valeurs) : les
+payloads des endpoints les contiennent tels quels, et c'est le provider JSON
+(config/json_provider.py) qui les sérialise, en enregistrements ou en colonnes.
+"""
+from datetime import datetime
+
+import pandas as pd
+from flask import current_app
+from sqlalchemy import case, delete, extract, func, insert, select
+
+from config.db import db
+from config.metrics import timed_function
+from model.ecomarche_db import Vente
+
+SALES_STORAGE_MEMORY = 'memory'
+SALES_STORAGE_DATABASE = 'database'
+
+SEASONS = ['DJF', 'MAM', 'JJA', 'SON']
+SEASON_MONTHS = {'DJF': (12, 1, 2), 'MAM': (3, 4, 5), 'JJA': (6, 7, 8), 'SON': (9, 10, 11)}
+SEASON_OF_MONTH = {m: season for season, months in SEASON_MONTHS.items() for m in months}
+
+# colonnes du CSV -> colonnes de la table `ventes`
+CSV_COLUMNS = {
+    'Date': 'date_vente',
+    'Product_Name': 'produit_nom',
+    'Product_ID': 'produit_code',
+    'Category': 'categorie',
+    'Daily_Sales': 'quantite',
+    'Unit_Price': 'prix_unitaire',
+}
+STRING_COLUMNS = ('Product_ID', 'Product_Name', 'Category')
+
+
+def is_columnar(path):
+    return str(path).endswith('.parquet')
+
+
+def read_sales_file(path):
+    """Historique des ventes depuis un CSV ou un fichier Parquet (SALES_CSV_PATH), `Date` en datetime."""
+    if is_columnar(path):
+        df = pd.read_parquet(path)
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df
+    return pd.read_csv(path, parse_dates=['Date'])
+
+
+def month_to_season(month):
+    for season, months in SEASON_MONTHS.items():
+        if month in months:
+            return season
+    return None
+
+
+def compact_sales_frame(sales_df):
+    """Convertit les colonnes texte (Product_ID, Product_Name, Category) en catégories.
+
+    Chaque cellule texte est un objet Python dont le compteur de références est
+    modifié à chaque groupby : après un fork, les pages qui le contiennent sont
+    recopiées dans chaque worker. En catégories, les données sont des codes entiers
+    dans des tableaux numpy (quelques centaines de chaînes au plus), que les workers
+    lisent sans les recopier. Les agrégations renvoient les mêmes enregistrements.
+    """
+    for column in STRING_COLUMNS:
+        if column in sales_df.columns and not isinstance(sales_df[column].dtype, pd.CategoricalDtype):
+            sales_df[column] = sales_df[column].astype('category')
+    return sales_df
+
+
+def get_sales_store():
+    """Store des ventes de l'application courante (None si aucune donnée)."""
+    return getattr(current_app, 'sales_store', None)
+
+
+def create_sales_store(mode, sales_df=None):
+    """Construit le store pour le mode SALES_STORAGE ; None si aucune donnée n'est disponible."""
+    if mode == SALES_STORAGE_DATABASE:
+        store = SqlSalesStore()
+        return store if store.row_count() > 0 else None
+    return PandasSalesStore(sales_df) if sales_df is not None else None
+
+
+class PandasSalesStore:
+    """Agrégations pandas sur le DataFrame de l'historique des ventes."""
+
+    storage = SALES_STORAGE_MEMORY
+
+    def __init__(self, sales_df):
+        self.df = sales_df
+        self.df['Daily_Sales'] = pd.to_numeric(self.df['Daily_Sales'], errors='coerce').fillna(0)
+        if 'Unit_Price' in self.df.columns:
+            self.df['Unit_Price'] = pd.to_numeric(self.df['Unit_Price'], errors='coerce')
+
+    @property
+    def columns(self):
+        return self.df.columns
+
+    def row_count(self):
+        return len(self.df)
+
+    def _daily(self):
+        df = self.df
+        return df.groupby(df['Date'].dt.date)['Daily_Sales'].sum()
+
+    def daily_totals(self, last=None):
+        daily = self._daily().rename_axis('Date').reset_index()
+        if last is not None:
+            daily = daily.tail(last)
+        return daily
+
+    def avg_daily_sales(self):
+        daily = self._daily()
+        return float(daily.mean()) if len(daily) > 0 else 0.0
+
+    def total_sales(self):
+        return float(self.df['Daily_Sales'].sum())
+
+    def total_revenue(self):
+        if 'Unit_Price' not in self.df.columns:
+            return 0.0
+        return float((self.df['Unit_Price'].fillna(0) * self.df['Daily_Sales']).sum())
+
+    def top_products(self, n=10):
+        totals = self.df.groupby('Product_Name', observed=True)['Daily_Sales'].sum().reset_index()
+        return totals.sort_values('Daily_Sales', ascending=False).head(n)
+
+    def top_categories(self, n=5):
+        if 'Category' not in self.df.columns:
+            return pd.DataFrame(columns=['Category', 'Daily_Sales'])
+        totals = self.df.groupby('Category', observed=True)['Daily_Sales'].sum().reset_index()
+        return totals.sort_values('Daily_Sales', ascending=False).head(n)
+
+    def monthly_totals(self, last=None):
+        df = self.df
+        year_month = df['Date'].dt.to_period('M').dt.to_timestamp().rename('YearMonth')
+        monthly = df.groupby(year_month)['Daily_Sales'].sum().reset_index().sort_values('YearMonth')
+        if last is not None:
+            monthly = monthly.tail(last)
+        return monthly
+
+    def month_totals(self):
+        df = self.df
+        month = df['Date'].dt.month.rename('Month')
+        return df.groupby(month)['Daily_Sales'].sum().reset_index().sort_values('Month')
+
+    def category_month_totals(self, categories):
+        df = self.df[self.df['Category'].isin(categories)]
+        month = df['Date'].dt.month.rename('Month')
+        return df.groupby([month, 'Category'], observed=True)['Daily_Sales'].sum().reset_index()
+
+    def season_top_products(self, n=10):
+        df = self.df
+        season = df['Date'].dt.month.map(month_to_season).rename('Season')
+        grouped = df.groupby([season, 'Product_Name'], observed=True)['Daily_Sales'].sum().reset_index()
+        return {
+            s: grouped[grouped['Season'] == s].sort_values('Daily_Sales', ascending=False).head(n)
+            for s in SEASONS
+        }
+
+    def median_unit_price(self):
+        if 'Unit_Price' not in self.df.columns:
+            return 0.0
+        return float(self.df['Unit_Price'].median())
+
+    def product_daily_avg(self):
+        """Moyenne, par produit, des ventes journalières (somme par date puis moyenne)."""
+        df = self.df
+        per_day = df.groupby(['Product_Name', df['Date'].dt.date], observed=True)['Daily_Sales'].sum()
+        return {name: float(v) for name, v in per_day.groupby(level=0, observed=True).mean().items()}
+
+    @timed_function('sales.rollup')
+    def rollup(self):
+        """Toutes les agrégations du dashboard à partir d'un seul passage sur le DataFrame."""
+        df = self.df
+        keys = [df['Date'].dt.normalize().rename('Day'), 'Product_Name']
+        if 'Category' in df.columns:
+            keys.append('Category')
+        cube = df.groupby(keys, observed=True, dropna=False)['Daily_Sales'].sum().reset_index()
+        return SalesRollup(cube, self, self.total_revenue())
+
+
+class SqlSalesStore:
+    """Les mêmes agrégations, compilées en GROUP BY sur la table `ventes`.
+
+    `session` : session SQLAlchemy à utiliser (par défaut `db.session` ; le point
+    d'entrée ASGI passe la session synchrone de son AsyncSession via `run_sync`).
+    """
+
+    storage = SALES_STORAGE_DATABASE
+    columns = ['Date', 'Product_Name', 'Category', 'Daily_Sales', 'Unit_Price']
+
+    def __init__(self, session=None):
+        self._session = session
+
+    @property
+    def session(self):
+        return self._session if self._session is not None else db.session
+
+    def _all(self, query):
+        return self.session.execute(query).all()
+
+    @staticmethod
+    def _frame(rows, columns):
+        return pd.DataFrame(rows, columns=columns)
+
+    def row_count(self):
+        return self.session.execute(select(func.count()).select_from(Vente)).scalar_one()
+
+    def _daily(self):
+        return select(Vente.date_vente.label('day'), func.sum(Vente.quantite).label('total')) \
+            .group_by(Vente.date_vente)
+
+    def daily_totals(self, last=None):
+        query = self._daily().order_by(Vente.date_vente.desc())
+        if last is not None:
+            query = query.limit(last)
+        return self._frame([(day, float(total)) for day, total in reversed(self._all(query))], ['Date', 'Daily_Sales'])
+
+    def avg_daily_sales(self):
+        daily = self._daily().subquery()
+        value = self.session.execute(select(func.avg(daily.c.total))).scalar()
+        return float(value) if value is not None else 0.0
+
+    def total_sales(self):
+        return float(self.session.execute(select(func.coalesce(func.sum(Vente.quantite), 0))).scalar())
+
+    def total_revenue(self):
+        revenue = func.sum(func.coalesce(Vente.prix_unitaire, 0) * Vente.quantite)
+        return float(self.session.execute(select(func.coalesce(revenue, 0))).scalar())
+
+    def _top(self, column, key, n):
+        total = func.sum(Vente.quantite).label('total')
+        query = select(column, total).where(column.isnot(None)).group_by(column) \
+            .order_by(total.desc(), column).limit(n)
+        return self._frame([(value, float(t)) for value, t in self._all(query)], [key, 'Daily_Sales'])
+
+    def top_products(self, n=10):
+        return self._top(Vente.produit_nom, 'Product_Name', n)
+
+    def top_categories(self, n=5):
+        return self._top(Vente.categorie, 'Category', n)
+
+    def monthly_totals(self, last=None):
+        year, month = extract('year', Vente.date_vente), extract('month', Vente.date_vente)
+        query = select(year, month, func.sum(Vente.quantite)).group_by(year, month) \
+            .order_by(year.desc(), month.desc())
+        if last is not None:
+            query = query.limit(last)
+        return self._frame([(datetime(int(y), int(m), 1), float(t)) for y, m, t in reversed(self._all(query))],
+                           ['YearMonth', 'Daily_Sales'])
+
+    def month_totals(self):
+        month = extract('month', Vente.date_vente)
+        query = select(month, func.sum(Vente.quantite)).group_by(month).order_by(month)
+        return self._frame([(int(m), float(t)) for m, t in self._all(query)], ['Month', 'Daily_Sales'])
+
+    def category_month_totals(self, categories):
+        month = extract('month', Vente.date_vente)
+        query = select(month, Vente.categorie, func.sum(Vente.quantite)) \
+            .where(Vente.categorie.in_(list(categories))) \
+            .group_by(month, Vente.categorie).order_by(month, Vente.categorie)
+        return self._frame([(int(m), c, float(t)) for m, c, t in self._all(query)],
+                           ['Month', 'Category', 'Daily_Sales'])
+
+    def season_top_products(self, n=10):
+        month = extract('month', Vente.date_vente)
+        season = case(*[(month.in_(months), name) for name, months in SEASON_MONTHS.items()])
+        grouped = select(season.label('season'), Vente.produit_nom.label('produit'),
+                         func.sum(Vente.quantite).label('total')) \
+            .group_by(season, Vente.produit_nom).subquery()
+        rank = func.row_number().over(partition_by=grouped.c.season,
+                                      order_by=(grouped.c.total.desc(), grouped.c.produit)).label('rang')
+        ranked = select(grouped.c.season, grouped.c.produit, grouped.c.total, rank).subquery()
+        query = select(ranked.c.season, ranked.c.produit, ranked.c.total) \
+            .where(ranked.c.rang <= n).order_by(ranked.c.season, ranked.c.rang)
+        rows = {s: [] for s in SEASONS}
+        for s, produit, total in self._all(query):
+            rows[s].append((s, produit, float(total)))
+        return {s: self._frame(rows[s], ['Season', 'Product_Name', 'Daily_Sales']) for s in SEASONS}
+
+    def median_unit_price(self):
+        prices = select(Vente.prix_unitaire).where(Vente.prix_unitaire.isnot(None))
+        n = self.session.execute(select(func.count()).select_from(prices.subquery())).scalar_one()
+        if n == 0:
+            return float('nan')
+        middle = self._all(prices.order_by(Vente.prix_unitaire).offset((n - 1) // 2).limit(2 - n % 2))
+        return float(sum(p for (p,) in middle) / len(middle))
+
+    def product_daily_avg(self):
+        per_day = select(Vente.produit_nom.label('produit'), func.sum(Vente.quantite).label('total')) \
+            .group_by(Vente.produit_nom, Vente.date_vente).subquery()
+        query = select(per_day.c.produit, func.avg(per_day.c.total)).group_by(per_day.c.produit)
+        return {produit: float(avg) for produit, avg in self._all(query)}
+
+    @timed_function('sales.rollup')
+    def rollup(self):
+        """Toutes les agrégations du dashboard à partir d'un seul GROUP BY (jour, produit, catégorie)."""
+        query = select(Vente.date_vente, Vente.produit_nom, Vente.categorie, func.sum(Vente.quantite),
+                       func.sum(func.coalesce(Vente.prix_unitaire, 0) * Vente.quantite)) \
+            .group_by(Vente.date_vente, Vente.produit_nom, Vente.categorie)
+        cube = pd.DataFrame(self._all(query), columns=['Day', 'Product_Name', 'Category', 'Daily_Sales', 'Revenue'])
+        cube['Day'] = pd.to_datetime(cube['Day'])
+        cube['Daily_Sales'] = cube['Daily_Sales'].astype(float)
+        revenue = float(cube.pop('Revenue').astype(float).sum())
+        return SalesRollup(cube, self, revenue)
+
+
+class SalesRollup:
+    """Interface des stores, servie par un cube (jour, produit, catégorie) -> ventes.
+
+    Le cube est calculé une seule fois (`store.rollup()`) ; les panneaux du dashboard
+    en dérivent avec les mêmes builders que les endpoints, sans relire l'historique.
+    """
+
+    def __init__(self, cube, store, revenue):
+        self.cube = cube
+        self.store = store
+        self.storage = store.storage
+        self.columns = store.columns
+        self._revenue = revenue
+        self._median = None
+        self._totals = {}
+        self._month = cube['Day'].dt.month.rename('Month')
+        daily = cube.groupby('Day')['Daily_Sales'].sum()
+        self._daily_by_day = daily
+        self._daily_series = pd.Series(daily.to_numpy(), index=pd.Index(daily.index.date, name='Date'),
+                                       name='Daily_Sales')
+
+    @property
+    def df(self):
+        # colonnes démographiques (by_age_groups) : seul le store mémoire les conserve
+        return self.store.df
+
+    def row_count(self):
+        return self.store.row_count()
+
+    def daily_totals(self, last=None):
+        daily = self._daily_series.reset_index()
+        if last is not None:
+            daily = daily.tail(last)
+        return daily
+
+    def avg_daily_sales(self):
+        return float(self._daily_series.mean()) if len(self._daily_series) > 0 else 0.0
+
+    def total_sales(self):
+        return float(self.cube['Daily_Sales'].sum())
+
+    def total_revenue(self):
+        return self._revenue
+
+    def _top(self, column, n):
+        if column not in self._totals:
+            self._totals[column] = self.cube.groupby(column, observed=True)['Daily_Sales'].sum().reset_index()
+        totals = self._totals[column]
+        return totals.sort_values('Daily_Sales', ascending=False).head(n)
+
+    def top_products(self, n=10):
+        return self._top('Product_Name', n)
+
+    def top_categories(self, n=5):
+        if 'Category' not in self.cube.columns:
+            return pd.DataFrame(columns=['Category', 'Daily_Sales'])
+        return self._top('Category', n)
+
+    def monthly_totals(self, last=None):
+        daily = self._daily_by_day
+        year_month = daily.index.to_period('M').to_timestamp().rename('YearMonth')
+        monthly = daily.groupby(year_month).sum().reset_index().sort_values('YearMonth')
+        if last is not None:
+            monthly = monthly.tail(last)
+        return monthly
+
+    def month_totals(self):
+        daily = self._daily_by_day
+        return daily.groupby(daily.index.month.rename('Month')).sum().reset_index().sort_values('Month')
+
+    def category_month_totals(self, categories):
+        selected = self.cube['Category'].isin(categories)
+        cube, month = self.cube[selected], self._month[selected]
+        return cube.groupby([month, 'Category'], observed=True)['Daily_Sales'].sum().reset_index()
+
+    def season_top_products(self, n=10):
+        cube = self.cube
+        season = self._month.map(SEASON_OF_MONTH).rename('Season')
+        grouped = cube.groupby([season, 'Product_Name'], observed=True)['Daily_Sales'].sum().reset_index()
+        return {
+            s: grouped[grouped['Season'] == s].sort_values('Daily_Sales', ascending=False).head(n)
+            for s in SEASONS
+        }
+
+    def median_unit_price(self):
+        if self._median is None:
+            self._median = self.store.median_unit_price()
+        return self._median
+
+    def product_daily_avg(self):
+        cube = self.cube
+        per_day = cube.groupby(['Product_Name', 'Day'], observed=True)['Daily_Sales'].sum()
+        return {name: float(v) for name, v in per_day.groupby(level=0, observed=True).mean().items()}
+
+
+# ----------------------------------------------------------------------------
+# Réponses des endpoints (partagées par l'application Flask et le point d'entrée ASGI)
+# ----------------------------------------------------------------------------
+
+AGE_BUCKETS = ['18-25', '26-45', '46-65', '65+']
+
+
+@timed_function('sales.summary')
+def summary_payload(store):
+    # return last 90 days
+    return {'daily': store.daily_totals(last=90)}
+
+
+@timed_function('sales.top_products')
+def top_products_payload(store):
+    return {'top_products': store.top_products(10)}
+
+
+@timed_function('sales.kpi_overview')
+def kpi_overview_payload(store):
+    return {
+        # Total revenue (approx): sum(unit_price * daily_sales)
+        'total_revenue': store.total_revenue(),
+        # Average daily sales (overall)
+        'avg_daily_sales': store.avg_daily_sales(),
+        # Top categories by sales
+        'top_categories': store.top_categories(5),
+        # Monthly series (last 12 months)
+        'monthly_series': store.monthly_totals(last=12)
+    }
+
+
+@timed_function('sales.seasonality')
+def seasonality_payload(store):
+    # optionally breakdown by top categories
+    category_season = None
+    if 'Category' in store.columns:
+        top_cats = store.top_categories(5)['Category'].tolist()
+        category_season = store.category_month_totals(top_cats)
+    return {'seasonality_by_month': store.month_totals(), 'category_season': category_season}
+
+
+@timed_function('sales.popular_by_season')
+def popular_by_season_payload(store):
+    return {'popular_by_season': store.season_top_products(10)}
+
+
+@timed_function('sales.by_age_groups')
+def by_age_groups_payload(store):
+    # Check for real demographic columns (only kept by the in-memory dataset)
+    age_col = None
+    for candidate in ['Age', 'User_Age', 'Customer_Age']:
+        if candidate in store.columns:
+            age_col = candidate
+            break
+
+    if age_col:
+        df = store.df
+        age_bucket = pd.cut(df[age_col], bins=[0, 25, 45, 65, 200], labels=AGE_BUCKETS, right=True).rename('age_bucket')
+        overall = df.groupby(age_bucket, observed=False)['Daily_Sales'].sum().reset_index()
+    else:
+        # synthetic distribution: percentages
+        total_sales = store.total_sales()
+        # deterministic distribution
+        shares = [0.20, 0.45, 0.25, 0.10]
+        overall = pd.DataFrame({'age_bucket': AGE_BUCKETS, 'Daily_Sales': [total_sales * share for share in shares]})
+
+    # also provide top products with age split (synthetic)
+    top_products_list = []
+    top = store.top_products(10)
+    for prod, sales in zip(top['Product_Name'].tolist(), top['Daily_Sales'].tolist()):
+        sales = float(sales)
+        # distribute sales across age groups proportionally but deterministic using hash
+        h = abs(hash(prod))
+        # create slight variation
+        weights = [0.2 + ((h % 10) / 100.0), 0.45 - ((h % 7) / 100.0), 0.25 + ((h % 5) / 100.0), 0.10]
+        svals = [sales * w / sum(weights) for w in weights]
+        top_products_list.append({'product': prod, 'total_sales': sales,
+                                  'by_age': [{'age_bucket': b, 'sales': v} for b, v in zip(AGE_BUCKETS, svals)]})
+
+    return {'overall_by_age': overall, 'top_products_by_age': top_products_list}
+
+
+@timed_function('sales.dashboard')
+def dashboard_sales_payload(store):
+    """Panneaux ventes / KPI du dashboard, chacun identique à la réponse de son endpoint."""
+    return {name: build(store) for name, build in DASHBOARD_SALES_PANELS.items()}
+
+
+SALES_ENDPOINTS = {
+    '/api/sales/summary': summary_payload,
+    '/api/sales/top_products': top_products_payload,
+    '/api/kpi/overview': kpi_overview_payload,
+    '/api/sales/seasonality': seasonality_payload,
+    '/api/sales/popular_by_season': popular_by_season_payload,
+    '/api/sales/by_age_groups': by_age_groups_payload,
+}
+
+
+def _table_records(chunk):
+    frame = pd.DataFrame({
+        target: chunk[source] for source, target in CSV_COLUMNS.items() if source in chunk.columns
+    })
+    frame['date_vente'] = pd.to_datetime(frame['date_vente'], errors='coerce').dt.date
+    frame['quantite'] = pd.to_numeric(frame['quantite'], errors='coerce').fillna(0).astype(float)
+    if 'prix_unitaire' in frame.columns:
+        frame['prix_unitaire'] = pd.to_numeric(frame['prix_unitaire'], errors='coerce')
+    if 'produit_code' in frame.columns:
+        frame['produit_code'] = frame['produit_code'].astype(str)
+    frame = frame.dropna(subset=['date_vente', 'produit_nom'])
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient='records')
+
+
+def load_sales_table(source, chunksize=50000, replace=False):
+    """Charge l'historique (chemin CSV / Parquet ou DataFrame) dans `ventes` par lots ; renvoie le nombre de lignes.
+
+    Les lignes sans date ou sans nom de produit sont ignorées. Une seule transaction.
+    """
+    if not isinstance(source, pd.DataFrame) and is_columnar(source):
+        source = read_sales_file(source)
+    if isinstance(source, pd.DataFrame):
+        chunks = (source.iloc[i:i + chunksize] for i in range(0, len(source), chunksize))
+    else:
+        chunks = pd.read_csv(source, chunksize=chunksize)
+    inserted = 0
+    try:
+        if replace:
+            db.session.execute(delete(Vente))
+        for chunk in chunks:
+            records = _table_records(chunk)
+            if records:
+                db.session.execute(insert(Vente), records)
+                inserted += len(records)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return inserted
+
+# panneau du snapshot (/api/dashboard/snapshot) -> builder de l'endpoint correspondant
+DASHBOARD_SALES_PANELS = {
+    'summary': summary_payload,
+    'top_products': top_products_payload,
+    'kpi_overview': kpi_overview_payload,
+    'seasonality': seasonality_payload,
+    'popular_by_season': popular_by_season_payload,
+    'by_age_groups': by_age_groups_payload,
+}
@@ -0,0 +1,167 @@
+"""
+Service des fichiers statiques du frontend Angular (build dans ecomarche-frontend/dist).
+
+Au démarrage, `StaticManifest.build` parcourt le dossier une seule fois et garde
+en mémoire, pour chaque fichier : type MIME, ETag (hash du contenu), contenu
+(jusqu'à STATIC_INLINE_MAX_BYTES) et variantes compressées. Une requête ne fait
+alors plus aucun appel système :
+
+- variantes : fichiers `.br` / `.gz` voisins produits au build
+  (scripts/compress_frontend.py) ; à défaut, une variante gzip est calculée au
+  démarrage pour les fichiers texte. La meilleure variante acceptée par le client
+  (Accept-Encoding) est servie, avec `Vary: Accept-Encoding` ;
+- cache : les bundles dont le nom contient un hash (`main-5INURTSO.js`) sont
+  `immutable` pour un an ; `index.html` est revalidé à chaque chargement
+  (`no-cache` + ETag, réponse 304 si inchangé) ; les autres fichiers ont un
+  max-age court (STATIC_MAX_AGE) ;
+- routage Angular : un chemin inconnu renvoie `index.html`.
+
+Le manifeste reflète le build présent au démarrage : redémarrer l'API après un
+nouveau `ng build`.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from flask import Response, send_file
+from werkzeug.http import quote_etag
+
+from config.constant import STATIC_IMMUTABLE_MAX_AGE, STATIC_INLINE_MAX_BYTES, STATIC_MAX_AGE
+
+# préférence du serveur, de la meilleure à la moins bonne
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+INDEX_FILES = ('index.html', 'index.csr.html')
+# hash de contenu dans le nom (esbuild : main-5INURTSO.js, webpack : main.3f2a9c1d0b.js)
+HASHED_NAME = re.compile(r'[-.](?=[A-Za-z]*\d)[A-Za-z0-9]{8,}\.[A-Za-z0-9]+$')
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+MIN_COMPRESS_BYTES = 1024
+
+
+def is_hashed(name: str) -> bool:
+    return HASHED_NAME.search(name) is not None
+
+
+def is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def content_etag(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=10).hexdigest()
+
+
+class Asset:
+    """Un fichier du build et ses variantes (encodage -> (contenu ou chemin, taille))."""
+
+    __slots__ = ('path', 'mimetype', 'etag', 'cache_control', 'variants')
+
+    def __init__(self, path, mimetype, etag, cache_control):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = etag
+        self.cache_control = cache_control
+        self.variants: Dict[str, tuple] = {}
+
+
+class StaticManifest:
+    """Index en mémoire du build du frontend."""
+
+    def __init__(self, root: str, index: Optional[str]):
+        self.root = root
+        self.index = index
+        self.assets: Dict[str, Asset] = {}
+
+    @classmethod
+    def build(cls, dist_dir: str, compress_missing: bool = True) -> Optional['StaticManifest']:
+        """Manifeste du build (None si le dossier n'existe pas).
+
+        Le nouveau builder Angular écrit les fichiers du navigateur dans `<dist>/browser`.
+        """
+        root = os.path.join(dist_dir, 'browser') if os.path.isdir(os.path.join(dist_dir, 'browser')) else dist_dir
+        if not os.path.isdir(root):
+            return None
+        manifest = cls(root, None)
+        for directory, _, files in os.walk(root):
+            names = set(files)
+            for name in files:
+                if any(name.endswith(suffix) and name[:-len(suffix)] in names for _, suffix in ENCODINGS):
+                    continue  # variante d'un autre fichier
+                path = os.path.join(directory, name)
+                rel = os.path.relpath(path, root).replace(os.sep, '/')
+                manifest.assets[rel] = manifest._load(path, name, names, compress_missing)
+        manifest.index = next((name for name in INDEX_FILES if name in manifest.assets), None)
+        return manifest
+
+    def _load(self, path, name, siblings, compress_missing):
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        with open(path, 'rb') as f:
+            data = f.read()
+        if name in INDEX_FILES:
+            cache_control = 'no-cache'
+        elif is_hashed(name):
+            cache_control = f'public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            cache_control = f'public, max-age={STATIC_MAX_AGE}'
+        asset = Asset(path, mimetype, content_etag(data), cache_control)
+        inline = len(data) <= STATIC_INLINE_MAX_BYTES
+        asset.variants['identity'] = (data if inline else path, len(data))
+        for encoding, suffix in ENCODINGS:
+            if name + suffix in siblings:
+                variant_path = path + suffix
+                if inline:
+                    with open(variant_path, 'rb') as f:
+                        asset.variants[encoding] = (f.read(), os.path.getsize(variant_path))
+                else:
+                    asset.variants[encoding] = (variant_path, os.path.getsize(variant_path))
+        if compress_missing and inline and 'gzip' not in asset.variants \
+                and len(data) >= MIN_COMPRESS_BYTES and is_compressible(mimetype):
+            compressed = gzip.compress(data, compresslevel=6, mtime=0)
+            if len(compressed) < len(data):
+                asset.variants['gzip'] = (compressed, len(compressed))
+        return asset
+
+    def lookup(self, path: str) -> Optional[Asset]:
+        """Fichier demandé, ou index.html (routage Angular)."""
+        asset = self.assets.get(path) if path else None
+        if asset is None and self.index is not None:
+            asset = self.assets[self.index]
+        return asset
+
+    @staticmethod
+    def negotiate(asset: Asset, accept_encodings) -> str:
+        for encoding, _ in ENCODINGS:
+            if encoding in asset.variants and accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self, path: str, request) -> Optional[Response]:
+        """Réponse pour `path` (None si le build ne contient aucun fichier à servir)."""
+        asset = self.lookup(path)
+        if asset is None:
+            return None
+        encoding = self.negotiate(asset, request.accept_encodings)
+        content, _ = asset.variants[encoding]
+        if isinstance(content, bytes):
+            response = Response(content, mimetype=asset.mimetype)
+        else:
+            response = send_file(content, mimetype=asset.mimetype, conditional=False, etag=False)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        if len(asset.variants) > 1:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = asset.cache_control
+        # une variante compressée est une autre représentation : ETag distinct
+        response.headers['ETag'] = quote_etag(asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}')
+        return response.make_conditional(request)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'root': self.root,
+            'index': self.index,
+            'files': len(self.assets),
+            'immutable': sum(1 for a in self.assets.values() if 'immutable' in a.cache_control),
+            'bytes': sum(a.variants['identity'][1] for a in self.assets.values()),
+            'variants': {enc: sum(1 for a in self.assets.values() if enc in a.variants) for enc, _ in ENCODINGS},
+        }
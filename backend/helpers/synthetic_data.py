@@ -0,0 +1,180 @@
+"""
+Génération vectorisée d'un catalogue et d'un historique de ventes synthétiques
+(tests de charge, benchmarks), à l'échelle voulue.
+
+- `generate_products(n)` : N produits répartis dans les catégories de CATEGORIES,
+  avec fournisseurs, prix et durées de conservation propres à chaque catégorie
+  (quelques jours pour le pain ou le poisson, des mois pour l'épicerie) ; une
+  partie du stock est proche de la péremption, voire périmée ;
+- `generate_sales(products, rows)` : historique au format du CSV des ventes
+  (Date, Product_ID, Product_Name, Category, Daily_Sales, Unit_Price), une ligne
+  par produit et par jour, avec saisonnalité annuelle par catégorie, effet
+  week-end et popularité des produits log-normale (longue traîne). Les noms correspondent au
+  catalogue : le feature store et les recommandations retrouvent les produits.
+
+Aucune boucle Python par ligne : 1 million de lignes sont générées en moins
+d'une seconde (l'écriture du CSV domine).
+"""
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, insert
+
+from config.constant import CATEGORIES
+from config.db import db
+from model.ecomarche_db import Produit, Promotion, PromotionArchive
+from model.product_cache import product_cache
+
+# par catégorie : noms de base, fournisseurs, prix médian, durée de conservation (jours),
+# amplitude et jour de pic de la saisonnalité annuelle
+CATALOG = {
+    1: (['Lait entier', 'Yaourt nature', 'Fromage blanc', 'Beurre doux', 'Crème fraîche', 'Emmental râpé'],
+        ['Ferme Duval', 'Laiterie du Val', 'Coopérative Laitière'], 1.6, 12, 0.10, 30),
+    2: (['Baguette tradition', 'Pain complet', 'Croissant', 'Pain de mie', 'Brioche', 'Pain aux céréales'],
+        ['Boulangerie Martin', 'Fournil du Centre'], 1.5, 3, 0.05, 350),
+    3: (['Pommes Golden', 'Bananes', 'Oranges', 'Fraises', 'Mangues', 'Ananas', 'Raisin blanc'],
+        ['Vergers Bio', 'Importation Équitable', 'Primeur du Marché'], 1.8, 10, 0.35, 170),
+    4: (['Carottes', 'Tomates', 'Courgettes', 'Salade verte', 'Oignons', 'Poivrons', 'Aubergines'],
+        ['Ferme Bio Locale', 'Ferme des Légumes', 'Maraîchers Réunis'], 1.4, 8, 0.30, 200),
+    5: (['Steak haché', 'Poulet fermier', 'Côtes de porc', 'Saucisses', 'Rôti de bœuf'],
+        ['Boucherie Centrale', 'Volailles du Sud'], 6.5, 5, 0.15, 190),
+    6: (['Saumon frais', 'Filet de cabillaud', 'Crevettes', 'Thon rouge', 'Sardines'],
+        ['Pêcherie Maritime', 'Criée du Port'], 9.0, 3, 0.15, 80),
+    7: (['Pâtes complètes', 'Riz basmati', 'Farine de blé', 'Huile d\'olive', 'Sucre', 'Lentilles', 'Café moulu'],
+        ['Épicerie Italienne', 'Grossiste Alimentaire', 'Comptoir des Épices'], 2.5, 270, 0.05, 330),
+    8: (['Jus d\'orange', 'Eau minérale', 'Soda cola', 'Thé glacé', 'Jus de mangue'],
+        ['Fruits Pressés', 'Sources Claires', 'Boissons du Monde'], 1.8, 120, 0.40, 195),
+    9: (['Pizza surgelée', 'Légumes surgelés', 'Glace vanille', 'Frites surgelées', 'Poisson pané'],
+        ['Surgelés Express', 'Froid Gourmand'], 3.5, 180, 0.30, 200),
+    10: (['Savon bio', 'Shampooing', 'Dentifrice', 'Gel douche', 'Lessive'],
+         ['Cosmétiques Naturels', 'Hygiène Plus'], 3.0, 540, 0.05, 0),
+}
+VARIANTS = ['', 'Bio', 'Premium', 'Éco', 'Familial', 'Local', 'Lot de 2', 'Maxi']
+WEEKEND_FACTOR = 1.25
+POPULARITY_LOG_MEAN, POPULARITY_LOG_SIGMA = 2.0, 0.9  # ventes journalières moyennes : médiane ~7, longue traîne
+
+
+def _category_arrays():
+    ids = np.array(sorted(CATALOG))
+    prices = np.array([CATALOG[c][2] for c in ids])
+    shelf = np.array([CATALOG[c][3] for c in ids])
+    amplitude = np.array([CATALOG[c][4] for c in ids])
+    peak = np.array([CATALOG[c][5] for c in ids])
+    return ids, prices, shelf, amplitude, peak
+
+
+def generate_products(n: int, seed: int = 0, today: Optional[date] = None) -> pd.DataFrame:
+    """Catalogue de `n` produits (colonnes de la table `produits`, sans id)."""
+    rng = np.random.default_rng(seed)
+    today = today or date.today()
+    ids, prices, shelf, _, _ = _category_arrays()
+    weights = np.array([len(CATALOG[c][0]) for c in ids], dtype=float)
+    cat_index = rng.choice(len(ids), size=n, p=weights / weights.sum())
+    categorie_id = ids[cat_index]
+
+    # nom : produit de base + variante, numéroté au-delà des combinaisons disponibles
+    names = np.empty(n, dtype=object)
+    suppliers = np.empty(n, dtype=object)
+    for k, cat in enumerate(ids):
+        rows = np.flatnonzero(cat_index == k)
+        if not len(rows):
+            continue
+        bases, fournisseurs = CATALOG[cat][0], CATALOG[cat][1]
+        combos = np.array([f'{b} {v}'.strip() for v in VARIANTS for b in bases], dtype=object)
+        order = np.arange(len(rows))
+        labels = combos[order % len(combos)]
+        series = order // len(combos)
+        labels = np.where(series > 0, labels + ' ' + (series + 1).astype(str).astype(object), labels)
+        names[rows] = labels
+        suppliers[rows] = np.asarray(fournisseurs, dtype=object)[rng.integers(0, len(fournisseurs), len(rows))]
+
+    prix = np.round(prices[cat_index] * rng.lognormal(0.0, 0.35, n), 2)
+    # jours avant péremption : concentrés sur le début de la durée de conservation, ~5 % périmés
+    days_left = np.floor(shelf[cat_index] * rng.beta(1.3, 2.2, n)).astype(int)
+    expired = rng.random(n) < 0.05
+    days_left[expired] = -rng.integers(1, 4, int(expired.sum()))
+    stock = rng.negative_binomial(3, 0.1, n)
+    stock[rng.random(n) < 0.04] = 0
+    return pd.DataFrame({
+        'nom': names,
+        'categorie_id': categorie_id,
+        'stock': stock,
+        'prix_unitaire': prix,
+        'fournisseur': suppliers,
+        'date_peremption': (pd.Timestamp(today) + pd.to_timedelta(days_left, unit='D')).date,
+    })
+
+
+def generate_sales(products: pd.DataFrame, rows: int, start: date = date(2022, 1, 1), seed: int = 0) -> pd.DataFrame:
+    """`rows` lignes d'historique (une par produit et par jour, jour après jour depuis `start`).
+
+    `products` : catalogue de `generate_products` (Product_ID = P + rang dans le catalogue).
+    """
+    rng = np.random.default_rng(seed)
+    n = len(products)
+    days = -(-rows // n)
+    ids, _, _, amplitude, peak = _category_arrays()
+    cat_index = np.searchsorted(ids, products['categorie_id'].to_numpy())
+
+    # ordre jour-major : les `rows` premières cellules de la grille jours x produits
+    cell = np.arange(rows)
+    day = cell // n
+    product = cell % n
+
+    dates = pd.date_range(start, periods=days, freq='D')
+    day_of_year = dates.dayofyear.to_numpy()
+    weekend = np.where(dates.dayofweek.to_numpy() >= 5, WEEKEND_FACTOR, 1.0)
+
+    # popularité log-normale, saisonnalité par catégorie, effet week-end
+    popularity = rng.lognormal(POPULARITY_LOG_MEAN, POPULARITY_LOG_SIGMA, n)
+    product_amplitude, product_peak = amplitude[cat_index], peak[cat_index]
+    season = 1.0 + product_amplitude[product] * np.cos(2 * np.pi * (day_of_year[day] - product_peak[product]) / 365.25)
+    rate = popularity[product] * season * weekend[day]
+    daily_sales = rng.poisson(rate).astype(float)
+
+    prices = products['prix_unitaire'].to_numpy()
+    unit_price = np.round(prices[product] * rng.normal(1.0, 0.03, rows), 2)
+
+    # colonnes texte en catégories : un code par ligne, les libellés une seule fois
+    codes = [f'P{i:06d}' for i in range(n)]
+    categories = [CATEGORIES.get(c, 'Autre') for c in ids]
+    return pd.DataFrame({
+        'Date': dates[day],
+        'Product_ID': pd.Categorical.from_codes(product, codes),
+        'Product_Name': pd.Categorical.from_codes(product, products['nom'].to_numpy()),
+        'Category': pd.Categorical.from_codes(cat_index[product], categories),
+        'Daily_Sales': daily_sales,
+        'Unit_Price': unit_price,
+    })
+
+
+def write_sales(df: pd.DataFrame, path: str) -> str:
+    """Écrit l'historique en CSV, ou en Parquet si `path` se termine par .parquet (pyarrow requis)."""
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, date_format='%Y-%m-%d', float_format='%.2f')
+    return path
+
+
+def load_products(products: pd.DataFrame, replace: bool = False, chunksize: int = 50000) -> int:
+    """Insère le catalogue dans `produits` par lots (une transaction) ; renvoie le nombre de produits.
+
+    `replace` vide d'abord `produits` et les promotions qui s'y rattachent.
+    """
+    records = products.astype(object).where(products.notna(), None).to_dict(orient='records')
+    try:
+        if replace:
+            for model in (PromotionArchive, Promotion, Produit):
+                db.session.execute(delete(model))
+        for i in range(0, len(records), chunksize):
+            db.session.execute(insert(Produit), records[i:i + chunksize])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if replace:
+        product_cache.invalidate_all()
+    return len(records)
@@ -0,0 +1,54 @@
+"""initial schema (produits, promotions)
+
+Revision ID: 0001_initial_schema
+Revises: 
+Create Date: 2025-10-01 09:00:00
+
+Les bases existantes ont été créées par db.create_all() : les tables ne sont
+créées que si elles sont absentes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'produits' not in tables:
+        op.create_table(
+            'produits',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nom', sa.String(length=100), nullable=True),
+            sa.Column('categorie_id', sa.Integer(), nullable=True),
+            sa.Column('stock', sa.Integer(), nullable=True),
+            sa.Column('prix_unitaire', sa.Float(), nullable=True),
+            sa.Column('fournisseur', sa.String(length=100), nullable=True),
+            sa.Column('date_peremption', sa.Date(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_produits_id', 'produits', ['id'], unique=False)
+        op.create_index('ix_produits_nom', 'produits', ['nom'], unique=False)
+    if 'promotions' not in tables:
+        op.create_table(
+            'promotions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('produit_id', sa.Integer(), nullable=False),
+            sa.Column('discount_percent', sa.Float(), nullable=False),
+            sa.Column('start_date', sa.Date(), nullable=True),
+            sa.Column('end_date', sa.Date(), nullable=True),
+            sa.Column('active', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_promotions_produit_id', 'promotions', ['produit_id'], unique=False)
+
+
+def downgrade():
+    op.drop_table('promotions')
+    op.drop_table('produits')
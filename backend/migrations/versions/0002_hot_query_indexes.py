@@ -0,0 +1,40 @@
+"""composite and covering indexes for the hot queries
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_initial_schema
+Create Date: 2025-10-02 09:00:00
+
+- promotions (produit_id, active, created_at) : Produit.get_active_promotion
+  (filter_by(produit_id, active=True).order_by(created_at.desc())) lit l'index
+  dans l'ordre, sans tri ; sous PostgreSQL l'index inclut les colonnes renvoyées.
+  Il remplace l'index simple sur produit_id, qui en est un préfixe.
+- produits (date_peremption), (categorie_id, date_peremption), (fournisseur).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_query_indexes'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_promotions_produit_active_created', 'promotions',
+                    ['produit_id', 'active', 'created_at'], unique=False, if_not_exists=True,
+                    postgresql_include=['discount_percent', 'start_date', 'end_date'])
+    op.drop_index('ix_promotions_produit_id', table_name='promotions', if_exists=True)
+    op.create_index('ix_produits_date_peremption', 'produits', ['date_peremption'], unique=False, if_not_exists=True)
+    op.create_index('ix_produits_categorie_date', 'produits', ['categorie_id', 'date_peremption'],
+                    unique=False, if_not_exists=True)
+    op.create_index('ix_produits_fournisseur', 'produits', ['fournisseur'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_produits_fournisseur', table_name='produits', if_exists=True)
+    op.drop_index('ix_produits_categorie_date', table_name='produits', if_exists=True)
+    op.drop_index('ix_produits_date_peremption', table_name='produits', if_exists=True)
+    op.create_index('ix_promotions_produit_id', 'promotions', ['produit_id'], unique=False, if_not_exists=True)
+    op.drop_index('ix_promotions_produit_active_created', table_name='promotions', if_exists=True)
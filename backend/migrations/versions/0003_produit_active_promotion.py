@@ -0,0 +1,52 @@
+"""denormalized active promotion on produits
+
+Revision ID: 0003_produit_active_promotion
+Revises: 0002_hot_query_indexes
+Create Date: 2025-10-03 09:00:00
+
+Les colonnes promotion_* de `produits` recopient la promotion active la plus
+récente ; elles sont remplies ici puis maintenues par l'application
+(`check_promotion_consistency` répare les écarts).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_produit_active_promotion'
+down_revision = '0002_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('promotion_id', 'promotion_discount_percent', 'promotion_start_date', 'promotion_end_date')
+
+
+def upgrade():
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('produits')}
+    with op.batch_alter_table('produits') as batch_op:
+        if 'promotion_id' not in existing:
+            batch_op.add_column(sa.Column('promotion_id', sa.Integer(), nullable=True))
+        if 'promotion_discount_percent' not in existing:
+            batch_op.add_column(sa.Column('promotion_discount_percent', sa.Float(), nullable=True))
+        if 'promotion_start_date' not in existing:
+            batch_op.add_column(sa.Column('promotion_start_date', sa.Date(), nullable=True))
+        if 'promotion_end_date' not in existing:
+            batch_op.add_column(sa.Column('promotion_end_date', sa.Date(), nullable=True))
+
+    # backfill : promotion active la plus récente de chaque produit
+    latest = """
+        (SELECT p.{col} FROM promotions p
+         WHERE p.produit_id = produits.id AND p.active
+         ORDER BY p.created_at DESC, p.id DESC LIMIT 1)
+    """
+    op.execute(
+        "UPDATE produits SET "
+        + ", ".join(f"promotion_{col} = {latest.format(col=col)}"
+                    for col in ('id', 'discount_percent', 'start_date', 'end_date'))
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('produits') as batch_op:
+        for column in reversed(COLUMNS):
+            batch_op.drop_column(column)
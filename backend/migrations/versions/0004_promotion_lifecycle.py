@@ -0,0 +1,46 @@
+"""promotion lifecycle: archive table and date indexes
+
+Revision ID: 0004_promotion_lifecycle
+Revises: 0003_produit_active_promotion
+Create Date: 2025-10-04 09:00:00
+
+`promotions_archive` reçoit les promotions expirées, remplacées ou désactivées
+(model/promotion_scheduler.py) ; `promotions` ne garde que les lignes programmées
+et courantes. Les index (active, start_date) et end_date servent l'activation et
+l'expiration ensemblistes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_promotion_lifecycle'
+down_revision = '0003_produit_active_promotion'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'promotions_archive' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'promotions_archive',
+            sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('produit_id', sa.Integer(), nullable=False),
+            sa.Column('discount_percent', sa.Float(), nullable=False),
+            sa.Column('start_date', sa.Date(), nullable=True),
+            sa.Column('end_date', sa.Date(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('archived_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+            sa.Column('reason', sa.String(length=20), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_promotions_archive_produit_id', 'promotions_archive', ['produit_id'],
+                    unique=False, if_not_exists=True)
+    op.create_index('ix_promotions_active_start', 'promotions', ['active', 'start_date'], unique=False, if_not_exists=True)
+    op.create_index('ix_promotions_end_date', 'promotions', ['end_date'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_promotions_end_date', table_name='promotions', if_exists=True)
+    op.drop_index('ix_promotions_active_start', table_name='promotions', if_exists=True)
+    op.drop_table('promotions_archive')
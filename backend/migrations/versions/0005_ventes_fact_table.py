@@ -0,0 +1,41 @@
+"""sales fact table
+
+Revision ID: 0005_ventes_fact_table
+Revises: 0004_promotion_lifecycle
+Create Date: 2025-10-05 09:00:00
+
+Table `ventes` (SALES_STORAGE=database) : une ligne par produit et par jour,
+indexée par date, (produit, date) et (catégorie, date) pour les agrégations
+des endpoints /api/sales/* et /api/kpi/*.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_ventes_fact_table'
+down_revision = '0004_promotion_lifecycle'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'ventes' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'ventes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('date_vente', sa.Date(), nullable=False),
+            sa.Column('produit_nom', sa.String(length=100), nullable=False),
+            sa.Column('produit_code', sa.String(length=50), nullable=True),
+            sa.Column('categorie', sa.String(length=100), nullable=True),
+            sa.Column('quantite', sa.Float(), nullable=False),
+            sa.Column('prix_unitaire', sa.Float(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_ventes_date', 'ventes', ['date_vente'], unique=False, if_not_exists=True)
+    op.create_index('ix_ventes_produit_date', 'ventes', ['produit_nom', 'date_vente'], unique=False, if_not_exists=True)
+    op.create_index('ix_ventes_categorie_date', 'ventes', ['categorie', 'date_vente'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_table('ventes')
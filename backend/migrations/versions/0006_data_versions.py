@@ -0,0 +1,40 @@
+"""data versions
+
+Revision ID: 0006_data_versions
+Revises: 0005_ventes_fact_table
+Create Date: 2025-10-12 09:00:00
+
+Table `data_versions` : un compteur de modifications par jeu de données
+(produits, promotions, ventes), incrémenté à chaque écriture ; source des
+ETag / Last-Modified des endpoints de lecture.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_data_versions'
+down_revision = '0005_ventes_fact_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'data_versions' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    table = op.create_table(
+        'data_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    op.bulk_insert(table, [{'name': name, 'version': 1, 'updated_at': now}
+                           for name in ('produits', 'promotions', 'ventes')])
+
+
+def downgrade():
+    op.drop_table('data_versions')
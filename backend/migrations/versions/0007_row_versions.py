@@ -0,0 +1,55 @@
+"""row versions and tombstones
+
+Revision ID: 0007_row_versions
+Revises: 0006_data_versions
+Create Date: 2025-10-13 09:00:00
+
+Synchronisation par delta (`GET /api/produits/changes?since=<version>`) :
+colonne `row_version` indexée sur `produits` et `promotions` (séquence commune
+`catalog` de `data_versions`, les lignes existantes partent de 0) et table
+`tombstones` des lignes supprimées.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_row_versions'
+down_revision = '0006_data_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table in ('produits', 'promotions'):
+        if 'row_version' not in [c['name'] for c in inspector.get_columns(table)]:
+            op.add_column(table, sa.Column('row_version', sa.Integer(), nullable=False, server_default='0'))
+        op.create_index(f'ix_{table}_row_version', table, ['row_version'], unique=False, if_not_exists=True)
+    if 'tombstones' not in inspector.get_table_names():
+        op.create_table(
+            'tombstones',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('entity', sa.String(length=20), nullable=False),
+            sa.Column('entity_id', sa.Integer(), nullable=False),
+            sa.Column('row_version', sa.Integer(), nullable=False),
+            sa.Column('deleted_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_tombstones_row_version', 'tombstones', ['row_version'], unique=False, if_not_exists=True)
+    versions = sa.table('data_versions', sa.column('name', sa.String), sa.column('version', sa.Integer),
+                        sa.column('updated_at', sa.DateTime))
+    if op.get_bind().execute(sa.select(versions.c.name).where(versions.c.name == 'catalog')).first() is None:
+        op.bulk_insert(versions, [{'name': 'catalog', 'version': 0,
+                                   'updated_at': datetime.now(timezone.utc).replace(tzinfo=None)}])
+
+
+def downgrade():
+    op.drop_table('tombstones')
+    for table in ('produits', 'promotions'):
+        op.drop_index(f'ix_{table}_row_version', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('row_version')
+    op.execute("DELETE FROM data_versions WHERE name = 'catalog'")
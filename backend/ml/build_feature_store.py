@@ -0,0 +1,34 @@
+"""
+Build the per-product feature store from the historical sales CSV.
+
+The resulting file (model/saved_models/product_features_v<version>.joblib) is read
+both by the training script and by the API at startup.
+
+Usage:
+    python build_feature_store.py [path/to/sales.csv]
+"""
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from config.constant import SALES_CSV_PATH
+from helpers.sales import read_sales_file
+from model.feature_store import FeatureStore, file_digest
+
+DATA_PATH = SALES_CSV_PATH
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Sales data not found at {csv_path}")
+    print(f"Loading sales data from {csv_path}...")
+    df = read_sales_file(csv_path)
+    store = FeatureStore.build(df, file_digest(csv_path))
+    path = store.save()
+    print(f"Feature store saved to {path}: {store.describe()}")
+
+
+if __name__ == '__main__':
+    main()
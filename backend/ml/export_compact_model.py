@@ -0,0 +1,151 @@
+"""
+Export a trained tree ensemble as a compact artifact.
+
+The model is flattened into float32 arrays (model/compact_forest.py), optionally
+pruned by depth and/or leaf count, and saved with joblib compression. The script
+reports the artifact size, the load time, the accuracy delta and the batch
+prediction latency against the original model. `RiskModel.load` (and the
+demand/pricing models) read the compact format transparently, so the output can
+be used directly as ML_MODEL_PATH.
+
+The numpy traversal is much faster than scikit-learn for single rows but can be
+slower on large batches of deep, unpruned trees: a slowdown is reported as a
+warning, and `--max-slowdown` refuses the export (the artifact is removed) above
+the given ratio.
+
+Usage:
+    python export_compact_model.py [--model PATH] [--output PATH]
+                                   [--max-depth 12] [--max-leaves 256] [--data sales.csv]
+                                   [--max-slowdown 1.5]
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from model.compact_forest import CompactForest, compact_path, load_model_artifact
+
+DEFAULT_MODEL = os.path.join(BASE_DIR, 'model', 'saved_models', 'waste_predictor.joblib')
+
+
+def timed_load(path, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load_model_artifact(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def timed_predict(predict, X, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def export_compact(model, output, max_depth=None, max_leaves=None, X=None, y=None, source_path=None, compress=3,
+                   batch_rows=10000, max_slowdown=None):
+    """Write the compact artifact and return a report comparing it with `model`.
+
+    Raises ValueError (and removes the artifact) when its batch prediction is more
+    than `max_slowdown` times slower than the original model.
+    """
+    compact = CompactForest.from_sklearn(model, max_depth=max_depth, max_leaves=max_leaves)
+    compact.save(output, compress=compress)
+
+    report = {
+        'output': output,
+        'trees': compact.n_estimators,
+        'nodes': compact.n_nodes,
+        'depth': compact.depth,
+        'size_bytes': os.path.getsize(output),
+        'load_s': timed_load(output),
+    }
+    if source_path is not None and os.path.exists(source_path):
+        report['original_size_bytes'] = os.path.getsize(source_path)
+        report['original_load_s'] = timed_load(source_path)
+
+    if X is not None:
+        X = np.asarray(X, dtype=float)
+        original_pred = np.asarray(model.predict(X))
+        compact_pred = np.asarray(compact.predict(X))
+        if compact.kind == 'classifier':
+            report['prediction_agreement'] = float((original_pred == compact_pred).mean())
+            report['max_proba_delta'] = float(np.abs(model.predict_proba(X) - compact.predict_proba(X)).max())
+            if y is not None:
+                y = np.asarray(y)
+                report['accuracy_original'] = float((original_pred == y).mean())
+                report['accuracy_compact'] = float((compact_pred == y).mean())
+                report['accuracy_delta'] = report['accuracy_compact'] - report['accuracy_original']
+        else:
+            report['max_abs_delta'] = float(np.abs(original_pred - compact_pred).max())
+
+    # batch latency: evaluation rows when available, otherwise standard normal features
+    if X is not None:
+        batch = np.asarray(X, dtype=float)[:batch_rows]
+    else:
+        batch = np.random.default_rng(0).normal(size=(batch_rows, compact.n_features_in_ or 1))
+    method = 'predict_proba' if compact.kind == 'classifier' else 'predict'
+    report['batch_rows'] = len(batch)
+    report['batch_predict_s'] = timed_predict(getattr(compact, method), batch)
+    report['original_batch_predict_s'] = timed_predict(getattr(model, method), batch)
+    report['batch_slowdown'] = report['batch_predict_s'] / max(report['original_batch_predict_s'], 1e-9)
+    if max_slowdown is not None and report['batch_slowdown'] > max_slowdown:
+        os.remove(output)
+        raise ValueError(f"compact model is {report['batch_slowdown']:.1f}x slower than the original on "
+                         f"{len(batch)} rows (limit {max_slowdown}x); prune it with --max-depth/--max-leaves")
+    return report
+
+
+def print_report(report):
+    for key, value in report.items():
+        print(f"{key:>24}: {value}")
+    if report.get('batch_slowdown', 0) > 1:
+        print(f"WARNING: batch prediction is {report['batch_slowdown']:.1f}x slower than the original model; "
+              "prune deeper trees or keep the scikit-learn artifact for batch scoring")
+
+
+def evaluation_data(data_path):
+    """Features and proxy labels from the feature store for the given CSV, if available."""
+    if not data_path or not os.path.exists(data_path):
+        return None, None
+    from model.feature_store import FeatureStore
+    from ml.train_waste_model import build_features_and_label
+    X, y, _ = build_features_and_label(FeatureStore.load_or_build(data_path))
+    return X.to_numpy(), y.to_numpy()
+
+
+def main(argv=None):
+    from ml.train_waste_model import DATA_PATH
+    parser = argparse.ArgumentParser(description="Export a compact, pruned float32 version of a tree ensemble")
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--output', default=None, help="defaults to <model>.compact.joblib")
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--max-leaves', type=int, default=None, help="leaves per tree (best-first)")
+    parser.add_argument('--data', default=DATA_PATH, help="sales CSV used to measure the accuracy delta")
+    parser.add_argument('--max-slowdown', type=float, default=None,
+                        help="refuse the export if batch prediction is more than this many times slower")
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model)
+    X, y = evaluation_data(args.data)
+    try:
+        report = export_compact(model, args.output or compact_path(args.model), args.max_depth, args.max_leaves,
+                                X, y, source_path=args.model, max_slowdown=args.max_slowdown)
+    except ValueError as exc:
+        sys.exit(f"ERROR: {exc}")
+    print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,35 @@
 """
-Minimal training script for a waste-prediction model (RandomForest) using historical sales CSV as a data source.
+Training pipeline for the waste-prediction model (RandomForest) using historical sales CSV as a data source.
 - Produces a proxy label if explicit waste labels are not present.
-- Logs the run with MLflow (if installed) and saves a joblib model to backend/model/saved_models/
+- Caches the load and feature stages on disk, keyed by the sha1 of the input CSV.
+- Runs k-fold cross-validation over a hyperparameter grid on a process pool, then refits
+  the best configuration on the full history.
+- Reports wall time per stage, logs the run with MLflow (if installed) and saves a joblib
+  model to backend/model/saved_models/
 
 Usage:
-    python train_waste_model.py
+    python train_waste_model.py [--data PATH] [--folds 5] [--jobs -1] [--no-cache]
+                                [--chunked --memory-budget-mb 256]
+                                [--compact --compact-max-depth 12]
 
 Notes:
-- This is a minimal POC. For production you should add proper feature engineering, cross-validation
-  and label quality checks.
+- The grid is deliberately small so a full retrain fits in the nightly window; extend
+  PARAM_GRID when more time is available.
 """
+import argparse
 import os
-import pandas as pd
+import time
+from contextlib import contextmanager
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import roc_auc_score, accuracy_score
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, KFold
 import joblib
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.constant import SALES_CSV_PATH
+from helpers.sales import read_sales_file
+from model.feature_store import FeatureStore, FEATURE_COLUMNS, FEATURE_VERSION, file_digest
 
 try:
     import mlflow
@@ -25,15 +38,51 @@ except Exception:
     MLFLOW_AVAILABLE = False
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-DATA_PATH = os.path.join(BASE_DIR, 'asstes', 'data', 'supermarche_historique_ventes.csv')
+DATA_PATH = SALES_CSV_PATH
 MODEL_DIR = os.path.join(BASE_DIR, 'model', 'saved_models')
 os.makedirs(MODEL_DIR, exist_ok=True)
 MODEL_PATH = os.path.join(MODEL_DIR, 'waste_predictor.joblib')
-
-def load_sales():
-    if not os.path.exists(DATA_PATH):
-        raise FileNotFoundError(f"Sales data not found at {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH, parse_dates=['Date'])
+CACHE_DIR = os.path.join(BASE_DIR, 'ml', '.cache')
+
+PARAM_GRID = {
+    'n_estimators': [100, 200],
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 5],
+}
+
+
+@contextmanager
+def stage(name, timings):
+    """Time a pipeline stage and record its wall time in `timings`."""
+    print(f"[{name}] ...")
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - start
+        print(f"[{name}] done in {timings[name]:.2f}s")
+
+
+def cached_stage(cache_dir, name, key, compute):
+    """Return the cached result of a stage for this input key, computing and storing it on a miss."""
+    if cache_dir is None:
+        return compute()
+    path = os.path.join(cache_dir, f'{name}-{key}.joblib')
+    if os.path.exists(path):
+        try:
+            print(f"  cache hit: {path}")
+            return joblib.load(path)
+        except Exception:
+            pass
+    result = compute()
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(result, path)
+    return result
+
+def load_sales(path=DATA_PATH):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Sales data not found at {path}")
+    df = read_sales_file(path)
     return df
 
 
@@ -47,74 +96,125 @@ def build_features_and_label(df):
       AND the item had positive stock (we approximate by observing days with sales==0).
 
     For this POC we aggregate at product level using statistics across the dataset.
+    `df` may be a raw sales frame or an already built FeatureStore.
     """
-    # Aggregate product-level stats
-    df['Daily_Sales'] = pd.to_numeric(df.get('Daily_Sales', 0), errors='coerce').fillna(0)
-    df['Unit_Price'] = pd.to_numeric(df.get('Unit_Price', 0), errors='coerce').fillna(0)
-
-    grouped = df.groupby('Product_Name').agg(
-        avg_daily_sales=('Daily_Sales', 'mean'),
-        median_price=('Unit_Price', 'median'),
-        std_daily_sales=('Daily_Sales', 'std'),
-        max_daily_sales=('Daily_Sales', 'max'),
-        days_present=('Date', 'nunique')
-    ).reset_index()
+    # Product-level stats come from the feature store, so training and serving share one definition
+    store = df if isinstance(df, FeatureStore) else FeatureStore.build(df)
+    grouped = store.training_frame()
 
     # proxy label: mark products with very low avg_daily_sales and low max_daily_sales as at-risk of waste
     grouped['label_waste'] = ((grouped['avg_daily_sales'] < 0.5) & (grouped['max_daily_sales'] < 2)).astype(int)
 
-    # feature: relative price (normalized by global median)
-    global_median_price = grouped['median_price'].median() if len(grouped) > 0 else 1.0
-    grouped['price_rel'] = grouped['median_price'] / (global_median_price + 1e-6)
-    grouped['sales_cv'] = grouped['std_daily_sales'] / (grouped['avg_daily_sales'] + 1e-6)
-    grouped['days_present'] = grouped['days_present']
-
     # Keep only rows with non-null median_price
     dataset = grouped.dropna(subset=['median_price'])
-    features = dataset[['avg_daily_sales', 'price_rel', 'sales_cv', 'days_present']]
+    features = dataset[FEATURE_COLUMNS]
     labels = dataset['label_waste']
     names = dataset['Product_Name']
     return features, labels, names
 
 
-def train_and_save(X, y):
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y if len(set(y))>1 else None)
-    clf = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1)
-    clf.fit(X_train, y_train)
-    preds = clf.predict(X_test)
-    proba = clf.predict_proba(X_test)[:,1] if hasattr(clf, 'predict_proba') else None
-    acc = accuracy_score(y_test, preds)
-    auc = roc_auc_score(y_test, proba) if proba is not None and len(set(y_test))>1 else None
+def cross_validate_and_save(X, y, folds=5, jobs=-1, param_grid=None, model_path=MODEL_PATH):
+    """Grid-search the RandomForest with k-fold CV on a process pool and save the refitted best model."""
+    param_grid = param_grid or PARAM_GRID
+    class_counts = np.bincount(np.asarray(y, dtype=int))
+    stratified = len(class_counts) > 1 and class_counts.min() >= 2
+    n_splits = max(2, min(folds, int(class_counts.min()) if stratified else len(y)))
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42) if stratified \
+        else KFold(n_splits=n_splits, shuffle=True, random_state=42)
+    scoring = 'roc_auc' if stratified else 'accuracy'
+
+    # Each (parameter set, fold) pair is an independent job dispatched to joblib's process pool;
+    # the estimators themselves stay single-threaded to avoid oversubscription.
+    search = GridSearchCV(
+        RandomForestClassifier(random_state=42, n_jobs=1),
+        param_grid,
+        cv=cv,
+        scoring=scoring,
+        n_jobs=jobs,
+        refit=True,
+    )
+    search.fit(X, y)
+
+    best = search.best_estimator_
+    print(f"Best params: {search.best_params_}")
+    print(f"CV {scoring} ({n_splits} folds): {search.best_score_:.4f} "
+          f"(+/- {search.cv_results_['std_test_score'][search.best_index_]:.4f})")
 
     # log with mlflow if available
     if MLFLOW_AVAILABLE:
-        mlflow.sklearn.log_model(clf, "waste_predictor")
-        mlflow.log_metric('accuracy', float(acc))
-        if auc is not None:
-            mlflow.log_metric('roc_auc', float(auc))
+        mlflow.sklearn.log_model(best, "waste_predictor")
+        mlflow.log_params(search.best_params_)
+        mlflow.log_metric(f'cv_{scoring}', float(search.best_score_))
 
     # save joblib
-    joblib.dump(clf, MODEL_PATH)
-    print(f"Model saved to {MODEL_PATH}")
-    print(f"Accuracy: {acc:.4f}")
-    if auc is not None:
-        print(f"ROC AUC: {auc:.4f}")
-
-
-def main():
-    print("Loading sales data...")
-    df = load_sales()
-    print("Building features and label...")
-    X, y, names = build_features_and_label(df)
+    joblib.dump(best, model_path)
+    print(f"Model saved to {model_path}")
+    return search
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the waste-risk model")
+    parser.add_argument('--data', default=DATA_PATH, help="sales history CSV")
+    parser.add_argument('--output', default=MODEL_PATH, help="where to save the trained model")
+    parser.add_argument('--folds', type=int, default=5, help="number of cross-validation folds")
+    parser.add_argument('--jobs', type=int, default=-1, help="worker processes for the grid search (-1 = all cores)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="directory for cached load/feature stages")
+    parser.add_argument('--no-cache', action='store_true', help="recompute every stage")
+    parser.add_argument('--compact', action='store_true',
+                        help="also export a pruned float32 artifact (<output>.compact.joblib)")
+    parser.add_argument('--compact-max-depth', type=int, default=None)
+    parser.add_argument('--compact-max-leaves', type=int, default=None)
+    parser.add_argument('--chunked', action='store_true',
+                        help="build features out of core from CSV chunks (for histories larger than RAM)")
+    parser.add_argument('--memory-budget-mb', type=float, default=256,
+                        help="memory budget of the chunked feature builder")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache_dir = None if args.no_cache else args.cache_dir
+    timings = {}
+
+    with stage('hash', timings):
+        data_hash = file_digest(args.data) if os.path.exists(args.data) else None
+        if data_hash is None:
+            raise FileNotFoundError(f"Sales data not found at {args.data}")
+
+    # The feature stage only needs the raw frame on a cache miss, so loading stays lazy
+    with stage('features', timings):
+        def compute_features():
+            if args.chunked:
+                store = FeatureStore.build_chunked(args.data, args.memory_budget_mb, data_hash)
+                return build_features_and_label(store)
+            with stage('load', timings):
+                df = cached_stage(cache_dir, 'sales', data_hash, lambda: load_sales(args.data))
+            return build_features_and_label(FeatureStore.build(df, data_hash))
+        X, y, names = cached_stage(cache_dir, f'features-v{FEATURE_VERSION}', data_hash, compute_features)
+
     print(f"Dataset size: {len(X)}")
     if len(X) < 10:
         print("WARNING: very small dataset for training — results may be poor")
-    print("Training model...")
-    if MLFLOW_AVAILABLE:
-        with mlflow.start_run():
-            train_and_save(X, y)
-    else:
-        train_and_save(X, y)
+
+    with stage('train', timings):
+        if MLFLOW_AVAILABLE:
+            with mlflow.start_run():
+                search = cross_validate_and_save(X, y, args.folds, args.jobs, model_path=args.output)
+                mlflow.log_metrics({f'time_{name}_s': t for name, t in timings.items()})
+        else:
+            search = cross_validate_and_save(X, y, args.folds, args.jobs, model_path=args.output)
+
+    if args.compact:
+        from model.compact_forest import compact_path
+        from ml.export_compact_model import export_compact, print_report
+        with stage('compact', timings):
+            report = export_compact(search.best_estimator_, compact_path(args.output), args.compact_max_depth,
+                                    args.compact_max_leaves, X, y, source_path=args.output)
+        print_report(report)
+
+    print("Wall time per stage:")
+    for name, t in timings.items():
+        print(f"  {name:<10} {t:8.2f}s")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,133 @@
+"""
+Request-coalescing inference layer for the risk model.
+
+Concurrent per-product requests submit one feature row each; a background worker
+collects rows for at most `max_wait_ms` (or until `max_batch` rows are queued),
+runs a single vectorized `predict_proba` on the batch and hands each caller its
+own probability.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional, Dict, Any
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row predictions into batched model calls."""
+
+    def __init__(self, predict_fn: Callable[[List[List[float]]], Optional[List[float]]],
+                 max_batch: int = 64, max_wait_ms: float = 5.0, max_queue: int = 1024):
+        self.predict_fn = predict_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_queue = max(1, int(max_queue))
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._pid = None
+        # metrics
+        self.requests = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.largest_batch = 0
+        self.max_queue_depth = 0
+        self.failures = 0
+
+    def _ensure_worker(self):
+        # (re)start the worker lazily, including in a freshly forked process
+        if self._worker is not None and self._worker.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='risk-micro-batcher', daemon=True)
+            self._worker.start()
+
+    def submit(self, features: List[float]) -> Future:
+        """Queue one feature row; the returned future resolves to its probability (or None)."""
+        self._ensure_worker()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((features, future))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise
+        with self._lock:
+            self.requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def _predict_direct(self, features: List[float]) -> Optional[float]:
+        proba = self.predict_fn([features])
+        return proba[0] if proba is not None else None
+
+    def predict(self, features: List[float], timeout: Optional[float] = 5.0) -> Optional[float]:
+        """Blocking helper: predict one row through the batch queue.
+
+        Falls back to a direct call when the queue is full, or when the batch has not
+        completed within `timeout` (counted in `failures`; the queued row is still
+        computed and its result dropped).
+        """
+        try:
+            future = self.submit(features)
+        except queue.Full:
+            return self._predict_direct(features)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.failures += 1
+            return self._predict_direct(features)
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [features for features, _ in batch]
+            try:
+                proba = self.predict_fn(rows)
+            except Exception:
+                proba = None
+            if proba is None:
+                with self._lock:
+                    self.failures += 1
+                proba = [None] * len(batch)
+            self.batches += 1
+            self.batched_rows += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, future), value in zip(batch, proba):
+                future.set_result(value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'max_queue': self.max_queue,
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'avg_batch_size': round(self.batched_rows / self.batches, 3) if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'failures': self.failures,
+        }
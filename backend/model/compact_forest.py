@@ -0,0 +1,270 @@
+"""
+Compact, framework-free representation of tree ensembles.
+
+`CompactForest.from_sklearn` flattens a fitted RandomForest (classifier or
+regressor) or GradientBoostingRegressor into a handful of numpy arrays, optionally
+pruned by depth or by leaf count, with thresholds and leaf values stored as
+float32. The artifact is saved as a plain dict of arrays (no scikit-learn classes
+are pickled), which makes it small, fast to load and independent of the
+scikit-learn version used at training time.
+
+Thresholds are rounded *down* to float32 so that `x <= threshold` gives exactly
+the same branch as scikit-learn (which compares float32 inputs); an unpruned
+export therefore predicts the same values up to float32 rounding of the leaves.
+"""
+import heapq
+import os
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+
+COMPACT_FORMAT = 'compact-forest-v1'
+
+LEAF = -1
+
+
+def _float32_floor(values: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each float64 value."""
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def _kept_nodes(tree, max_depth: Optional[int], max_leaves: Optional[int]):
+    """Return the set of node ids kept as *internal* nodes after pruning."""
+    left, right = tree.children_left, tree.children_right
+    internal = set()
+    if max_leaves is None:
+        stack = [(0, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if left[node] == LEAF or (max_depth is not None and depth >= max_depth):
+                continue
+            internal.add(node)
+            stack.append((left[node], depth + 1))
+            stack.append((right[node], depth + 1))
+        return internal
+
+    # best-first growth: expand the split with the largest weighted impurity decrease
+    impurity, weight = tree.impurity, tree.weighted_n_node_samples
+
+    def gain(node):
+        return impurity[node] * weight[node] - impurity[left[node]] * weight[left[node]] \
+            - impurity[right[node]] * weight[right[node]]
+
+    heap = []
+    if left[0] != LEAF:
+        heapq.heappush(heap, (-gain(0), 0, 0))
+    leaves = 1
+    while heap and leaves < max_leaves:
+        _, node, depth = heapq.heappop(heap)
+        internal.add(node)
+        leaves += 1
+        for child in (left[node], right[node]):
+            if left[child] != LEAF and (max_depth is None or depth + 1 < max_depth):
+                heapq.heappush(heap, (-gain(child), child, depth + 1))
+    return internal
+
+
+class CompactForest:
+    """Tree ensemble evaluated with vectorized numpy traversal (all trees, level by level).
+
+    Every tree contributes `value[leaf]`; the output is `base + scale * sum(values)`
+    (an average for random forests, the boosting sum for gradient boosting).
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth,
+                 kind='classifier', classes=None, base=0.0, scale=1.0, n_features=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.kind = kind
+        self.classes_ = classes
+        self.base = base
+        self.scale = scale
+        self.n_features_in_ = n_features
+        # traversal tables: children[2 * node] is the left child, children[2 * node + 1] the right
+        # one, and a leaf loops onto itself (feature 0, threshold +inf) so that finished paths can
+        # keep stepping until the working set is compacted
+        self._is_leaf = np.asarray(feature) < 0
+        leaves = np.flatnonzero(self._is_leaf)
+        self._feature = np.where(self._is_leaf, 0, feature).astype(np.intp)
+        self._threshold = np.where(self._is_leaf, np.float32(np.inf), threshold).astype(np.float32)
+        self._children = np.empty(2 * len(feature), dtype=np.intp)
+        self._children[0::2], self._children[1::2] = left, right
+        self._children[2 * leaves] = self._children[2 * leaves + 1] = leaves
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_sklearn(cls, model: Any, max_depth: Optional[int] = None, max_leaves: Optional[int] = None) -> 'CompactForest':
+        if hasattr(model, 'estimators_') and hasattr(model, 'init_'):
+            # GradientBoostingRegressor: estimators_ is (n_stages, 1)
+            estimators = [e for e in np.ravel(model.estimators_)]
+            kind, classes = 'regressor', None
+            base = float(np.ravel(model.init_.constant_)[0])
+            scale = float(model.learning_rate)
+        else:
+            estimators = list(model.estimators_)
+            classes = getattr(model, 'classes_', None)
+            kind = 'classifier' if classes is not None else 'regressor'
+            base, scale = 0.0, 1.0 / len(estimators)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_tree_depth = 0, 0
+        for est in estimators:
+            tree = est.tree_
+            internal = _kept_nodes(tree, max_depth, max_leaves)
+            # renumber the kept nodes (internal nodes plus their children) in DFS order
+            order, depth_of, stack = [], {0: 0}, [0]
+            while stack:
+                node = stack.pop()
+                order.append(node)
+                if node in internal:
+                    for child in (tree.children_right[node], tree.children_left[node]):
+                        depth_of[child] = depth_of[node] + 1
+                        stack.append(child)
+            index = {node: i + offset for i, node in enumerate(order)}
+            nodes = np.array(order)
+            is_internal = np.array([n in internal for n in order])
+
+            feat = np.where(is_internal, tree.feature[nodes], LEAF).astype(np.int32)
+            left = np.array([index[tree.children_left[n]] if n in internal else LEAF for n in order], dtype=np.int32)
+            right = np.array([index[tree.children_right[n]] if n in internal else LEAF for n in order], dtype=np.int32)
+            val = tree.value[nodes][:, 0, :].astype(np.float64)
+            if kind == 'classifier':
+                # per-node class distribution (counts or fractions depending on sklearn version)
+                val = val / np.maximum(val.sum(axis=1, keepdims=True), 1e-12)
+
+            features.append(feat)
+            thresholds.append(_float32_floor(tree.threshold[nodes]))
+            lefts.append(left)
+            rights.append(right)
+            values.append(val.astype(np.float32))
+            roots.append(offset)
+            offset += len(order)
+            max_tree_depth = max(max_tree_depth, max(depth_of[n] for n in order))
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            depth=max_tree_depth,
+            kind=kind,
+            classes=None if classes is None else np.asarray(classes),
+            base=base,
+            scale=scale,
+            n_features=getattr(model, 'n_features_in_', None),
+        )
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def to_payload(self) -> dict:
+        return {
+            'format': COMPACT_FORMAT,
+            'kind': self.kind,
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'left': self.left,
+            'right': self.right,
+            'value': self.value,
+            'roots': self.roots,
+            'depth': self.depth,
+            'classes': self.classes_,
+            'base': self.base,
+            'scale': self.scale,
+            'n_features': self.n_features_in_,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> 'CompactForest':
+        return cls(
+            payload['feature'], payload['threshold'], payload['left'], payload['right'], payload['value'],
+            payload['roots'], payload['depth'], kind=payload['kind'], classes=payload.get('classes'),
+            base=payload.get('base', 0.0), scale=payload.get('scale', 1.0), n_features=payload.get('n_features'),
+        )
+
+    def save(self, path: str, compress=3) -> str:
+        joblib.dump(self.to_payload(), path, compress=compress)
+        return path
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def _leaf_sum(self, X: np.ndarray, chunk_rows: int = 8192, compact_every: int = 4) -> np.ndarray:
+        out = np.zeros((len(X), self.value.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), chunk_rows):
+            Xc = X[start:start + chunk_rows]
+            n = len(Xc)
+            # feature-major flat copy: value of feature f for sample i is flat[f * n + i]
+            flat = np.ascontiguousarray(Xc.T).ravel()
+            # one (tree, sample) path per position; all paths advance together, level by level
+            leaf = np.repeat(self.roots.astype(np.intp), n)
+            position = np.arange(len(leaf))
+            node, sample = leaf.copy(), np.tile(np.arange(n), self.n_estimators)
+            for level in range(1, self.depth + 1):
+                # not (x <= threshold) rather than x > threshold: NaN goes right, as in scikit-learn
+                go_right = ~(flat[self._feature[node] * n + sample] <= self._threshold[node])
+                node = self._children[2 * node + go_right]
+                if level % compact_every == 0:
+                    # drop finished paths once they are a sizeable share: deep trees then only
+                    # cost their deep paths, without paying a compaction at every level
+                    done = self._is_leaf[node]
+                    if done.sum() > 0.2 * len(node):
+                        leaf[position[done]] = node[done]
+                        keep = ~done
+                        position, node, sample = position[keep], node[keep], sample[keep]
+                        if not len(node):
+                            break
+            leaf[position] = node
+            out[start:start + n] = self.value[leaf].reshape(self.n_estimators, n, -1).sum(axis=0)
+        return out
+
+    def _raw(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return self.base + self.scale * self._leaf_sum(X)
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.kind != 'classifier':
+            raise AttributeError('predict_proba is only available for classifiers')
+        return self._raw(X)
+
+    def predict(self, X) -> np.ndarray:
+        raw = self._raw(X)
+        if self.kind == 'classifier':
+            return self.classes_[np.argmax(raw, axis=1)]
+        return raw[:, 0]
+
+
+def load_model_artifact(path: str) -> Any:
+    """joblib.load that transparently turns a compact payload into a CompactForest."""
+    obj = joblib.load(path)
+    if isinstance(obj, dict) and obj.get('format') == COMPACT_FORMAT:
+        return CompactForest.from_payload(obj)
+    return obj
+
+
+def compact_path(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f'{root}.compact{ext or ".joblib"}'
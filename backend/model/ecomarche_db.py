@@ -1,13 +1,23 @@
 """
 Modèles de données pour l'application EcoMarché
 """
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, event, exists, insert, literal, select, update
+from sqlalchemy.orm import Session, aliased
 from config.db import db
 from config.constant import CATEGORIES, STATUT_EN_STOCK
 
 class Produit(db.Model):
     """Modèle pour les produits"""
     __tablename__ = "produits"
+    __table_args__ = (
+        # produits à risque : filtre / tri par date de péremption, global ou par catégorie
+        db.Index('ix_produits_date_peremption', 'date_peremption'),
+        db.Index('ix_produits_categorie_date', 'categorie_id', 'date_peremption'),
+        db.Index('ix_produits_fournisseur', 'fournisseur'),
+        # synchronisation par delta : lignes modifiées depuis une version
+        db.Index('ix_produits_row_version', 'row_version'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, index=True)
     nom = db.Column(db.String(100), index=True)
@@ -16,6 +26,13 @@ class Produit(db.Model):
     prix_unitaire = db.Column(db.Float)
     fournisseur = db.Column(db.String(100))
     date_peremption = db.Column(db.Date)
+    # promotion active dénormalisée (maintenue par set_active_promotion / Promotion.deactivate)
+    promotion_id = db.Column(db.Integer, nullable=True)
+    promotion_discount_percent = db.Column(db.Float, nullable=True)
+    promotion_start_date = db.Column(db.Date, nullable=True)
+    promotion_end_date = db.Column(db.Date, nullable=True)
+    # version de la dernière écriture (séquence `catalog` de data_versions, posée à chaque flush)
+    row_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     @property
     def categorie(self):
@@ -54,28 +71,31 @@ class Produit(db.Model):
             "jours_restants": self.jours_restants,
             "statut": self.statut,
             # include current active promotion if any
-            "promotion": self.get_active_promotion()
+            "promotion": self.get_active_promotion(),
+            "row_version": self.row_version
         }
 
     def get_active_promotion(self):
-        """Return the active promotion for this product if one exists (dict) or None."""
-        try:
-            # Import here to avoid circular import issues when models are initialized
-            Promotion = globals().get('Promotion')
-            if not Promotion:
-                return None
-            prom = Promotion.query.filter_by(produit_id=self.id, active=True).order_by(Promotion.created_at.desc()).first()
-            if not prom:
-                return None
-            return {
-                'id': prom.id,
-                'discount_percent': prom.discount_percent,
-                'start_date': prom.start_date.isoformat() if prom.start_date else None,
-                'end_date': prom.end_date.isoformat() if prom.end_date else None,
-                'active': prom.active
-            }
-        except Exception:
+        """Return the active promotion for this product (dict) or None.
+
+        Read from the denormalized columns: no query on `promotions`.
+        """
+        if self.promotion_id is None:
             return None
+        return {
+            'id': self.promotion_id,
+            'discount_percent': self.promotion_discount_percent,
+            'start_date': self.promotion_start_date.isoformat() if self.promotion_start_date else None,
+            'end_date': self.promotion_end_date.isoformat() if self.promotion_end_date else None,
+            'active': True
+        }
+
+    def set_active_promotion(self, promotion):
+        """Copy `promotion` (or None) into the denormalized columns; committed by the caller."""
+        self.promotion_id = promotion.id if promotion is not None else None
+        self.promotion_discount_percent = promotion.discount_percent if promotion is not None else None
+        self.promotion_start_date = promotion.start_date if promotion is not None else None
+        self.promotion_end_date = promotion.end_date if promotion is not None else None
 
 
 class Promotion(db.Model):
@@ -85,14 +105,39 @@ class Promotion(db.Model):
     and reversible. For a production system we'd add more fields and constraints.
     """
     __tablename__ = 'promotions'
+    __table_args__ = (
+        # promotion active d'un produit : filtre (produit_id, active), puis tri (effective_start, created_at) ;
+        # couvrante sous PostgreSQL (INCLUDE des colonnes renvoyées)
+        db.Index('ix_promotions_produit_active_created', 'produit_id', 'active', 'created_at',
+                 postgresql_include=['discount_percent', 'start_date', 'end_date']),
+        # cycle de vie (model/promotion_scheduler.py) : activation des promotions programmées, expiration
+        db.Index('ix_promotions_active_start', 'active', 'start_date'),
+        db.Index('ix_promotions_end_date', 'end_date'),
+        db.Index('ix_promotions_row_version', 'row_version'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    produit_id = db.Column(db.Integer, index=True, nullable=False)
+    produit_id = db.Column(db.Integer, nullable=False)
     discount_percent = db.Column(db.Float, nullable=False)
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
     active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    row_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def deactivate(self):
+        """Archive this promotion and refresh the product's denormalized columns
+        in the same transaction (committed by the caller)."""
+        archive_promotions(Promotion.id == self.id, 'deactivated')
+        refresh_promotion_columns([self.produit_id])
+        return db.session.get(Produit, self.produit_id)
+
+    def supersede_previous(self):
+        """Archive the product's other active promotions; this one becomes the current one."""
+        archive_promotions(
+            (Promotion.produit_id == self.produit_id) & Promotion.active.is_(True) & (Promotion.id != self.id),
+            'superseded'
+        )
 
     def to_dict(self):
         return {
@@ -102,9 +147,345 @@ class Promotion(db.Model):
             'start_date': self.start_date.isoformat() if self.start_date else None,
             'end_date': self.end_date.isoformat() if self.end_date else None,
             'active': self.active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'row_version': self.row_version
         }
 
+class PromotionArchive(db.Model):
+    """Promotions expired, superseded or deactivated, moved out of `promotions`.
+
+    `promotions` only holds scheduled and current rows, so the active promotion
+    lookups stay small; the history remains auditable here.
+    """
+    __tablename__ = 'promotions_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    produit_id = db.Column(db.Integer, index=True, nullable=False)
+    discount_percent = db.Column(db.Float, nullable=False)
+    start_date = db.Column(db.Date)
+    end_date = db.Column(db.Date)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, server_default=db.func.now())
+    reason = db.Column(db.String(20))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'produit_id': self.produit_id,
+            'discount_percent': self.discount_percent,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'active': False,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None,
+            'reason': self.reason
+        }
+
+
+class Vente(db.Model):
+    """Ligne de l'historique des ventes (une ligne par produit et par jour du CSV).
+
+    Table de faits optionnelle (SALES_STORAGE=database) : les agrégations des
+    endpoints /api/sales/* et /api/kpi/* y sont exécutées en SQL (helpers/sales.py)
+    au lieu d'un DataFrame chargé dans chaque worker.
+    """
+    __tablename__ = 'ventes'
+    __table_args__ = (
+        db.Index('ix_ventes_date', 'date_vente'),
+        db.Index('ix_ventes_produit_date', 'produit_nom', 'date_vente'),
+        db.Index('ix_ventes_categorie_date', 'categorie', 'date_vente'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    date_vente = db.Column(db.Date, nullable=False)
+    produit_nom = db.Column(db.String(100), nullable=False)
+    produit_code = db.Column(db.String(50))
+    categorie = db.Column(db.String(100))
+    quantite = db.Column(db.Float, nullable=False, default=0)
+    prix_unitaire = db.Column(db.Float)
+
+
+class DataVersion(db.Model):
+    """Compteur de modifications d'un jeu de données (produits, promotions, ventes).
+
+    Incrémenté dans la transaction de chaque écriture (voir `track_data_versions`) :
+    les endpoints de lecture en dérivent leurs ETag / Last-Modified
+    (config/conditional.py) sans relire les données.
+    """
+    __tablename__ = 'data_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)  # UTC
+
+
+class Tombstone(db.Model):
+    """Trace d'une ligne supprimée de `produits` ou `promotions` (synchronisation par delta).
+
+    `row_version` vient de la même séquence que les lignes vivantes : un client
+    qui demande les changements depuis une version reçoit aussi les suppressions.
+    """
+    __tablename__ = 'tombstones'
+    __table_args__ = (
+        db.Index('ix_tombstones_row_version', 'row_version'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # nom de la table
+    entity_id = db.Column(db.Integer, nullable=False)
+    row_version = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False)  # UTC
+
+
+# table écrite -> compteur incrémenté
+VERSIONED_TABLES = {'produits': 'produits', 'promotions': 'promotions', 'ventes': 'ventes'}
+# tables dont chaque ligne porte `row_version`, tirée de la séquence commune CATALOG_SEQUENCE
+ROW_VERSIONED_TABLES = ('produits', 'promotions')
+CATALOG_SEQUENCE = 'catalog'
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bump_data_versions(connection, names):
+    """Incrémente les compteurs `names` sur `connection` (dans la transaction en cours)."""
+    names = sorted(set(names))
+    if not names:
+        return
+    table = DataVersion.__table__
+    # à la seconde entière : la précision de Last-Modified / If-Modified-Since
+    now = utcnow().replace(microsecond=0)
+    result = connection.execute(
+        update(table).where(table.c.name.in_(names)).values(version=table.c.version + 1, updated_at=now)
+    )
+    if result.rowcount < len(names):
+        # base créée par create_all : compteurs pas encore initialisés
+        existing = set(connection.execute(select(table.c.name).where(table.c.name.in_(names))).scalars())
+        missing = [{'name': name, 'version': 1, 'updated_at': now} for name in names if name not in existing]
+        if missing:
+            connection.execute(insert(table), missing)
+
+
+def read_data_versions(session=None):
+    """{nom: (version, updated_at)} de tous les compteurs, en une requête."""
+    session = session if session is not None else db.session
+    rows = session.execute(select(DataVersion.name, DataVersion.version, DataVersion.updated_at)).all()
+    return {name: (version, updated_at) for name, version, updated_at in rows}
+
+
+def _record_write(connection, tables):
+    """Incrémente les compteurs des `tables` écrites ; renvoie la row_version à poser (ou None).
+
+    La ligne `catalog` reste verrouillée jusqu'au commit : les versions sont
+    attribuées dans l'ordre des commits et un client ne saute aucun changement.
+    """
+    names = {VERSIONED_TABLES[t] for t in tables}
+    if not any(t in ROW_VERSIONED_TABLES for t in tables):
+        bump_data_versions(connection, names)
+        return None
+    bump_data_versions(connection, names | {CATALOG_SEQUENCE})
+    table = DataVersion.__table__
+    return connection.execute(select(table.c.version).where(table.c.name == CATALOG_SEQUENCE)).scalar_one()
+
+
+def _before_flush(session, flush_context, instances):
+    written = list(session.new) + [o for o in session.dirty if session.is_modified(o)]
+    deleted = list(session.deleted)
+    tables = {obj.__table__.name for obj in written + deleted} & VERSIONED_TABLES.keys()
+    if not tables:
+        return
+    connection = session.connection()
+    row_version = _record_write(connection, tables)
+    if row_version is None:
+        return
+    for obj in written:
+        if obj.__table__.name in ROW_VERSIONED_TABLES:
+            obj.row_version = row_version
+    now = utcnow()
+    tombstones = [{'entity': obj.__table__.name, 'entity_id': obj.id, 'row_version': row_version, 'deleted_at': now}
+                  for obj in deleted if obj.__table__.name in ROW_VERSIONED_TABLES and obj.id is not None]
+    if tombstones:
+        connection.execute(insert(Tombstone.__table__), tombstones)
+
+
+def _do_orm_execute(state):
+    # INSERT / UPDATE / DELETE en masse (insert(Produit), archive_promotions, load_sales_table...)
+    if not (state.is_insert or state.is_update or state.is_delete) or state.bind_mapper is None:
+        return None
+    table = state.bind_mapper.local_table
+    if table.name not in VERSIONED_TABLES:
+        return None
+    statement = state.statement
+    connection = state.session.connection()
+    if state.is_update or state.is_delete:
+        # rien à modifier (passe du planificateur sans échéance) : ni compteur ni row_version
+        touched = select(table.c.id)
+        if statement.whereclause is not None:
+            touched = touched.where(statement.whereclause)
+        if not connection.execute(select(exists(touched))).scalar():
+            return None
+    elif state.is_executemany and not state.parameters:
+        return None
+    row_version = _record_write(connection, [table.name])
+    if row_version is None:
+        return None
+    if state.is_delete:
+        rows = select(literal(table.name), table.c.id, literal(row_version), literal(utcnow()))
+        if statement.whereclause is not None:
+            rows = rows.where(statement.whereclause)
+        connection.execute(insert(Tombstone.__table__).from_select(
+            ['entity', 'entity_id', 'row_version', 'deleted_at'], rows))
+        return None
+    if state.is_executemany:
+        return state.invoke_statement(params=[{'row_version': row_version}] * len(state.parameters))
+    return state.invoke_statement(statement=statement.values(row_version=row_version))
+
+
+def track_data_versions():
+    """Installe (une fois) les écouteurs qui incrémentent les compteurs à chaque écriture ORM."""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+        event.listen(Session, 'do_orm_execute', _do_orm_execute)
+
+
+# toute écriture par db.session (API, planificateur, scripts de chargement) est suivie
+track_data_versions()
+
+
+ARCHIVED_COLUMNS = ('id', 'produit_id', 'discount_percent', 'start_date', 'end_date', 'created_at')
+
+
+def archive_promotions(where, reason):
+    """Move the promotions matching `where` to `promotions_archive` (INSERT ... SELECT then DELETE).
+
+    Returns the ids of the products concerned.
+    """
+    produit_ids = db.session.execute(select(Promotion.produit_id).where(where).distinct()).scalars().all()
+    if not produit_ids:
+        return []
+    db.session.execute(insert(PromotionArchive).from_select(
+        ARCHIVED_COLUMNS + ('reason',),
+        select(*[getattr(Promotion, c) for c in ARCHIVED_COLUMNS], literal(reason)).where(where)
+    ))
+    db.session.execute(delete(Promotion).where(where).execution_options(synchronize_session='fetch'))
+    return produit_ids
+
+
+def effective_start(promotion=Promotion):
+    """Day a promotion took effect: its start_date, or its creation day when it applied immediately.
+
+    Promotions are ranked on it (then created_at, id): a scheduled promotion created
+    before an immediate one still wins once its start date is reached.
+    """
+    return db.func.coalesce(promotion.start_date, db.func.date(promotion.created_at))
+
+
+def superseded_promotions():
+    """Condition: an active promotion with a more recent active promotion on the same product."""
+    newer = aliased(Promotion)
+    newer_start, start = effective_start(newer), effective_start()
+    return Promotion.active.is_(True) & select(newer.id).where(
+        newer.produit_id == Promotion.produit_id,
+        newer.active.is_(True),
+        (newer_start > start)
+        | ((newer_start == start) & (newer.created_at > Promotion.created_at))
+        | ((newer_start == start) & (newer.created_at == Promotion.created_at) & (newer.id > Promotion.id))
+    ).exists()
+
+
+def refresh_promotion_columns(produit_ids):
+    """Recompute produits.promotion_* from `promotions` for the given products (one UPDATE)."""
+    if not produit_ids:
+        return 0
+
+    def latest(column):
+        return select(column).where(
+            Promotion.produit_id == Produit.id, Promotion.active.is_(True)
+        ).order_by(effective_start().desc(), Promotion.created_at.desc(), Promotion.id.desc()).limit(1).scalar_subquery()
+
+    result = db.session.execute(
+        update(Produit).where(Produit.id.in_(produit_ids)).values(
+            promotion_id=latest(Promotion.id),
+            promotion_discount_percent=latest(Promotion.discount_percent),
+            promotion_start_date=latest(Promotion.start_date),
+            promotion_end_date=latest(Promotion.end_date),
+        ).execution_options(synchronize_session=False)
+    )
+    for produit in db.session.identity_map.values():
+        if isinstance(produit, Produit) and produit.id in produit_ids:
+            db.session.expire(produit)
+    return result.rowcount
+
+
+def check_promotion_consistency(repair=True):
+    """Compare the denormalized promotion columns of `produits` with `promotions`.
+
+    The expected promotion of a product is its most recently started active one
+    (`effective_start`). Returns the list of drifted products `{'produit_id',
+    'stored', 'expected'}`; when `repair` is true they are fixed and committed.
+    """
+    ranked = db.session.query(
+        Promotion.id.label('id'),
+        Promotion.produit_id.label('produit_id'),
+        db.func.row_number().over(
+            partition_by=Promotion.produit_id,
+            order_by=(effective_start().desc(), Promotion.created_at.desc(), Promotion.id.desc())
+        ).label('rang')
+    ).filter(Promotion.active.is_(True)).subquery()
+    latest = db.session.query(ranked.c.produit_id, ranked.c.id).filter(ranked.c.rang == 1).subquery()
+
+    rows = db.session.query(Produit, Promotion).outerjoin(
+        latest, latest.c.produit_id == Produit.id
+    ).outerjoin(Promotion, Promotion.id == latest.c.id).all()
+
+    drift = []
+    for produit, promotion in rows:
+        expected = (promotion.id, promotion.discount_percent, promotion.start_date, promotion.end_date) \
+            if promotion is not None else (None, None, None, None)
+        stored = (produit.promotion_id, produit.promotion_discount_percent,
+                  produit.promotion_start_date, produit.promotion_end_date)
+        if stored != expected:
+            drift.append({'produit_id': produit.id, 'stored': stored[0], 'expected': expected[0]})
+            if repair:
+                produit.set_active_promotion(promotion)
+    if repair and drift:
+        db.session.commit()
+    return drift
+
+def catalog_changes(since=0):
+    """Produits et promotions écrits après la version `since`, et les ids supprimés depuis.
+
+    La version courante est lue avant les lignes : une écriture concurrente peut
+    être renvoyée deux fois, jamais manquée. `since` absent (0), ou postérieur à la
+    version courante (base réinitialisée), donne un instantané complet (`full`).
+    """
+    version = db.session.execute(
+        select(DataVersion.version).where(DataVersion.name == CATALOG_SEQUENCE)
+    ).scalar() or 0
+    full = since <= 0 or since > version
+    produits, promotions = select(Produit), select(Promotion)
+    deleted = {'produits': [], 'promotions': []}
+    if not full:
+        produits = produits.where(Produit.row_version > since)
+        promotions = promotions.where(Promotion.row_version > since)
+        tombstones = db.session.execute(
+            select(Tombstone.entity, Tombstone.entity_id).where(Tombstone.row_version > since)
+            .order_by(Tombstone.row_version)
+        ).all()
+        for entity, entity_id in tombstones:
+            deleted[entity].append(entity_id)
+    return {
+        'version': version,
+        'since': since,
+        'full': full,
+        'produits': [p.to_dict() for p in db.session.execute(produits.order_by(Produit.id)).scalars()],
+        'promotions': [p.to_dict() for p in db.session.execute(promotions.order_by(Promotion.id)).scalars()],
+        # à appliquer avant les lignes (un id SQLite peut être réutilisé après suppression)
+        'deleted': deleted,
+    }
+
+
 # Fonction pour générer des données de test
 def generer_donnees_test():
     """Génère des données de test pour la base de données"""
@@ -0,0 +1,232 @@
+"""
+Feature store for the waste-risk model.
+
+Per-product statistics are computed once, in a single vectorized pass over the
+sales history, and persisted on disk keyed by feature version and dataset hash.
+Training (`ml/train_waste_model.py`) and serving (`RiskModel`) both read from
+this store so the two code paths can no longer drift apart.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from config.constant import FEATURE_STORE_DIR
+from config.metrics import timed_function
+from helpers.sales import read_sales_file
+
+# Bump whenever the definition of a feature changes: stored files with another
+# version are ignored and rebuilt.
+FEATURE_VERSION = 1
+
+# Order expected by the deployed model
+FEATURE_COLUMNS = ['avg_daily_sales', 'price_rel', 'sales_cv', 'days_present']
+
+STATS_COLUMNS = ['avg_daily_sales', 'std_daily_sales', 'max_daily_sales', 'median_price', 'days_present']
+
+DEFAULT_STORE_DIR = FEATURE_STORE_DIR or os.path.join(os.path.dirname(__file__), 'saved_models')
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """Return the sha1 of a file's content (used as dataset hash)."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_version(path: str) -> Tuple[str, datetime]:
+    """Return (content hash, UTC modification time) of a dataset file."""
+    return file_digest(path), datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).replace(tzinfo=None)
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Return a content hash of an in-memory sales frame."""
+    values = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha1(values.tobytes()).hexdigest()
+
+
+def default_store_path(version: int = FEATURE_VERSION) -> str:
+    return os.path.join(DEFAULT_STORE_DIR, f'product_features_v{version}.joblib')
+
+
+@timed_function('pandas.feature_store.product_stats')
+def compute_product_stats(sales_df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate the raw sales history into one row of statistics per product.
+
+    Returns a DataFrame indexed by Product_Name with the STATS_COLUMNS.
+    """
+    if sales_df is None or len(sales_df) == 0 or 'Product_Name' not in sales_df.columns:
+        return pd.DataFrame(columns=STATS_COLUMNS, index=pd.Index([], name='Product_Name'), dtype=float)
+
+    frame = pd.DataFrame({
+        'Product_Name': sales_df['Product_Name'],
+        'Daily_Sales': pd.to_numeric(sales_df['Daily_Sales'], errors='coerce').fillna(0)
+        if 'Daily_Sales' in sales_df.columns else 0.0,
+        'Unit_Price': pd.to_numeric(sales_df['Unit_Price'], errors='coerce')
+        if 'Unit_Price' in sales_df.columns else np.nan,
+        'Date': sales_df['Date'] if 'Date' in sales_df.columns else pd.NaT,
+    })
+    stats = frame.groupby('Product_Name', sort=True, observed=True).agg(
+        avg_daily_sales=('Daily_Sales', 'mean'),
+        std_daily_sales=('Daily_Sales', 'std'),
+        max_daily_sales=('Daily_Sales', 'max'),
+        median_price=('Unit_Price', 'median'),
+        days_present=('Date', 'nunique'),
+    )
+    stats['std_daily_sales'] = stats['std_daily_sales'].fillna(0.0)
+    return stats[STATS_COLUMNS].astype(float)
+
+
+class FeatureStore:
+    """Per-product feature table keyed by product name and feature version."""
+
+    def __init__(self, stats: pd.DataFrame, version: int = FEATURE_VERSION, dataset_hash: Optional[str] = None):
+        self.stats = stats
+        self.version = version
+        self.dataset_hash = dataset_hash
+        # reference price used to normalise prices (median of per-product medians)
+        prices = stats['median_price'].dropna()
+        self.reference_price = float(prices.median()) if len(prices) > 0 else 1.0
+        # keyed lookup table: product name -> (avg_daily_sales, sales_cv, days_present)
+        avg = stats['avg_daily_sales'].to_numpy()
+        cv = self._sales_cv(avg, stats['std_daily_sales'].to_numpy())
+        self._rows: Dict[str, tuple] = dict(zip(
+            stats.index,
+            zip(avg.tolist(), cv.tolist(), stats['days_present'].to_numpy().tolist())
+        ))
+
+    @staticmethod
+    def _sales_cv(avg, std):
+        return np.where(avg > 0, std / (avg + 1e-6), 0.0)
+
+    @classmethod
+    def build(cls, sales_df: Optional[pd.DataFrame], dataset_hash: Optional[str] = None) -> 'FeatureStore':
+        """Compute the whole feature table from a sales frame in one vectorized pass."""
+        return cls(compute_product_stats(sales_df), dataset_hash=dataset_hash)
+
+    @classmethod
+    def build_chunked(cls, source, memory_budget_mb: float = 256, dataset_hash: Optional[str] = None) -> 'FeatureStore':
+        """Compute the feature table out of core from CSV chunks (see model/feature_stream.py)."""
+        from model.feature_stream import compute_product_stats_chunked
+        return cls(compute_product_stats_chunked(source, memory_budget_mb), dataset_hash=dataset_hash)
+
+    @classmethod
+    def build_from_table(cls, session, chunk_rows: int = 100_000, dataset_hash: Optional[str] = None) -> 'FeatureStore':
+        """Compute the feature table from the `ventes` table (SALES_STORAGE=database), streamed in chunks."""
+        from sqlalchemy import select
+        from model.ecomarche_db import Vente
+        from model.feature_stream import StreamingProductStats
+        query = select(Vente.date_vente.label('Date'), Vente.produit_nom.label('Product_Name'),
+                       Vente.quantite.label('Daily_Sales'), Vente.prix_unitaire.label('Unit_Price'))
+        acc = StreamingProductStats()
+        for chunk in pd.read_sql(query, session.connection(), chunksize=chunk_rows, parse_dates=['Date']):
+            acc.update(chunk)
+        return cls(acc.result(), dataset_hash=dataset_hash)
+
+    def save(self, path: Optional[str] = None) -> str:
+        path = path or default_store_path(self.version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump({
+            'version': self.version,
+            'dataset_hash': self.dataset_hash,
+            'stats': self.stats,
+        }, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, dataset_hash: Optional[str] = None) -> Optional['FeatureStore']:
+        """Load a stored table; returns None when missing, stale or of another version."""
+        path = path or default_store_path()
+        try:
+            if not os.path.exists(path):
+                return None
+            payload = joblib.load(path)
+            if payload.get('version') != FEATURE_VERSION:
+                return None
+            if dataset_hash is not None and payload.get('dataset_hash') != dataset_hash:
+                return None
+            return cls(payload['stats'], version=payload['version'], dataset_hash=payload.get('dataset_hash'))
+        except Exception:
+            return None
+
+    @classmethod
+    def load_or_build(cls, csv_path: str, sales_df: Optional[pd.DataFrame] = None,
+                      store_path: Optional[str] = None) -> 'FeatureStore':
+        """Return the stored table for this dataset, rebuilding and saving it when stale."""
+        dataset_hash = file_digest(csv_path) if os.path.exists(csv_path) else None
+        store = cls.load(store_path, dataset_hash)
+        if store is not None:
+            return store
+        if sales_df is None:
+            sales_df = read_sales_file(csv_path)
+        store = cls.build(sales_df, dataset_hash)
+        try:
+            store.save(store_path)
+        except OSError:
+            pass
+        return store
+
+    @classmethod
+    def load_or_build_from_table(cls, session, store_path: Optional[str] = None) -> 'FeatureStore':
+        """Stored table for the current version of `ventes`, rebuilt from the table when stale.
+
+        The CSV is never read: workers of a database-backed deployment do not hold
+        the history in memory, even on a store miss.
+        """
+        from model.ecomarche_db import read_data_versions
+        dataset_hash = f"ventes-v{read_data_versions(session).get('ventes', (0, None))[0]}"
+        store = cls.load(store_path, dataset_hash)
+        if store is not None:
+            return store
+        store = cls.build_from_table(session, dataset_hash=dataset_hash)
+        try:
+            store.save(store_path)
+        except OSError:
+            pass
+        return store
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, product_name) -> bool:
+        return product_name in self._rows
+
+    def get(self, product_name: str) -> Optional[Dict[str, float]]:
+        """Return the stored statistics of one product (single keyed fetch)."""
+        row = self._rows.get(product_name)
+        if row is None:
+            return None
+        avg_daily, sales_cv, days_present = row
+        return {'avg_daily_sales': avg_daily, 'sales_cv': sales_cv, 'days_present': days_present}
+
+    def features_for(self, product_name: str, unit_price: Optional[float]) -> List[float]:
+        """Return [avg_daily_sales, price_rel, sales_cv, days_present] for serving.
+
+        The stored statistics come from history; the price is the product's current
+        price, normalised by the same reference price used at training time.
+        """
+        row = self._rows.get(product_name)
+        avg_daily, sales_cv, days_present = row if row is not None else (0.0, 0.0, 0.0)
+        price = float(unit_price) if unit_price is not None else 0.0
+        return [avg_daily, price / (self.reference_price + 1e-6), sales_cv, days_present]
+
+    def training_frame(self) -> pd.DataFrame:
+        """Return the training view: FEATURE_COLUMNS plus the raw stats, one row per product."""
+        frame = self.stats.copy()
+        frame['price_rel'] = frame['median_price'] / (self.reference_price + 1e-6)
+        frame['sales_cv'] = self._sales_cv(frame['avg_daily_sales'].to_numpy(), frame['std_daily_sales'].to_numpy())
+        return frame.reset_index()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'dataset_hash': self.dataset_hash,
+            'products': len(self),
+            'reference_price': self.reference_price,
+        }
@@ -0,0 +1,229 @@
+"""
+Out-of-core computation of the per-product statistics of the feature store.
+
+`compute_product_stats_chunked` reads the sales history in CSV chunks (one file or
+a set of partitioned files) and merges per-chunk aggregates into a small running
+state, so the raw history never has to fit in memory:
+
+- count / mean / M2 of Daily_Sales, merged with Chan's parallel formula (std)
+- running max of Daily_Sales
+- a bitmap of the days seen per product (one bit per product and calendar day) for
+  days_present: exact, and sized by the calendar span rather than the row count
+- a bounded price histogram per product for the median price; it is exact while a
+  product has at most `max_price_bins` distinct prices and degrades to a centroid
+  sketch beyond that
+
+The running state gets half of the memory budget (the parsed chunk the other
+half): above it the price histograms are compacted further, down to
+`MIN_PRICE_BINS`, and a MemoryError is raised if that is not enough.
+
+On data small enough for pandas the result matches `compute_product_stats`.
+"""
+import glob
+import os
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from model.feature_store import STATS_COLUMNS
+
+DEFAULT_MEMORY_BUDGET_MB = 256
+DEFAULT_MAX_PRICE_BINS = 256
+MIN_PRICE_BINS = 8
+
+# number of set bits of every byte value
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+USED_COLUMNS = ['Date', 'Product_Name', 'Daily_Sales', 'Unit_Price']
+
+
+def resolve_paths(source: Union[str, Iterable[str]]) -> List[str]:
+    """Accept a CSV file, a directory of partitioned CSV files, a glob or a list of paths."""
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            return sorted(glob.glob(os.path.join(source, '*.csv')))
+        if any(ch in source for ch in '*?['):
+            return sorted(glob.glob(source))
+        return [source]
+    return list(source)
+
+
+def estimate_chunksize(path: str, memory_budget_mb: float, sample_rows: int = 1000) -> int:
+    """Number of rows per chunk so that one parsed chunk uses about half of the budget."""
+    sample = pd.read_csv(path, nrows=sample_rows, usecols=lambda c: c in USED_COLUMNS, parse_dates=['Date'])
+    if len(sample) == 0:
+        return sample_rows
+    bytes_per_row = max(1.0, sample.memory_usage(deep=True).sum() / len(sample))
+    return max(100, int(memory_budget_mb * 1024 * 1024 * 0.5 / bytes_per_row))
+
+
+class StreamingProductStats:
+    """Mergeable per-product accumulator fed one DataFrame chunk at a time."""
+
+    def __init__(self, max_price_bins: int = DEFAULT_MAX_PRICE_BINS, memory_budget_bytes: Optional[int] = None):
+        self.max_price_bins = max_price_bins
+        self.memory_budget_bytes = memory_budget_bytes
+        self.names = pd.Index([], dtype=object)
+        self.count = np.zeros(0)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.max = np.zeros(0)
+        # day_bits[code, d // 8] bit d % 8: product `code` sold on day `first_day + d`
+        self.day_bits = np.zeros((0, 0), dtype=np.uint8)
+        self.first_day: Optional[int] = None
+        self.prices = pd.Series(dtype=float, index=pd.MultiIndex.from_arrays([[], []], names=['code', 'price']))
+        self.rows = 0
+
+    def _encode(self, product_names: pd.Series) -> np.ndarray:
+        new = pd.Index(product_names.unique()).difference(self.names)
+        if len(new) > 0:
+            self.names = self.names.append(new)
+            grow = len(new)
+            self.count = np.concatenate([self.count, np.zeros(grow)])
+            self.mean = np.concatenate([self.mean, np.zeros(grow)])
+            self.m2 = np.concatenate([self.m2, np.zeros(grow)])
+            self.max = np.concatenate([self.max, np.full(grow, -np.inf)])
+            self.day_bits = np.concatenate([self.day_bits, np.zeros((grow, self.day_bits.shape[1]), dtype=np.uint8)])
+        return self.names.get_indexer(product_names)
+
+    def _mark_days(self, codes: np.ndarray, days: np.ndarray):
+        """Set the bits of the (product, day) pairs, widening the calendar span when needed."""
+        if len(days) == 0:
+            return
+        lo, hi = int(days.min()), int(days.max())
+        if self.first_day is None:
+            self.first_day = lo
+        width = self.day_bits.shape[1]
+        if lo < self.first_day:
+            # whole bytes on the left, so that existing bits keep their offsets
+            shift = -(-(self.first_day - lo) // 8)
+            self.day_bits = np.pad(self.day_bits, ((0, 0), (shift, 0)))
+            self.first_day -= 8 * shift
+            width += shift
+        needed = (hi - self.first_day) // 8 + 1
+        if needed > width:
+            self.day_bits = np.pad(self.day_bits, ((0, 0), (0, max(needed - width, width // 2))))
+        offset = days - self.first_day
+        pairs = np.unique(codes.astype(np.int64) << 32 | offset)
+        codes, offset = pairs >> 32, pairs & 0xFFFFFFFF
+        np.bitwise_or.at(self.day_bits, (codes, offset >> 3), (1 << (offset & 7)).astype(np.uint8))
+
+    def update(self, chunk: pd.DataFrame):
+        chunk = chunk[chunk['Product_Name'].notna()]
+        if len(chunk) == 0:
+            return
+        self.rows += len(chunk)
+        codes = self._encode(chunk['Product_Name'])
+        sales = pd.to_numeric(chunk['Daily_Sales'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+        # sales moments: merge the chunk's (count, mean, M2, max) into the running state
+        agg = pd.DataFrame({'code': codes, 'sales': sales}).groupby('code')['sales'].agg(['count', 'mean', 'var', 'max'])
+        idx = agg.index.to_numpy()
+        nb = agg['count'].to_numpy(dtype=float)
+        mb = agg['mean'].to_numpy()
+        m2b = (agg['var'].fillna(0.0) * (nb - 1)).to_numpy()
+        na, ma = self.count[idx], self.mean[idx]
+        n = na + nb
+        delta = mb - ma
+        self.mean[idx] = ma + delta * nb / n
+        self.m2[idx] = self.m2[idx] + m2b + delta * delta * na * nb / n
+        self.count[idx] = n
+        self.max[idx] = np.maximum(self.max[idx], agg['max'].to_numpy())
+
+        # distinct dates per product
+        dates = pd.to_datetime(chunk['Date'], errors='coerce')
+        valid = dates.notna().to_numpy()
+        self._mark_days(codes[valid], dates[valid].to_numpy().astype('datetime64[D]').astype(np.int64))
+
+        # price histogram
+        prices = pd.to_numeric(chunk['Unit_Price'], errors='coerce').to_numpy(dtype=float)
+        has_price = ~np.isnan(prices)
+        hist = pd.Series(1.0, index=pd.MultiIndex.from_arrays([codes[has_price], prices[has_price]], names=['code', 'price']))
+        hist = hist.groupby(level=['code', 'price']).sum()
+        self.prices = self.prices.add(hist, fill_value=0).sort_index()
+        self._compact_prices()
+        self.prices.index = self.prices.index.remove_unused_levels()
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        """Shrink the price histograms until the state fits `memory_budget_bytes`."""
+        if self.memory_budget_bytes is None:
+            return
+        while self.memory_bytes() > self.memory_budget_bytes and self.max_price_bins > MIN_PRICE_BINS:
+            self.max_price_bins = max(MIN_PRICE_BINS, self.max_price_bins // 2)
+            self._compact_prices()
+        if self.memory_bytes() > self.memory_budget_bytes:
+            raise MemoryError(f"streaming state of {len(self.names)} products ({self.memory_bytes() / 1e6:.1f} MB) "
+                              f"exceeds its budget of {self.memory_budget_bytes / 1e6:.1f} MB")
+
+    def _compact_prices(self):
+        """Shrink the histogram of products above `max_price_bins` into equal-weight centroids."""
+        bins = self.prices.groupby(level='code').size()
+        over = bins[bins > self.max_price_bins].index
+        if len(over) == 0:
+            return
+        keep = self.prices[~self.prices.index.get_level_values('code').isin(over)]
+        compacted = []
+        for code in over:
+            hist = self.prices.xs(code, level='code')
+            values, weights = hist.index.to_numpy(), hist.to_numpy()
+            edges = np.linspace(0, weights.sum(), self.max_price_bins + 1)[1:-1]
+            bucket = np.searchsorted(edges, np.cumsum(weights) - weights / 2)
+            w = np.bincount(bucket, weights=weights)
+            c = np.bincount(bucket, weights=values * weights)
+            nz = w > 0
+            compacted.append(pd.Series(w[nz], index=pd.MultiIndex.from_arrays(
+                [np.full(nz.sum(), code), c[nz] / w[nz]], names=['code', 'price'])))
+        self.prices = pd.concat([keep] + compacted).sort_index()
+        self.prices.index = self.prices.index.remove_unused_levels()
+
+    def _median_prices(self) -> np.ndarray:
+        medians = np.full(len(self.names), np.nan)
+        if len(self.prices) == 0:
+            return medians
+        codes = self.prices.index.get_level_values('code').to_numpy()
+        values = self.prices.index.get_level_values('price').to_numpy()
+        cum = self.prices.groupby(level='code').cumsum().to_numpy()
+        total = self.prices.groupby(level='code').transform('sum').to_numpy()
+        frame = pd.DataFrame({'code': codes, 'value': values})
+        # value at rank (n-1)//2 and at rank n//2, averaged as pandas does for even counts
+        lower = frame[cum > (total - 1) // 2].groupby('code')['value'].first()
+        upper = frame[cum > total // 2].groupby('code')['value'].first()
+        medians[lower.index.to_numpy()] = (lower.to_numpy() + upper.reindex(lower.index).to_numpy()) / 2
+        return medians
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the running state."""
+        return int(self.count.nbytes * 4 + self.day_bits.nbytes
+                   + self.prices.memory_usage(index=True) + self.names.memory_usage(deep=True))
+
+    def result(self) -> pd.DataFrame:
+        """Return the statistics in the layout of `compute_product_stats`."""
+        days = POPCOUNT[self.day_bits].sum(axis=1, dtype=np.int64)
+        std = np.where(self.count > 1, np.sqrt(self.m2 / np.maximum(self.count - 1, 1)), 0.0)
+        stats = pd.DataFrame({
+            'avg_daily_sales': self.mean,
+            'std_daily_sales': std,
+            'max_daily_sales': self.max,
+            'median_price': self._median_prices(),
+            'days_present': days,
+        }, index=pd.Index(self.names, name='Product_Name'))
+        return stats.sort_index()[STATS_COLUMNS].astype(float)
+
+
+def compute_product_stats_chunked(source: Union[str, Iterable[str]],
+                                  memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                                  max_price_bins: int = DEFAULT_MAX_PRICE_BINS,
+                                  chunksize: Optional[int] = None) -> pd.DataFrame:
+    """Stream one or several sales CSV files through a StreamingProductStats accumulator."""
+    paths = resolve_paths(source)
+    if not paths:
+        raise FileNotFoundError(f"No sales files found for {source}")
+    # the parsed chunk takes about half of the budget (estimate_chunksize), the running state the rest
+    acc = StreamingProductStats(max_price_bins, memory_budget_bytes=int(memory_budget_mb * 1024 * 1024 * 0.5))
+    for path in paths:
+        rows = chunksize or estimate_chunksize(path, memory_budget_mb)
+        for chunk in pd.read_csv(path, chunksize=rows, usecols=lambda c: c in USED_COLUMNS, parse_dates=['Date']):
+            acc.update(chunk)
+    return acc.result()
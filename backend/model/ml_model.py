@@ -1,7 +1,74 @@
 import os
-import joblib
+import threading
+import time
+from collections import OrderedDict
 import math
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Callable, Dict
+
+from config.constant import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_SECONDS
+from config.metrics import timed_function
+from model.feature_store import FeatureStore
+from model.compact_forest import load_model_artifact
+
+
+class PredictionCache:
+    """Bounded LRU/TTL cache of predictions keyed on (model version, data version, feature vector)."""
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS):
+        self.max_size = max(0, int(max_size))
+        self.ttl = float(ttl_seconds)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.ttl > 0 and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: float):
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
 
 
 class RiskModel:
@@ -11,8 +78,12 @@ class RiskModel:
     to predict will return None.
     """
 
-    def __init__(self, model: Optional[Any]):
+    def __init__(self, model: Optional[Any], version: Optional[str] = None, cache: Optional[PredictionCache] = None):
         self.model = model
+        # identifies the artifact; part of every cache key so a swapped model never reuses old entries
+        self.version = version or f'mem-{id(model)}'
+        self.cache = cache if cache is not None else PredictionCache()
+        self._data_version = None
 
     @staticmethod
     def load(path: Optional[str] = None):
@@ -21,14 +92,17 @@ class RiskModel:
         try:
             if not os.path.exists(path):
                 return RiskModel(None)
-            m = joblib.load(path)
-            return RiskModel(m)
+            # accepts both plain joblib estimators and compact-forest exports
+            m = load_model_artifact(path)
+            st = os.stat(path)
+            return RiskModel(m, version=f'{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}')
         except Exception:
             return RiskModel(None)
 
     def is_loaded(self) -> bool:
         return self.model is not None
 
+    @timed_function('model.risk.predict_proba')
     def predict_proba(self, X: List[List[float]]) -> Optional[List[float]]:
         try:
             if self.model is None:
@@ -43,6 +117,33 @@ class RiskModel:
         except Exception:
             return None
 
+    def predict_proba_cached(self, X: List[List[float]], data_version: Optional[str] = None,
+                             predict_fn: Optional[Callable[[List[List[float]]], Optional[List[float]]]] = None
+                             ) -> Optional[List[Optional[float]]]:
+        """predict_proba through the prediction cache.
+
+        Cached rows are served directly; the misses are predicted in one call (with
+        `predict_fn`, e.g. the micro-batcher, or predict_proba) and stored. The cache
+        is cleared when `data_version` (the sales dataset hash) changes.
+        """
+        if self.model is None:
+            return None
+        if data_version != self._data_version:
+            self.cache.clear()
+            self._data_version = data_version
+        keys = [(self.version, data_version, tuple(row)) for row in X]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, value in enumerate(results) if value is None]
+        if missing:
+            proba = (predict_fn or self.predict_proba)([X[i] for i in missing])
+            if proba is None:
+                return None
+            for i, value in zip(missing, proba):
+                results[i] = value
+                if value is not None:
+                    self.cache.put(keys[i], value)
+        return results
+
     def predict(self, X: List[List[float]]) -> Optional[List[float]]:
         try:
             if self.model is None:
@@ -53,47 +154,23 @@ class RiskModel:
             return None
 
     @staticmethod
-    def build_features_for_product(product, sales_df):
-        """Build a minimal feature vector used by the deployed model.
+    def build_features_for_product(product, sales_df, store=None):
+        """Build the feature vector used by the deployed model.
 
-        Features (compatible with the minimal training script):
+        Features (compatible with the training script, see model/feature_store.py):
           - avg_daily_sales
-          - price_rel (unit_price / median_price)
+          - price_rel (unit_price / reference median price)
           - sales_cv (coefficient of variation)
           - days_present
 
+        Features are read from `store` (a FeatureStore) with a single keyed lookup.
+        Without a store, one is built from `sales_df` (slow path, kept for scripts/tests).
+
         Returns a list of floats [avg_daily_sales, price_rel, sales_cv, days_present]
         """
         try:
-            # average daily sales estimate
-            prod_name = product.nom
-            if sales_df is not None and 'Product_Name' in sales_df.columns:
-                prod_df = sales_df[sales_df['Product_Name'] == prod_name]
-                if len(prod_df) > 0:
-                    prod_daily = prod_df.groupby(prod_df['Date'].dt.date)['Daily_Sales'].sum().reset_index()
-                    avg_daily = float(prod_daily['Daily_Sales'].mean()) if len(prod_daily) > 0 else 0.0
-                    sales_std = float(prod_daily['Daily_Sales'].std()) if len(prod_daily) > 0 else 0.0
-                    days_present = float(prod_df['Date'].nunique())
-                else:
-                    avg_daily = 0.0
-                    sales_std = 0.0
-                    days_present = 0.0
-            else:
-                avg_daily = 0.0
-                sales_std = 0.0
-                days_present = 0.0
-
-            median_price = 1.0
-            if sales_df is not None and 'Unit_Price' in sales_df.columns:
-                try:
-                    median_price = float(sales_df['Unit_Price'].median())
-                except Exception:
-                    median_price = 1.0
-
-            unit_price = float(product.prix_unitaire) if product.prix_unitaire is not None else 0.0
-            price_rel = unit_price / (median_price + 1e-6)
-            sales_cv = (sales_std / (avg_daily + 1e-6)) if avg_daily > 0 else 0.0
-
-            return [avg_daily, price_rel, sales_cv, days_present]
+            if store is None:
+                store = FeatureStore.build(sales_df)
+            return store.features_for(product.nom, product.prix_unitaire)
         except Exception:
             return [0.0, 0.0, 0.0, 0.0]
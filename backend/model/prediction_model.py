@@ -5,6 +5,12 @@ from sklearn.ensemble import RandomForestRegressor
 from datetime import datetime, timedelta
 import os
 
+from config.metrics import timed_function
+from model.compact_forest import load_model_artifact
+
+# Prix utilisé pour un produit sans prix unitaire (API de prévision et recommandations)
+DEFAULT_PRICE = 10.0
+
 class DemandPredictionModel:
     def __init__(self):
         self.model = RandomForestRegressor(n_estimators=100, random_state=42)
@@ -14,7 +20,7 @@ class DemandPredictionModel:
         # Charger le modèle s'il existe
         if os.path.exists(self.model_path):
             try:
-                self.model = joblib.load(self.model_path)
+                self.model = load_model_artifact(self.model_path)
                 self.is_trained = True
                 print("Modèle de prédiction chargé avec succès")
             except Exception as e:
@@ -48,49 +54,102 @@ class DemandPredictionModel:
         joblib.dump(self.model, self.model_path)
         print("Modèle simulé entraîné et sauvegardé")
     
-    def predict(self, product_id, days=7, category_id=0, price=10.0):
+    @staticmethod
+    def build_feature_matrix(category_ids, prices, days, start_date=None):
+        """
+        Construit la matrice de caractéristiques (produits x horizon) en une seule fois
+
+        Args:
+            category_ids: Séquence des ID de catégorie (un par produit)
+            prices: Séquence des prix (un par produit ; None -> DEFAULT_PRICE)
+            days: Nombre de jours de l'horizon
+            start_date: Date de référence (aujourd'hui par défaut)
+
+        Returns:
+            Tuple (matrice de forme (n_produits * days, 4), liste des dates de l'horizon)
+        """
+        start_date = start_date or datetime.now()
+        dates = [start_date + timedelta(days=day) for day in range(1, days + 1)]
+        weekdays = np.array([d.weekday() for d in dates], dtype=float)
+        months = np.array([d.month for d in dates], dtype=float)
+
+        categories = np.asarray(category_ids, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        prices = np.where(np.isnan(prices), DEFAULT_PRICE, prices)
+        n_products = len(categories)
+
+        # Ligne i * days + j = produit i, jour j
+        X = np.empty((n_products * days, 4), dtype=float)
+        X[:, 0] = np.tile(weekdays, n_products)
+        X[:, 1] = np.tile(months, n_products)
+        X[:, 2] = np.repeat(categories, days)
+        X[:, 3] = np.repeat(prices, days)
+        return X, dates
+
+    @timed_function('model.demand.forecast_matrix')
+    def forecast_matrix(self, category_ids, prices, days=7, start_date=None):
+        """
+        Prédit la demande journalière de plusieurs produits en un seul appel au modèle
+
+        Returns:
+            Tuple (tableau d'entiers de forme (n_produits, days), liste des dates)
+        """
+        if not self.is_trained:
+            self.train_mock_model()
+
+        X, dates = self.build_feature_matrix(category_ids, prices, days, start_date)
+        if len(X) == 0:
+            return np.zeros((0, days), dtype=int), dates
+
+        raw = self.model.predict(X).reshape(-1, days)
+        # Résultats déterministes : plancher à 5 unités, sans bruit aléatoire
+        predictions = np.maximum(5, raw.astype(int))
+        return predictions, dates
+
+    def predict_batch(self, products, days=7, start_date=None):
+        """
+        Prédit la demande pour plusieurs produits sur plusieurs jours
+
+        Args:
+            products: Liste de dictionnaires {product_id, category_id, price}
+            days: Nombre de jours pour la prédiction
+
+        Returns:
+            Dictionnaire product_id -> liste de prédictions quotidiennes
+        """
+        predictions, dates = self.forecast_matrix(
+            [p.get('category_id') or 0 for p in products],
+            [p.get('price') for p in products],
+            days,
+            start_date
+        )
+        labels = [date.strftime("%Y-%m-%d") for date in dates]
+        return {
+            p['product_id']: [
+                {"date": label, "prediction": int(value)}
+                for label, value in zip(labels, row)
+            ]
+            for p, row in zip(products, predictions)
+        }
+
+    def predict(self, product_id, days=7, category_id=0, price=DEFAULT_PRICE):
         """
         Prédit la demande pour un produit sur plusieurs jours
-        
+
         Args:
             product_id: Identifiant du produit
             days: Nombre de jours pour la prédiction
             category_id: ID de la catégorie du produit
             price: Prix du produit
-            
+
         Returns:
             Liste de prédictions quotidiennes
         """
-        if not self.is_trained:
-            self.train_mock_model()
-        
-        predictions = []
-        today = datetime.now()
-        
-        for day in range(1, days + 1):
-            date = today + timedelta(days=day)
-            
-            # Caractéristiques pour la prédiction
-            features = np.array([
-                date.weekday(),  # jour de la semaine (0-6)
-                date.month,      # mois (1-12)
-                category_id,     # catégorie
-                price            # prix
-            ]).reshape(1, -1)
-            
-            # Prédiction
-            prediction = max(5, int(self.model.predict(features)[0]))
-            
-            # Ajouter un peu de variation aléatoire pour simuler des fluctuations réalistes
-            variation = np.random.normal(0, prediction * 0.1)
-            prediction = max(1, int(prediction + variation))
-            
-            predictions.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "prediction": prediction
-            })
-        
-        return predictions
+        batch = self.predict_batch(
+            [{"product_id": product_id, "category_id": category_id, "price": price}],
+            days
+        )
+        return batch[product_id]
 
 # Créer une instance du modèle pour l'utiliser dans l'API
 demand_model = DemandPredictionModel()
\ No newline at end of file
@@ -5,6 +5,8 @@ from sklearn.ensemble import GradientBoostingRegressor
 from datetime import datetime, timedelta
 import os
 
+from model.compact_forest import load_model_artifact
+
 class DynamicPricingModel:
     def __init__(self):
         self.model = GradientBoostingRegressor(n_estimators=100, random_state=42)
@@ -14,7 +16,7 @@ class DynamicPricingModel:
         # Charger le modèle s'il existe
         if os.path.exists(self.model_path):
             try:
-                self.model = joblib.load(self.model_path)
+                self.model = load_model_artifact(self.model_path)
                 self.is_trained = True
                 print("Modèle de tarification chargé avec succès")
             except Exception as e:
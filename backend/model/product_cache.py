@@ -0,0 +1,168 @@
+"""
+Read-through cache of serialized products (`Produit.to_dict()`).
+
+Entries are keyed by product id and validated against a version: the product's
+own invalidation counter, a global generation (bumped by `invalidate_all` for
+bulk writes) and the current date (`jours_restants` changes at midnight).
+Writes in this process invalidate explicitly after their commit. Writes made by
+other worker processes are picked up through `sync`: versioned reads (config/
+conditional.py) pass the `produits`/`promotions` counters of `data_versions`,
+and any change drops every entry, so a body is never older than the ETag it is
+served under. Otherwise `ttl_seconds` is the staleness bound across workers.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Optional
+
+from config.constant import PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL_SECONDS
+from config.db import db
+from model.ecomarche_db import Produit
+
+
+class ProductCache:
+    """Bounded LRU/TTL cache of product dicts with explicit invalidation."""
+
+    def __init__(self, max_size: int = PRODUCT_CACHE_SIZE, ttl_seconds: float = PRODUCT_CACHE_TTL_SECONDS):
+        self.max_size = max(0, int(max_size))
+        self.ttl = float(ttl_seconds)
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # per-product invalidation counters, drawn from `_sequence` so that a value is
+        # never reused; products without a counter are at `_floor` (see _prune_versions)
+        self._versions: Dict[int, int] = {}
+        self._sequence = 0
+        self._floor = 0
+        self._generation = 0
+        self._data_version: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _version(self, produit_id: int) -> tuple:
+        return (self._generation, self._data_version, self._versions.get(produit_id, self._floor), date.today())
+
+    def get(self, produit_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(produit_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, version, stored_at = entry
+            if version != self._version(produit_id) or (self.ttl > 0 and time.monotonic() - stored_at > self.ttl):
+                del self._entries[produit_id]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(produit_id)
+            self.hits += 1
+            return payload
+
+    def snapshot(self, produit_id: int) -> tuple:
+        """Version to pass to `put` once the product has been loaded."""
+        with self._lock:
+            return self._version(produit_id)
+
+    def put(self, produit_id: int, payload: dict, version: tuple):
+        """Store a loaded payload unless the product was invalidated since `snapshot`."""
+        if payload is None or self.max_size == 0:
+            return
+        with self._lock:
+            # an invalidation during the load wins: the (possibly stale) result is not stored
+            if version != self._version(produit_id):
+                return
+            self._entries[produit_id] = (payload, version, time.monotonic())
+            self._entries.move_to_end(produit_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, produit_id: int, loader: Callable[[int], Optional[dict]]) -> Optional[dict]:
+        """Return the cached dict, or call `loader(produit_id)` and cache its result (None is not cached)."""
+        payload = self.get(produit_id)
+        if payload is not None:
+            return payload
+        version = self.snapshot(produit_id)
+        payload = loader(produit_id)
+        self.put(produit_id, payload, version)
+        return payload
+
+    def invalidate(self, *produit_ids: int):
+        """Drop the given products; call after the write has been committed."""
+        with self._lock:
+            for produit_id in produit_ids:
+                self._entries.pop(produit_id, None)
+                self._sequence += 1
+                self._versions[produit_id] = self._sequence
+                self.invalidations += 1
+            if len(self._versions) > 2 * max(self.max_size, 1):
+                self._prune_versions()
+
+    def _prune_versions(self):
+        """Keep the counters of cached products only; the others move to a new floor.
+
+        The floor is a fresh sequence value: a load started before the pruning has an
+        older version and its `put` is still rejected. Called with the lock held.
+        """
+        self._versions = {produit_id: self._versions.get(produit_id, self._floor) for produit_id in self._entries}
+        self._sequence += 1
+        self._floor = self._sequence
+
+    def invalidate_all(self):
+        """Drop every entry (bulk writes)."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._versions.clear()
+            self.invalidations += 1
+
+    def sync(self, data_version: tuple):
+        """Drop every entry if the database counters moved (writes from any process)."""
+        with self._lock:
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            self._entries.clear()
+            self._versions.clear()
+
+    def after_fork(self):
+        """New lock in a forked worker (the master's scheduler thread may have held it at fork time)."""
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        now = time.monotonic()
+        with self._lock:
+            oldest = min((stored_at for _, _, stored_at in self._entries.values()), default=None)
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'max_staleness_seconds': self.ttl,
+            'oldest_entry_age_seconds': round(now - oldest, 3) if oldest is not None else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+def load_produit_dict(produit_id: int) -> Optional[Dict[str, Any]]:
+    produit = db.session.get(Produit, produit_id)
+    return produit.to_dict() if produit is not None else None
+
+
+def get_produit_dict(produit_id: int) -> Optional[Dict[str, Any]]:
+    """Serialized product through the cache (no query and no to_dict() on a hit)."""
+    return product_cache.get_or_load(produit_id, load_produit_dict)
+
+
+product_cache = ProductCache()
@@ -0,0 +1,162 @@
+"""
+Promotion lifecycle: activation, expiry and archiving.
+
+Each run is a handful of set-based statements, in one transaction:
+
+- activation: `UPDATE promotions SET active = true` for scheduled rows whose
+  `start_date` has been reached (index `ix_promotions_active_start`);
+- expiry: rows whose `end_date` is past move to `promotions_archive`
+  (index `ix_promotions_end_date`);
+- supersession: an active promotion with a more recent active one on the same
+  product is archived too (index `ix_promotions_produit_active_created`);
+- the denormalized `produits.promotion_*` columns of the products concerned are
+  recomputed with a single UPDATE.
+
+`promotions` therefore only keeps scheduled and current rows.
+
+Every pass of `PromotionScheduler` is also counted in `data_versions`
+(`promotion_scheduler`). Under gunicorn with SERVER_PRELOAD the thread lives in
+the master only: workers report its passes from that shared counter, and see the
+rows it changed through the `produits`/`promotions` counters (the master's
+`product_cache.invalidate` does not reach them, see model/product_cache.py).
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import or_, select, update
+
+from config.db import db
+from model.ecomarche_db import (
+    Promotion, archive_promotions, bump_data_versions, read_data_versions, refresh_promotion_columns,
+    superseded_promotions
+)
+from model.product_cache import product_cache
+
+# data_versions counter incremented by every scheduler pass, in any process
+SCHEDULER_VERSION = 'promotion_scheduler'
+
+
+def run_promotion_lifecycle(today: Optional[date] = None) -> Dict[str, int]:
+    """Apply one lifecycle pass and commit; returns the number of rows per step."""
+    today = today or date.today()
+    try:
+        due = Promotion.active.is_(False) & (Promotion.start_date <= today) \
+            & or_(Promotion.end_date.is_(None), Promotion.end_date >= today)
+        activated_ids = db.session.execute(select(Promotion.produit_id).where(due).distinct()).scalars().all()
+        activated = db.session.execute(
+            update(Promotion).where(due).values(active=True).execution_options(synchronize_session=False)
+        ).rowcount
+
+        expired_ids = archive_promotions(Promotion.end_date < today, 'expired')
+        # inactive rows that will never start (legacy deactivations without start_date)
+        stale_ids = archive_promotions(Promotion.active.is_(False) & Promotion.start_date.is_(None), 'inactive')
+        superseded_ids = archive_promotions(superseded_promotions(), 'superseded')
+
+        produit_ids = sorted(set(activated_ids) | set(expired_ids) | set(stale_ids) | set(superseded_ids))
+        refreshed = refresh_promotion_columns(produit_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    product_cache.invalidate(*produit_ids)
+    return {
+        'activated': activated,
+        'expired_products': len(expired_ids),
+        'superseded_products': len(superseded_ids),
+        'stale_products': len(stale_ids),
+        'products_refreshed': refreshed,
+    }
+
+
+class PromotionScheduler:
+    """Background thread running `run_promotion_lifecycle` every `interval_seconds`."""
+
+    def __init__(self, app, interval_seconds: float = 300.0):
+        self.app = app
+        self.interval = max(1.0, float(interval_seconds))
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._pid = None
+        # metrics
+        self.runs = 0
+        self.failures = 0
+        self.last_run_at: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_result: Optional[Dict[str, int]] = None
+        self.last_error: Optional[str] = None
+
+    def run_once(self, today: Optional[date] = None) -> Optional[Dict[str, int]]:
+        start = time.perf_counter()
+        with self.app.app_context():
+            try:
+                self.last_result = run_promotion_lifecycle(today)
+                self.last_error = None
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+            try:
+                bump_data_versions(db.session.connection(), [SCHEDULER_VERSION])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+            finally:
+                db.session.remove()
+        self.runs += 1
+        self.last_run_at = datetime.now().isoformat(timespec='seconds')
+        self.last_duration_ms = (time.perf_counter() - start) * 1000.0
+        return self.last_result if self.last_error is None else None
+
+    def start(self):
+        # (re)start the thread, including in a freshly forked worker process
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='promotion-scheduler', daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def shared_passes(self) -> Dict[str, Any]:
+        """Passes of every process (data_versions), e.g. the master's thread seen from a worker."""
+        try:
+            with self.app.app_context():
+                passes, last_pass = read_data_versions().get(SCHEDULER_VERSION, (0, None))
+        except Exception:
+            return {'passes': None, 'last_pass_at': None}
+        # stored in UTC, reported like last_run_at (local time)
+        last_pass = last_pass.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None) if last_pass else None
+        return {'passes': passes, 'last_pass_at': last_pass}
+
+    def stats(self) -> Dict[str, Any]:
+        shared = self.shared_passes()
+        running = self._worker is not None and self._worker.is_alive() and self._pid == os.getpid()
+        if not running and self._pid is not None and self._pid == os.getppid():
+            # started in the gunicorn master before the fork: alive if it passed recently
+            last_pass = shared['last_pass_at']
+            running = last_pass is not None and datetime.now() - last_pass <= timedelta(seconds=2 * self.interval)
+        return {
+            'interval_seconds': self.interval,
+            'running': running,
+            'scheduler_pid': self._pid,
+            'passes': shared['passes'],
+            'last_pass_at': shared['last_pass_at'].isoformat(timespec='seconds') if shared['last_pass_at'] else None,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_run_at': self.last_run_at,
+            'last_duration_ms': self.last_duration_ms,
+            'last_result': self.last_result,
+            'last_error': self.last_error,
+        }
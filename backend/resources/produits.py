@@ -2,15 +2,18 @@
 API endpoints pour la gestion des produits
 """
 from flask_restful import Resource
+from config.json_provider import shaped
 from helpers.produits import (
     get_all_produits, 
     get_produit_by_id, 
+    get_produit_changes,
     create_produit, 
     update_produit, 
     delete_produit,
     predict_demand,
     calculate_pricing
 )
+from model.product_cache import product_cache
 
 class ProduitsApi(Resource):
     def get(self, route):
@@ -18,7 +21,11 @@ class ProduitsApi(Resource):
         Gère les requêtes GET pour les produits
         """
         if route == 'all':
-            return get_all_produits()
+            return shaped(get_all_produits())
+        elif route == 'cache':
+            return {"status": "success", "stats": product_cache.stats()}
+        elif route == 'changes':
+            return shaped(get_produit_changes())
         elif route.isdigit():
             return get_produit_by_id(int(route))
         else:
@@ -31,9 +38,7 @@ class ProduitsApi(Resource):
         if route == 'create':
             return create_produit()
         elif route == 'predict':
-            # Endpoint de prédiction désactivé — renvoyer 410 Gone pour indiquer
-            # que la fonctionnalité n'est plus disponible.
-            return ({'status': 'error', 'error_description': 'La fonctionnalité de prédiction de la demande a été désactivée'}, 410)
+            return predict_demand()
         elif route == 'pricing':
             return calculate_pricing()
         else:
@@ -1,7 +1,11 @@
+from types import SimpleNamespace
+
 from flask import current_app, jsonify
 from flask_restful import Resource
+from config.json_provider import shaped
 from model.ecomarche_db import Produit
 from model.ml_model import RiskModel
+from model.product_cache import get_produit_dict
 
 
 class RisquesApi(Resource):
@@ -10,52 +14,79 @@ class RisquesApi(Resource):
     Routes:
       - /api/risques/recommandations  (GET)
       - /api/risques/predict/<int:produit_id> (GET)
+      - /api/risques/batching  (GET) : métriques du micro-batching
+      - /api/risques/cache  (GET) : métriques du cache de prédictions
     """
 
     def get(self, route=None, produit_id=None):
         # route dispatcher
         if route == 'recommandations':
             return self._recommandations()
+        if route == 'batching':
+            batcher = getattr(current_app, 'risk_batcher', None)
+            return jsonify({'enabled': batcher is not None, 'stats': batcher.stats() if batcher is not None else None})
+        if route == 'cache':
+            model = getattr(current_app, 'risk_model', None)
+            if model is None or not model.is_loaded():
+                return jsonify({'enabled': False, 'stats': None})
+            return jsonify({'enabled': True, 'model_version': model.version, 'stats': model.cache.stats()})
         return jsonify({'error': 'unknown route'}), 404
 
     def _recommandations(self):
-        produits = Produit.query.all()
-        sales_df = getattr(current_app, 'sales_df', None)
-        model: RiskModel = getattr(current_app, 'risk_model', None)
-        results = []
-        for p in produits:
-            feat = RiskModel.build_features_for_product(p, sales_df)
-            model_prob = None
-            if model is not None and model.is_loaded():
-                proba = model.predict_proba([feat])
-                if proba is not None:
-                    model_prob = round(proba[0], 3)
-
-            # reuse existing heuristic in app.py's waste_recommendations if desired
-            results.append({
-                'product_id': p.id,
-                'nom': p.nom,
-                'stock': p.stock,
-                'prix_unitaire': p.prix_unitaire,
-                'jours_restants': p.jours_restants,
-                'model_risk_prob': model_prob
-            })
-
-        # sort by model probability when available else by stock/jours_restants
-        results_sorted = sorted(results, key=lambda x: x['model_risk_prob'] if x['model_risk_prob'] is not None else 0.0, reverse=True)
-        return jsonify({'recommendations': results_sorted})
+        return jsonify(shaped({'recommendations': risk_recommendations(Produit.query.all())}))
+
+
+def risk_recommendations(produits):
+    """Catalog risk list sorted by model probability (one vectorized prediction)."""
+    sales_df = getattr(current_app, 'sales_df', None)
+    store = getattr(current_app, 'feature_store', None)
+    model: RiskModel = getattr(current_app, 'risk_model', None)
+    results = []
+    features = [RiskModel.build_features_for_product(p, sales_df, store) for p in produits]
+    # one vectorized prediction for the whole catalog
+    probas = None
+    if model is not None and model.is_loaded() and features:
+        probas = model.predict_proba_cached(features, data_version=store.dataset_hash if store is not None else None)
+    for i, p in enumerate(produits):
+        model_prob = round(probas[i], 3) if probas is not None and probas[i] is not None else None
+
+        # reuse existing heuristic in app.py's waste_recommendations if desired
+        results.append({
+            'product_id': p.id,
+            'nom': p.nom,
+            'stock': p.stock,
+            'prix_unitaire': p.prix_unitaire,
+            'jours_restants': p.jours_restants,
+            'model_risk_prob': model_prob
+        })
+
+    # sort by model probability when available else by stock/jours_restants
+    return sorted(results, key=lambda x: x['model_risk_prob'] if x['model_risk_prob'] is not None else 0.0, reverse=True)
 
 
 def predict_for_product(produit_id: int):
-    p = Produit.query.get(produit_id)
-    if not p:
+    payload = get_produit_dict(produit_id)
+    if not payload:
         return jsonify({'error': 'Produit not found'}), 404
+    body, status = risk_for_product(payload)
+    return jsonify(body), status
+
+
+def risk_for_product(payload: dict):
+    """Risk probability of one serialized product: (body, HTTP status)."""
+    p = SimpleNamespace(**payload)
     sales_df = getattr(current_app, 'sales_df', None)
+    store = getattr(current_app, 'feature_store', None)
     model: RiskModel = getattr(current_app, 'risk_model', None)
-    feat = RiskModel.build_features_for_product(p, sales_df)
+    feat = RiskModel.build_features_for_product(p, sales_df, store)
     if model is None or not model.is_loaded():
-        return jsonify({'error': 'Model not loaded'}), 503
-    proba = model.predict_proba([feat])
-    if proba is None:
-        return jsonify({'error': 'Prediction failed'}), 500
-    return jsonify({'product_id': produit_id, 'risk_prob': round(proba[0], 4)})
+        return {'error': 'Model not loaded'}, 503
+    batcher = getattr(current_app, 'risk_batcher', None)
+    # on a cache miss the row is coalesced with concurrent requests into one vectorized predict_proba
+    predict_fn = (lambda rows: [batcher.predict(row) for row in rows]) if batcher is not None else None
+    proba = model.predict_proba_cached([feat], data_version=store.dataset_hash if store is not None else None,
+                                       predict_fn=predict_fn)
+    prob = proba[0] if proba is not None else None
+    if prob is None:
+        return {'error': 'Prediction failed'}, 500
+    return {'product_id': p.id, 'risk_prob': round(prob, 4)}, 200
@@ -0,0 +1,42 @@
+"""
+Consistency check between produits.promotion_* and the promotions table.
+
+Lists the products whose denormalized active promotion differs from their most
+recent active promotion and, unless --dry-run is given, repairs them. Meant to be
+run periodically (cron / scheduled task); the API also runs it at startup.
+
+Usage:
+    python scripts/check_promotions.py [--dry-run] [--database-url URL]
+"""
+import argparse
+import os
+import sys
+
+from flask import Flask
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from config.constant import DATABASE_URL
+from config.db import init_db
+from model.ecomarche_db import check_promotion_consistency
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and repair the denormalized promotion columns")
+    parser.add_argument('--dry-run', action='store_true', help="report the drift without repairing it")
+    parser.add_argument('--database-url', default=DATABASE_URL)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__, instance_path=os.path.join(BASE_DIR, 'instance'))
+    init_db(app, args.database_url)
+    with app.app_context():
+        drift = check_promotion_consistency(repair=not args.dry_run)
+    for row in drift:
+        print(f"produit {row['produit_id']}: promotion {row['stored']} -> {row['expected']}")
+    action = 'found' if args.dry_run else 'repaired'
+    print(f"{len(drift)} product(s) {action}")
+    return 1 if drift and args.dry_run else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
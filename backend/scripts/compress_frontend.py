@@ -0,0 +1,83 @@
+"""
+Pre-compress the Angular build (run after `ng build`).
+
+Writes `<file>.gz` (gzip -9) and, when the `brotli` package is installed,
+`<file>.br` (quality 11) next to every compressible file (JS, CSS, HTML, SVG,
+JSON...). A variant is only kept if it is smaller than the original. The API
+serves these variants from its static manifest (helpers/static_assets.py)
+according to the client's Accept-Encoding.
+
+Usage:
+    python scripts/compress_frontend.py [--dist PATH] [--min-size 1024] [--no-brotli]
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from config.constant import FRONTEND_DIST
+from helpers.static_assets import ENCODINGS, MIN_COMPRESS_BYTES, is_compressible
+
+try:
+    import brotli
+except ImportError:  # optional: gzip variants only
+    brotli = None
+
+VARIANT_SUFFIXES = tuple(suffix for _, suffix in ENCODINGS)
+
+
+def write_variant(path, data, compressed):
+    if len(compressed) >= len(data):
+        if os.path.exists(path):
+            os.remove(path)
+        return 0
+    with open(path, 'wb') as f:
+        f.write(compressed)
+    return len(compressed)
+
+
+def compress_dist(dist, min_size=MIN_COMPRESS_BYTES, use_brotli=True):
+    """Write the variants; return {'files', 'bytes', 'gzip_bytes', 'br_bytes'}."""
+    totals = {'files': 0, 'bytes': 0, 'gzip_bytes': 0, 'br_bytes': 0}
+    for directory, _, files in os.walk(dist):
+        for name in files:
+            if name.endswith(VARIANT_SUFFIXES):
+                continue
+            mimetype = mimetypes.guess_type(name)[0] or ''
+            path = os.path.join(directory, name)
+            if not is_compressible(mimetype) or os.path.getsize(path) < min_size:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            totals['files'] += 1
+            totals['bytes'] += len(data)
+            totals['gzip_bytes'] += write_variant(path + '.gz', data, gzip.compress(data, compresslevel=9, mtime=0)) \
+                or len(data)
+            if use_brotli and brotli is not None:
+                totals['br_bytes'] += write_variant(path + '.br', data, brotli.compress(data, quality=11)) or len(data)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write .gz / .br variants of the frontend build")
+    parser.add_argument('--dist', default=FRONTEND_DIST)
+    parser.add_argument('--min-size', type=int, default=MIN_COMPRESS_BYTES)
+    parser.add_argument('--no-brotli', action='store_true')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.dist):
+        print(f"Build not found: {args.dist} (run `npm run build` in ecomarche-frontend)")
+        return 1
+    if brotli is None and not args.no_brotli:
+        print("brotli not installed: gzip variants only (pip install brotli)")
+    totals = compress_dist(args.dist, args.min_size, use_brotli=not args.no_brotli)
+    print(f"{totals['files']} files, {totals['bytes'] / 1024:.1f} KB -> gzip {totals['gzip_bytes'] / 1024:.1f} KB"
+          + (f", br {totals['br_bytes'] / 1024:.1f} KB" if totals['br_bytes'] else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Generate a synthetic catalog and sales history at load-test scale.
+
+Writes the sales history to --out (a `.parquet` path writes the columnar file,
+pyarrow required); an existing file, such as the real history at SALES_CSV_PATH,
+is only overwritten with --force. Product names match the catalog.
+Optionally bulk-loads the catalog into `produits` and the history into
+`ventes` (SALES_STORAGE=database).
+
+Usage:
+    python scripts/generate_dataset.py --products 5000 --rows 1000000 --out PATH [--force]
+                                       [--load-products] [--load-sales] [--replace]
+                                       [--seed 0] [--start 2022-01-01] [--database-url URL]
+
+Restart the API afterwards (with SALES_CSV_PATH=PATH): the feature store is rebuilt
+for the new dataset.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+from flask import Flask
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from config.constant import DATABASE_URL
+from config.db import db, init_db
+from helpers.sales import load_sales_table
+from helpers.synthetic_data import generate_products, generate_sales, load_products, write_sales
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic catalog and sales history")
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--rows', type=int, default=100000, help="sales history rows (one per product and day)")
+    parser.add_argument('--out', required=True, help="sales file (.csv or .parquet)")
+    parser.add_argument('--force', action='store_true', help="overwrite --out if it exists")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2022, 1, 1), help="first day of history")
+    parser.add_argument('--load-products', action='store_true', help="bulk-insert the catalog into produits")
+    parser.add_argument('--load-sales', action='store_true', help="bulk-insert the history into ventes")
+    parser.add_argument('--replace', action='store_true', help="empty the loaded tables first")
+    parser.add_argument('--database-url', default=DATABASE_URL)
+    args = parser.parse_args(argv)
+    if args.products < 1 or args.rows < 1:
+        parser.error("--products and --rows must be positive")
+    if os.path.exists(args.out) and not args.force:
+        parser.error(f"{args.out} exists (the real sales history?); use --force to overwrite it")
+
+    start = time.perf_counter()
+    products = generate_products(args.products, seed=args.seed)
+    sales = generate_sales(products, args.rows, start=args.start, seed=args.seed)
+    print(f"Generated {len(products)} products and {len(sales)} sales rows "
+          f"({sales['Date'].min():%Y-%m-%d} -> {sales['Date'].max():%Y-%m-%d}) in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    try:
+        write_sales(sales, args.out)
+    except ImportError as e:
+        print(f"Parquet output needs pyarrow (pip install pyarrow): {e}")
+        return 1
+    print(f"Sales written to {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+
+    if args.load_products or args.load_sales:
+        app = Flask(__name__, instance_path=os.path.join(BASE_DIR, 'instance'))
+        init_db(app, args.database_url)
+        with app.app_context():
+            db.create_all()
+            if args.load_products:
+                start = time.perf_counter()
+                count = load_products(products, replace=args.replace)
+                print(f"{count} products loaded in {time.perf_counter() - start:.2f}s")
+            if args.load_sales:
+                start = time.perf_counter()
+                count = load_sales_table(sales, replace=args.replace)
+                print(f"{count} sales rows loaded in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Load the sales history (CSV or Parquet, SALES_CSV_PATH by default) into the `ventes` fact table (SALES_STORAGE=database).
+
+The API loads the table at startup only when it is empty; run this script with
+--replace after the CSV changes.
+
+Usage:
+    python scripts/load_sales.py [path/to/sales.csv] [--replace] [--chunksize 50000] [--database-url URL]
+"""
+import argparse
+import os
+import sys
+import time
+
+from flask import Flask
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from config.constant import DATABASE_URL, SALES_CSV_PATH
+from config.db import db, init_db
+from helpers.sales import load_sales_table
+
+DATA_PATH = SALES_CSV_PATH
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load the sales CSV into the ventes table")
+    parser.add_argument('csv', nargs='?', default=DATA_PATH)
+    parser.add_argument('--replace', action='store_true', help="delete the existing rows first")
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--database-url', default=DATABASE_URL)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__, instance_path=os.path.join(BASE_DIR, 'instance'))
+    init_db(app, args.database_url)
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        rows = load_sales_table(args.csv, chunksize=args.chunksize, replace=args.replace)
+    print(f"{rows} rows loaded from {args.csv} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
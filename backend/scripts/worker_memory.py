@@ -0,0 +1,59 @@
+"""
+Rapport mémoire par worker du serveur gunicorn (Linux).
+
+Pour le master et chaque worker : RSS, PSS (part proportionnelle des pages
+partagées), USS (pages privées) et mémoire encore partagée. Avec le préchargement
+(SERVER_PRELOAD=1), l'USS d'un worker est le coût d'un worker supplémentaire ;
+la somme des PSS est la mémoire réellement occupée par le serveur.
+
+Usage:
+    python scripts/worker_memory.py [--pid MASTER_PID | --pidfile PATH] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from config.constant import SERVER_PIDFILE
+from helpers.memory import worker_memory_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mémoire du master gunicorn et de ses workers")
+    parser.add_argument('--pid', type=int, default=None, help="pid du master (sinon lu dans --pidfile)")
+    parser.add_argument('--pidfile', default=SERVER_PIDFILE)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    pid = args.pid
+    if pid is None:
+        try:
+            with open(args.pidfile) as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError) as e:
+            print(f"Master introuvable ({args.pidfile}): {e}")
+            return 1
+
+    report = worker_memory_report(pid)
+    if report['master'] is None:
+        print(f"Processus {pid} introuvable (ou /proc/<pid>/smaps_rollup indisponible)")
+        return 1
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'':>8} {'pid':>8} {'rss MB':>9} {'pss MB':>9} {'uss MB':>9} {'shared MB':>10}")
+    rows = [('master', report['master'])] + [('worker', w) for w in report['workers']]
+    for role, mem in rows:
+        print(f"{role:>8} {mem['pid']:>8} {mem['rss_kb'] / 1024:9.1f} {mem['pss_kb'] / 1024:9.1f} "
+              f"{mem['uss_kb'] / 1024:9.1f} {mem['shared_kb'] / 1024:10.1f}")
+    print(f"workers: {len(report['workers'])}  total rss {report['total_rss_kb'] / 1024:.1f} MB  "
+          f"total pss {report['total_pss_kb'] / 1024:.1f} MB  "
+          f"uss moyen/worker {report['avg_worker_uss_kb'] / 1024:.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
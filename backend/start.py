@@ -1,12 +1,37 @@
 """
 Script de démarrage pour l'application EcoMarché
+
+    python start.py [options gunicorn]   serveur de production (gunicorn.conf.py)
+    python start.py --dev                serveur de développement Flask
+
+gunicorn ne fonctionne pas sous Windows : le serveur de développement y est lancé.
 """
+import argparse
 import os
-from app import app
+import sys
 
-if __name__ == "__main__":
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Démarre l'API EcoMarché")
+    parser.add_argument('--dev', action='store_true', help="serveur de développement Flask (debug selon APP_DEBUG)")
+    args, gunicorn_args = parser.parse_known_args(argv)
+
+    os.chdir(BASE_DIR)
     # Créer le dossier pour les modèles sauvegardés s'il n'existe pas
     os.makedirs("./model/saved_models", exist_ok=True)
-    
-    # Lancer l'application
-    app.run(debug=True, host="0.0.0.0", port=8000)
\ No newline at end of file
+
+    if args.dev or os.name == 'nt':
+        from app import app
+        from config.constant import APP_DEBUG
+        app.run(debug=APP_DEBUG, host="0.0.0.0", port=8000)
+        return
+
+    # Serveur de production : chargement dans le master, workers forkés (voir gunicorn.conf.py)
+    os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', os.path.join(BASE_DIR, 'gunicorn.conf.py')]
+              + gunicorn_args)
+
+
+if __name__ == "__main__":
+    main()
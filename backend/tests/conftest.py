@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def db_app(tmp_path):
+    """Application Flask minimale sur une base SQLite temporaire (sans app.py ni les modèles ML)."""
+    from flask import Flask
+    from config.db import db, init_db
+    import model.ecomarche_db  # noqa: F401  (enregistre les tables)
+
+    app = Flask(__name__)
+    init_db(app, f"sqlite:///{tmp_path / 'test.db'}")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,35 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.db import async_database_url
+
+
+def test_async_database_url_maps_drivers():
+    assert async_database_url('sqlite:////tmp/eco.db') == 'sqlite+aiosqlite:////tmp/eco.db'
+    assert async_database_url('postgresql+psycopg2://u:pw@h:5432/eco') == 'postgresql+asyncpg://u:pw@h:5432/eco'
+    with pytest.raises(ValueError):
+        async_database_url('mysql://u@h/eco')
+
+
+def test_async_engine_applies_sqlite_pragmas(tmp_path):
+    pytest.importorskip('aiosqlite')
+    pytest.importorskip('greenlet')
+    from sqlalchemy import text
+    from config.db import create_async_db_engine
+
+    async def journal_mode():
+        engine = create_async_db_engine(f"sqlite:///{tmp_path / 'eco.db'}")
+        try:
+            async with engine.connect() as conn:
+                return (await conn.execute(text('PRAGMA journal_mode'))).scalar()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(journal_mode()).lower() == 'wal'
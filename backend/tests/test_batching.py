@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+
+# Ensure backend package path is available when running tests from repository root
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from model.batching import MicroBatcher
+
+
+def test_concurrent_requests_are_coalesced():
+    calls = []
+
+    def predict(rows):
+        calls.append(len(rows))
+        return [row[0] * 2 for row in rows]
+
+    batcher = MicroBatcher(predict, max_batch=16, max_wait_ms=50)
+    results = {}
+    barrier = threading.Barrier(8)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = batcher.predict([float(i)])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: i * 2.0 for i in range(8)}
+    assert sum(calls) == 8
+    assert len(calls) < 8
+    stats = batcher.stats()
+    assert stats['requests'] == 8
+    assert stats['largest_batch'] > 1
+
+
+def test_failed_prediction_resolves_to_none():
+    batcher = MicroBatcher(lambda rows: None, max_batch=4, max_wait_ms=1)
+    assert batcher.predict([1.0]) is None
+    assert batcher.stats()['failures'] == 1
+
+
+def test_timeout_falls_back_to_direct_call():
+    gate = threading.Event()
+    calls = []
+
+    def predict(rows):
+        calls.append(threading.current_thread().name)
+        if threading.current_thread().name == 'risk-micro-batcher':
+            gate.wait(5)  # stuck batch
+        return [row[0] + 1 for row in rows]
+
+    batcher = MicroBatcher(predict, max_batch=4, max_wait_ms=1)
+    assert batcher.predict([1.0], timeout=0.05) == 2.0
+    gate.set()
+    assert batcher.stats()['failures'] == 1 and len(calls) == 2
@@ -0,0 +1,79 @@
+import os
+import sys
+from datetime import date
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from flask_restful import Api
+
+from config.db import db
+from helpers.synthetic_data import generate_products, load_products
+from model.ecomarche_db import (
+    Produit, Promotion, archive_promotions, catalog_changes, read_data_versions, refresh_promotion_columns
+)
+from model.promotion_scheduler import run_promotion_lifecycle
+from resources.produits import ProduitsApi
+
+
+def test_changes_since_a_version(db_app):
+    load_products(generate_products(20, seed=6, today=date(2024, 6, 1)))
+    snapshot = catalog_changes()
+    assert snapshot['full'] and len(snapshot['produits']) == 20 and snapshot['version'] > 0
+    since = snapshot['version']
+    assert all(p['row_version'] == since for p in snapshot['produits'])
+
+    updated, removed = db.session.get(Produit, 3), db.session.get(Produit, 7)
+    updated.stock += 10
+    db.session.delete(removed)
+    promotion = Promotion(produit_id=5, discount_percent=20)
+    db.session.add(promotion)
+    db.session.commit()
+    refresh_promotion_columns([5])  # bulk UPDATE
+    db.session.commit()
+
+    changes = catalog_changes(since)
+    assert not changes['full'] and changes['version'] > since
+    assert [p['id'] for p in changes['produits']] == [3, 5]
+    assert changes['produits'][1]['promotion']['id'] == promotion.id
+    assert [p['id'] for p in changes['promotions']] == [promotion.id]
+    assert changes['deleted'] == {'produits': [7], 'promotions': []}
+
+    # bulk DELETE (archiving) leaves tombstones too
+    since = changes['version']
+    archive_promotions(Promotion.produit_id == 5, 'deactivated')
+    db.session.commit()
+    changes = catalog_changes(since)
+    assert changes['deleted']['promotions'] == [promotion.id] and changes['produits'] == []
+
+    unchanged = catalog_changes(changes['version'])
+    assert unchanged['produits'] == [] and unchanged['deleted'] == {'produits': [], 'promotions': []}
+    # client ahead of the database (reset): full snapshot
+    assert catalog_changes(changes['version'] + 100)['full']
+
+
+def test_changes_endpoint(db_app):
+    api = Api(db_app)
+    api.add_resource(ProduitsApi, '/api/produits/<string:route>')
+    load_products(generate_products(5, seed=7))
+    client = db_app.test_client()
+
+    first = client.get('/api/produits/changes').get_json()
+    assert first['status'] == 'success' and len(first['produits']) == 5
+    Produit.query.first().stock += 1
+    db.session.commit()
+    delta = client.get(f"/api/produits/changes?since={first['version']}").get_json()
+    assert len(delta['produits']) == 1 and delta['version'] == first['version'] + 1
+    assert client.get('/api/produits/changes?since=abc').status_code == 400
+
+
+def test_noop_bulk_writes_keep_versions(db_app):
+    load_products(generate_products(5, seed=8, today=date(2024, 6, 1)))
+    db.session.add(Promotion(produit_id=1, discount_percent=15, active=True))
+    db.session.commit()
+    before = read_data_versions()
+    for _ in range(3):
+        run_promotion_lifecycle(date(2024, 6, 1))
+    assert read_data_versions() == before
+    assert catalog_changes(before['catalog'][0])['promotions'] == []
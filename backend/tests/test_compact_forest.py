@@ -0,0 +1,70 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
+
+# Ensure backend package path is available when running tests from repository root
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from ml.export_compact_model import export_compact
+from model.compact_forest import CompactForest
+from model.ml_model import RiskModel
+
+
+def make_data(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+    return X, y
+
+
+def test_unpruned_export_matches_sklearn():
+    X, y = make_data()
+    clf = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    compact = CompactForest.from_sklearn(clf)
+    assert np.allclose(compact.predict_proba(X), clf.predict_proba(X), atol=1e-6)
+    assert (compact.predict(X) == clf.predict(X)).all()
+
+
+def test_gradient_boosting_export():
+    X, y = make_data()
+    reg = GradientBoostingRegressor(n_estimators=30, random_state=0).fit(X, X[:, 0] * 2.0)
+    assert np.allclose(CompactForest.from_sklearn(reg).predict(X), reg.predict(X), atol=1e-4)
+
+
+def test_pruning_and_transparent_load(tmp_path):
+    X, y = make_data()
+    clf = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    compact = CompactForest.from_sklearn(clf, max_depth=3)
+    assert compact.depth <= 3
+    assert compact.threshold.dtype == np.float32
+    path = compact.save(str(tmp_path / 'model.compact.joblib'))
+    rm = RiskModel.load(path)
+    assert rm.is_loaded()
+    proba = rm.predict_proba(X[:5].tolist())
+    assert len(proba) == 5
+    assert all(0.0 <= p <= 1.0 for p in proba)
+
+
+def test_deep_trees_match_in_large_batches():
+    X, y = make_data(3000, seed=1)
+    clf = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y ^ (X[:, 2] > 1.5))
+    compact = CompactForest.from_sklearn(clf)
+    assert compact.depth > 8
+    X_new = make_data(20000, seed=2)[0]
+    assert np.allclose(compact.predict_proba(X_new), clf.predict_proba(X_new), atol=1e-6)
+
+
+def test_export_reports_batch_latency(tmp_path):
+    X, y = make_data()
+    clf = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    report = export_compact(clf, str(tmp_path / 'a.compact.joblib'), X=X, y=y, batch_rows=200)
+    assert report['batch_rows'] == 200 and report['batch_slowdown'] > 0
+    output = tmp_path / 'b.compact.joblib'
+    with pytest.raises(ValueError):
+        export_compact(clf, str(output), max_slowdown=1e-9)
+    assert not output.exists()
@@ -0,0 +1,117 @@
+import os
+import sys
+from datetime import date, datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+from flask import jsonify
+from sqlalchemy import update
+
+from config.conditional import init_conditional_get
+from config.db import db
+from helpers.synthetic_data import generate_products, load_products
+from model.ecomarche_db import DataVersion, Produit, Promotion, archive_promotions, read_data_versions
+from model.product_cache import ProductCache, product_cache
+
+
+def version(name):
+    return read_data_versions().get(name, (0, None))[0]
+
+
+@pytest.fixture
+def client(db_app):
+    load_products(generate_products(20, seed=5, today=date(2024, 6, 1)))
+    db_app.calls = 0
+
+    @db_app.route('/api/produits/all')
+    def produits_all():
+        db_app.calls += 1
+        return jsonify([p.to_dict() for p in Produit.query.all()])
+
+    @db_app.route('/api/produits/cache')
+    def produits_cache():
+        return jsonify({'hits': 0})
+
+    init_conditional_get(db_app, enabled=True)
+    return db_app.test_client()
+
+
+def test_writes_bump_versions(db_app):
+    assert load_products(generate_products(5, seed=1)) == 5
+    assert version('produits') == 1
+    produit = Produit.query.first()
+    produit.stock += 1
+    db.session.commit()
+    assert version('produits') == 2
+    produit.stock = produit.stock  # no net change: no bump
+    db.session.commit()
+    assert version('produits') == 2
+
+    db.session.add(Promotion(produit_id=produit.id, discount_percent=10))
+    db.session.commit()
+    archive_promotions(Promotion.produit_id == produit.id, 'deactivated')
+    db.session.commit()
+    assert version('promotions') == 2
+
+    db.session.delete(produit)
+    db.session.rollback()
+    assert version('produits') == 2
+
+
+def test_etag_gives_304_without_running_the_view(client, db_app):
+    first = client.get('/api/produits/all')
+    etag = first.headers['ETag']
+    assert etag.startswith('W/"') and first.headers['Cache-Control'] == 'no-cache'
+    assert 'Last-Modified' in first.headers and db_app.calls == 1
+
+    cached = client.get('/api/produits/all', headers={'If-None-Match': etag})
+    assert cached.status_code == 304 and cached.data == b'' and cached.headers['ETag'] == etag
+    assert db_app.calls == 1
+
+    produit = Produit.query.first()
+    produit.stock += 5
+    db.session.commit()
+    changed = client.get('/api/produits/all', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag and db_app.calls == 2
+
+
+def test_if_modified_since_and_query_string(client):
+    # versions are stamped to the whole second, the precision of HTTP dates
+    assert read_data_versions()['produits'][1].microsecond == 0
+    first = client.get('/api/produits/all')
+    since = {'If-Modified-Since': first.headers['Last-Modified']}
+    assert client.get('/api/produits/all', headers=since).status_code == 304
+
+    db.session.execute(update(DataVersion).values(updated_at=datetime(2024, 6, 1, 8, 30)))
+    db.session.commit()
+    # Last-Modified is now today's midnight (`date` dependency): the next write is later
+    since = {'If-Modified-Since': client.get('/api/produits/all').headers['Last-Modified']}
+    assert client.get('/api/produits/all', headers=since).status_code == 304
+    produit = Produit.query.first()
+    produit.stock += 1
+    db.session.commit()
+    assert client.get('/api/produits/all', headers=since).status_code == 200
+    columns = client.get('/api/produits/all?shape=columns', headers={'If-None-Match': first.headers['ETag']})
+    assert columns.status_code == 200 and columns.headers['ETag'] != first.headers['ETag']
+
+
+def test_unversioned_routes_are_untouched(client):
+    response = client.get('/api/produits/cache')
+    assert response.status_code == 200 and 'ETag' not in response.headers
+
+
+def test_product_cache_follows_data_versions(client):
+    cache = ProductCache(max_size=10, ttl_seconds=0)
+    cache.sync((1, 1))
+    cache.put(3, {'stock': 1}, cache.snapshot(3))
+    cache.sync((1, 1))
+    assert cache.get(3) == {'stock': 1}
+    # written by another process: only the counters tell
+    cache.sync((2, 1))
+    assert cache.get(3) is None
+
+    client.get('/api/produits/all')
+    assert product_cache.snapshot(1)[1] == (version('produits'), version('promotions'))
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Ensure backend package path is available when running tests from repository root
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.db import db
+from helpers.sales import load_sales_table
+from model.feature_store import FeatureStore, FEATURE_COLUMNS
+from model.ml_model import RiskModel
+
+
+class DummyProduct:
+    def __init__(self, nom, prix_unitaire):
+        self.nom = nom
+        self.prix_unitaire = prix_unitaire
+
+
+def make_sales():
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-01', '2024-01-02']),
+        'Product_Name': ['Lait', 'Lait', 'Lait', 'Pain', 'Pain'],
+        'Daily_Sales': [4, 6, 8, 1, 0],
+        'Unit_Price': [1.0, 1.0, 1.2, 2.0, 2.0],
+    })
+
+
+def test_store_lookup():
+    store = FeatureStore.build(make_sales())
+    assert len(store) == 2
+    row = store.get('Lait')
+    assert row['avg_daily_sales'] == 6.0
+    assert row['days_present'] == 3.0
+    assert store.get('Inconnu') is None
+
+
+def test_training_and_serving_share_features():
+    store = FeatureStore.build(make_sales())
+    train = store.training_frame().set_index('Product_Name')
+    # serving with the product's historical median price gives the training row back
+    served = store.features_for('Pain', 2.0)
+    assert served == train.loc['Pain', FEATURE_COLUMNS].tolist()
+    assert RiskModel.build_features_for_product(DummyProduct('Pain', 2.0), None, store) == served
+
+
+def test_save_and_load_keyed_by_hash(tmp_path):
+    path = str(tmp_path / 'features.joblib')
+    FeatureStore.build(make_sales(), dataset_hash='abc').save(path)
+    assert FeatureStore.load(path, dataset_hash='abc') is not None
+    assert FeatureStore.load(path, dataset_hash='other') is None
+
+
+def test_build_from_sales_table(db_app, tmp_path):
+    path = str(tmp_path / 'features.joblib')
+    load_sales_table(make_sales())
+    store = FeatureStore.load_or_build_from_table(db.session, store_path=path)
+    expected = FeatureStore.build(make_sales())
+    for name in ('Lait', 'Pain'):
+        assert store.get(name) == pytest.approx(expected.get(name))
+    # keyed by the ventes version: reused until the table changes
+    assert FeatureStore.load(path, store.dataset_hash) is not None
+    load_sales_table(make_sales().iloc[:1])
+    assert FeatureStore.load_or_build_from_table(db.session, store_path=path).dataset_hash != store.dataset_hash
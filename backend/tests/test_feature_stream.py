@@ -0,0 +1,92 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ensure backend package path is available when running tests from repository root
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from model.feature_store import FeatureStore, compute_product_stats
+from model.feature_stream import StreamingProductStats, compute_product_stats_chunked
+
+
+def make_sales(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60, rows), 'D'),
+        'Product_Name': rng.choice([f'Produit {i}' for i in range(25)], rows),
+        'Category': 'Fruits',
+        'Daily_Sales': rng.poisson(2, rows).astype(float),
+        'Unit_Price': rng.choice([0.8, 1.2, 2.5, np.nan], rows),
+    })
+
+
+def test_chunked_stats_match_in_memory(tmp_path):
+    path = tmp_path / 'sales.csv'
+    make_sales().to_csv(path, index=False)
+    expected = compute_product_stats(pd.read_csv(path, parse_dates=['Date']))
+    streamed = compute_product_stats_chunked(str(path), chunksize=111)
+    assert list(streamed.index) == list(expected.index)
+    assert np.allclose(streamed.to_numpy(), expected.to_numpy(), rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+def test_partitioned_files_match_training_matrix(tmp_path):
+    df = make_sales(seed=1)
+    df.to_csv(tmp_path / 'all.csv', index=False)
+    parts = tmp_path / 'parts'
+    parts.mkdir()
+    for i, start in enumerate(range(0, len(df), 500)):
+        df.iloc[start:start + 500].to_csv(parts / f'part-{i}.csv', index=False)
+    full = FeatureStore.build(pd.read_csv(tmp_path / 'all.csv', parse_dates=['Date'])).training_frame()
+    chunked = FeatureStore.build_chunked(str(parts)).training_frame()
+    assert np.allclose(chunked.select_dtypes('number'), full.select_dtypes('number'), rtol=1e-12, equal_nan=True)
+
+
+def test_price_sketch_is_bounded():
+    rng = np.random.default_rng(2)
+    prices = rng.uniform(0, 10, 5000)
+    acc = StreamingProductStats(max_price_bins=32)
+    for start in range(0, 5000, 500):
+        acc.update(pd.DataFrame({
+            'Date': pd.Timestamp('2024-01-01'),
+            'Product_Name': 'A',
+            'Daily_Sales': 1.0,
+            'Unit_Price': prices[start:start + 500],
+        }))
+    assert len(acc.prices) <= 32
+    assert abs(acc.result()['median_price'].iloc[0] - np.median(prices)) < 0.2
+
+
+def test_day_bitmap_counts_distinct_days_in_any_order():
+    acc = StreamingProductStats()
+    for day in ('2024-03-10', '2024-03-10', '2024-01-01', '2024-06-30', '2023-12-25', '2024-01-01'):
+        acc.update(pd.DataFrame({'Date': [pd.Timestamp(day)] * 2, 'Product_Name': ['A', 'B'],
+                                 'Daily_Sales': 1.0, 'Unit_Price': 1.0}))
+    acc.update(pd.DataFrame({'Date': [pd.Timestamp('2024-06-30')], 'Product_Name': ['C'],
+                             'Daily_Sales': 1.0, 'Unit_Price': 1.0}))
+    assert acc.result()['days_present'].to_dict() == {'A': 4.0, 'B': 4.0, 'C': 1.0}
+    # one bit per product and day of the span (188 days), whatever the number of rows
+    assert acc.day_bits.shape[0] == 3 and acc.day_bits.shape[1] <= 2 * (188 // 8 + 1)
+
+
+def test_memory_budget_is_enforced():
+    rng = np.random.default_rng(3)
+    chunk = pd.DataFrame({
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 30, 20000), 'D'),
+        'Product_Name': rng.choice([f'P{i}' for i in range(20)], 20000),
+        'Daily_Sales': 1.0,
+        'Unit_Price': rng.uniform(0, 10, 20000),
+    })
+    unbounded = StreamingProductStats()
+    unbounded.update(chunk)
+    budget = unbounded.memory_bytes() // 2
+    bounded = StreamingProductStats(memory_budget_bytes=budget)
+    bounded.update(chunk)
+    assert bounded.memory_bytes() <= budget and bounded.max_price_bins < unbounded.max_price_bins
+    assert (bounded.result()['days_present'] == unbounded.result()['days_present']).all()
+    with pytest.raises(MemoryError):
+        StreamingProductStats(memory_budget_bytes=1000).update(chunk)
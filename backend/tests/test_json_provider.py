@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from flask_restful import Api, Resource
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import config.json_provider as json_provider
+from config.json_provider import FastJSONProvider, http_date, init_json, shaped, to_columns
+
+PAYLOAD = {
+    'daily': [{'Date': date(2024, 3, d), 'Daily_Sales': 10.5 * d} for d in range(1, 6)],
+    'top': [{'Product_Name': 'Pommes Golden', 'Daily_Sales': 1234.25}, {'Product_Name': 'Crème fraîche', 'Daily_Sales': 99.0}],
+    'generated_at': datetime(2024, 3, 9, 14, 30),
+    'count': 5,
+    'empty': [],
+}
+
+
+def make_app(encoder):
+    app = Flask(__name__)
+    init_json(app)
+    app.json.use_orjson = encoder == 'orjson' and json_provider.orjson is not None
+    return app
+
+
+@pytest.mark.parametrize('encoder', ['orjson', 'json'])
+def test_same_json_as_flask_default(encoder):
+    if encoder == 'orjson':
+        pytest.importorskip('orjson')
+    app = make_app(encoder)
+    reference = DefaultJSONProvider(app)
+    assert json.loads(app.json.dumps(PAYLOAD)) == json.loads(reference.dumps(PAYLOAD))
+    with app.test_request_context():
+        assert json.loads(jsonify(PAYLOAD).get_data()) == json.loads(reference.dumps(PAYLOAD))
+
+
+@pytest.mark.parametrize('encoder', ['orjson', 'json'])
+def test_numpy_and_pandas_values(encoder):
+    if encoder == 'orjson':
+        pytest.importorskip('orjson')
+    app = make_app(encoder)
+    df = pd.DataFrame({'a': np.arange(3), 'b': [0.5, 1.5, 2.5]})
+    decoded = json.loads(app.json.dumps({'frame': df, 'array': np.array([1.0, 2.0]), 'scalar': np.int64(7),
+                                         'series': df['b'], 'ts': pd.Timestamp('2024-03-01')}))
+    assert decoded['frame'] == [{'a': 0, 'b': 0.5}, {'a': 1, 'b': 1.5}, {'a': 2, 'b': 2.5}]
+    assert decoded['array'] == [1.0, 2.0]
+    assert decoded['scalar'] == 7
+    assert decoded['series'] == [0.5, 1.5, 2.5]
+    assert decoded['ts'] == 'Fri, 01 Mar 2024 00:00:00 GMT'
+
+
+@pytest.mark.parametrize('encoder', ['orjson', 'json'])
+def test_frames_serialized_like_records(encoder):
+    if encoder == 'orjson':
+        pytest.importorskip('orjson')
+    app = make_app(encoder)
+    df = pd.DataFrame({'Month': np.arange(1, 4, dtype='int32'), 'Daily_Sales': [1.5, np.nan, 3.0],
+                       'Category': pd.Categorical(['a', 'b', 'a']),
+                       'Date': [date(2024, 3, d) for d in (1, 2, 3)],
+                       'YearMonth': pd.date_range('2024-01-01', periods=3, freq='MS')}).iloc[::-1]
+    records = df.to_dict(orient='records')
+    assert app.json.dumps({'f': df}) == app.json.dumps({'f': records})
+    columns = to_columns({'f': df})['f']
+    assert isinstance(columns['Daily_Sales'], np.ndarray) and isinstance(columns['Month'], np.ndarray)
+    assert app.json.dumps(columns) == app.json.dumps(to_columns(records))
+
+
+def test_http_date_matches_werkzeug():
+    from werkzeug.http import http_date as werkzeug_http_date
+    values = [date(1999, 12, 31), date(2024, 2, 29), datetime(2024, 3, 9, 14, 30, 5), pd.Timestamp('2023-07-01 08:00'),
+              datetime(2024, 3, 9, 23, 30, tzinfo=timezone(timedelta(hours=-5)))]
+    for value in values:
+        assert http_date(value) == werkzeug_http_date(value)
+
+
+def test_columns_shape():
+    columns = to_columns(PAYLOAD)
+    assert columns['top'] == {'Product_Name': ['Pommes Golden', 'Crème fraîche'], 'Daily_Sales': [1234.25, 99.0]}
+    assert columns['daily']['Daily_Sales'] == [10.5 * d for d in range(1, 6)]
+    assert columns['count'] == 5 and columns['empty'] == []
+    # heterogeneous rows stay records
+    assert to_columns([{'a': 1}, {'b': 2}]) == [{'a': 1}, {'b': 2}]
+    frame = to_columns(pd.DataFrame({'x': [1, 2], 'y': ['u', 'v']}))
+    assert list(frame['x']) == [1, 2] and frame['y'] == ['u', 'v']
+
+
+def test_shape_query_flag_and_restful_resources():
+    app = make_app('orjson')
+    api = Api(app)
+    init_json(app, api)
+
+    class Items(Resource):
+        def get(self):
+            return shaped({'items': [{'id': 1, 'nom': 'A'}, {'id': 2, 'nom': 'B'}]})
+
+    api.add_resource(Items, '/items')
+    client = app.test_client()
+    assert client.get('/items').get_json() == {'items': [{'id': 1, 'nom': 'A'}, {'id': 2, 'nom': 'B'}]}
+    assert client.get('/items?shape=columns').get_json() == {'items': {'id': [1, 2], 'nom': ['A', 'B']}}
+    assert isinstance(app.json, FastJSONProvider)
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from helpers.memory import child_pids, process_memory, worker_memory_report
+
+pytestmark = pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'), reason="Linux /proc requis")
+
+
+def test_process_memory_of_current_process():
+    mem = process_memory()
+    assert mem['pid'] == os.getpid()
+    assert mem['rss_kb'] > 0
+    assert mem['uss_kb'] + mem['shared_kb'] == mem['rss_kb']
+    assert process_memory(2 ** 22 + 1) is None
+
+
+def test_worker_report_lists_children():
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        assert child.pid in child_pids(os.getpid())
+        report = worker_memory_report(os.getpid())
+        assert report['master']['pid'] == os.getpid()
+        assert child.pid in [w['pid'] for w in report['workers']]
+        assert report['total_pss_kb'] <= report['total_rss_kb']
+    finally:
+        child.kill()
+        child.wait()
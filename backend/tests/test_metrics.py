@@ -0,0 +1,101 @@
+import os
+import sys
+
+import pytest
+from flask import jsonify
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import config.metrics as metrics_module
+from config.db import db
+from config.metrics import Histogram, init_metrics, metrics, timed, timed_function
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.clear()
+    yield metrics
+    metrics.enabled = False
+    metrics.clear()
+    metrics._gauges.pop('demo_gauge', None)
+    metrics._gauges.pop('broken_gauge', None)
+    for name, fn in (('before_cursor_execute', metrics_module._before_cursor_execute),
+                     ('after_cursor_execute', metrics_module._after_cursor_execute),
+                     ('handle_error', metrics_module._handle_cursor_error)):
+        if event.contains(Engine, name, fn):
+            event.remove(Engine, name, fn)
+
+
+def test_histogram_cumulative_buckets():
+    histogram = Histogram('demo_seconds', 'demo', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/a')
+    lines = list(histogram.render())
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{route="/a"} 4' in lines
+    assert 'demo_seconds_sum{route="/a"} 3.65' in lines
+
+
+def test_disabled_metrics_install_nothing(db_app):
+    metrics.enabled = False
+    init_metrics(db_app)
+    assert db_app.before_request_funcs == {}
+    assert not event.contains(Engine, 'before_cursor_execute', metrics_module._before_cursor_execute)
+    assert isinstance(timed('x'), type(metrics_module._NOOP))
+    assert db_app.test_client().get('/metrics').status_code == 404
+
+
+def test_request_latency_and_sql_count(db_app, enabled_metrics):
+    @db_app.route('/api/items/<int:item_id>')
+    def item(item_id):
+        for _ in range(3):
+            db.session.execute(text('SELECT 1')).scalar()
+        with timed('pandas.demo'):
+            pass
+        return jsonify({'id': item_id})
+
+    init_metrics(db_app, enabled=True)
+    client = db_app.test_client()
+    assert client.get('/api/items/1').status_code == 200
+    assert client.get('/api/items/2').status_code == 200
+
+    body = client.get('/metrics')
+    assert body.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = body.get_data(as_text=True)
+    route = 'route="/api/items/<int:item_id>"'
+    assert f'http_request_duration_seconds_count{{method="GET",{route},status="200"}} 2' in body
+    assert f'http_request_sql_statements_sum{{{route}}} 6' in body
+    assert f'sql_statement_duration_seconds_count{{{route}}} 6' in body
+    assert 'section_duration_seconds_count{section="pandas.demo"} 2' in body
+
+    # SQL outside of a request
+    db.session.execute(text('SELECT 1')).scalar()
+    assert metrics.sql_latency.snapshot()[('background',)][2] == 1
+
+    # a failed statement leaves no start time behind
+    with pytest.raises(Exception):
+        db.session.execute(text('SELECT * FROM missing_table'))
+    db.session.rollback()
+    assert 'metrics_query_start' not in db.session.connection().info
+
+
+def test_timed_function_and_gauges(enabled_metrics):
+    metrics.enabled = True
+
+    @timed_function('model.demo')
+    def predict(x):
+        return x * 2
+
+    assert predict(21) == 42
+    assert metrics.sections.snapshot()[('model.demo',)][2] == 1
+
+    metrics.gauge('demo_gauge', 'demo', lambda: 7)
+    metrics.gauge('broken_gauge', 'demo', lambda: 1 / 0)
+    body = metrics.render()
+    assert 'demo_gauge 7' in body and 'broken_gauge' not in body
@@ -7,7 +7,7 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from model.ml_model import RiskModel
+from model.ml_model import RiskModel, PredictionCache
 
 
 class DummyProduct:
@@ -42,3 +42,32 @@ def test_predict_with_saved_model():
     # If model loaded, predict_proba should return a list or None (defensive)
     res = rm.predict_proba([[0.0, 0.0, 0.0, 0.0]])
     assert (res is None) or (isinstance(res, list))
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return [[1.0 - row[0], row[0]] for row in X]
+
+
+def test_prediction_cache_hits_and_invalidation():
+    inner = CountingModel()
+    rm = RiskModel(inner, version='v1')
+    assert rm.predict_proba_cached([[0.2, 1, 1, 1], [0.4, 1, 1, 1]], data_version='d1') == [0.2, 0.4]
+    assert rm.predict_proba_cached([[0.2, 1, 1, 1]], data_version='d1') == [0.2]
+    assert inner.calls == 1
+    assert rm.cache.stats()['hits'] == 1
+    # swapping the sales dataset clears the cache
+    rm.predict_proba_cached([[0.2, 1, 1, 1]], data_version='d2')
+    assert inner.calls == 2
+    assert rm.cache.stats()['invalidations'] >= 1
+
+
+def test_prediction_cache_is_bounded():
+    rm = RiskModel(CountingModel(), version='v1', cache=PredictionCache(max_size=2))
+    rm.predict_proba_cached([[0.1, 0, 0, 0], [0.2, 0, 0, 0], [0.3, 0, 0, 0]])
+    assert len(rm.cache) == 2
+    assert rm.cache.stats()['evictions'] == 1
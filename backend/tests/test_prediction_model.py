@@ -0,0 +1,50 @@
+import os
+import sys
+from datetime import datetime
+
+# Ensure backend package path is available when running tests from repository root
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from model.prediction_model import DEFAULT_PRICE, demand_model
+
+START = datetime(2025, 1, 1)
+
+
+def test_feature_matrix_layout():
+    X, dates = demand_model.build_feature_matrix([1, 3], [2.0, 5.0], 3, START)
+    assert X.shape == (6, 4)
+    assert len(dates) == 3
+    # rows are grouped by product, then by day
+    assert list(X[:3, 2]) == [1.0, 1.0, 1.0]
+    assert list(X[3:, 3]) == [5.0, 5.0, 5.0]
+    assert X[0, 0] == dates[0].weekday()
+
+
+def test_batch_forecast_is_deterministic():
+    first, _ = demand_model.forecast_matrix([1, 2, 3], [1.0, 2.0, 3.0], 7, START)
+    second, _ = demand_model.forecast_matrix([1, 2, 3], [1.0, 2.0, 3.0], 7, START)
+    assert first.shape == (3, 7)
+    assert (first == second).all()
+    assert (first >= 5).all()
+
+
+def test_single_product_matches_batch():
+    batch = demand_model.predict_batch(
+        [{'product_id': 1, 'category_id': 2, 'price': 4.0},
+         {'product_id': 2, 'category_id': 3, 'price': 1.5}],
+        days=5,
+        start_date=START
+    )
+    single = demand_model.predict_batch([{'product_id': 2, 'category_id': 3, 'price': 1.5}], days=5, start_date=START)
+    assert batch[2] == single[2]
+    assert len(batch[1]) == 5
+
+
+def test_missing_price_uses_the_shared_default():
+    X, _ = demand_model.build_feature_matrix([1, 1], [None, 4.0], 2, START)
+    assert list(X[:, 3]) == [DEFAULT_PRICE, DEFAULT_PRICE, 4.0, 4.0]
+    missing, _ = demand_model.forecast_matrix([1], [None], 3, START)
+    default, _ = demand_model.forecast_matrix([1], [DEFAULT_PRICE], 3, START)
+    assert (missing == default).all()
@@ -0,0 +1,98 @@
+import os
+import sys
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import event
+
+import model.product_cache as product_cache_module
+from config.db import db
+from model.ecomarche_db import Produit
+from model.product_cache import ProductCache, get_produit_dict, product_cache
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, produit_id):
+        self.calls += 1
+        return {'id': produit_id, 'version': self.calls}
+
+
+def test_read_through_and_invalidation():
+    cache, loader = ProductCache(max_size=10, ttl_seconds=60), CountingLoader()
+    assert cache.get_or_load(1, loader)['version'] == 1
+    assert cache.get_or_load(1, loader)['version'] == 1
+    cache.invalidate(1)
+    assert cache.get_or_load(1, loader)['version'] == 2
+    cache.invalidate_all()
+    assert cache.get_or_load(1, loader)['version'] == 3
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 3 and stats['invalidations'] == 2
+
+
+def test_invalidation_during_load_is_not_overwritten():
+    cache = ProductCache(max_size=10, ttl_seconds=60)
+
+    def racing_loader(produit_id):
+        cache.invalidate(produit_id)   # a write commits while the row is being read
+        return {'id': produit_id}
+
+    cache.get_or_load(1, racing_loader)
+    assert len(cache) == 0
+
+
+def test_invalidation_counters_are_bounded():
+    cache, loader = ProductCache(max_size=4, ttl_seconds=60), CountingLoader()
+    cache.get_or_load(1, loader)
+    stale = cache.snapshot(2)
+    cache.invalidate(2)
+    cache.invalidate(*range(100, 200))
+    assert len(cache._versions) <= 8
+    # still cached, and a load started before the invalidation is still rejected
+    assert cache.get(1) == {'id': 1, 'version': 1}
+    cache.put(2, {'id': 2, 'stale': True}, stale)
+    assert cache.get(2) is None
+
+
+def test_ttl_date_and_size_bounds(monkeypatch):
+    cache, loader = ProductCache(max_size=2, ttl_seconds=5), CountingLoader()
+    clock = [100.0]
+    monkeypatch.setattr(product_cache_module.time, 'monotonic', lambda: clock[0])
+    cache.get_or_load(1, loader)
+    clock[0] += 6
+    assert cache.get_or_load(1, loader)['version'] == 2          # expired by TTL
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.fromordinal(date.today().toordinal() + 1)
+    monkeypatch.setattr(product_cache_module, 'date', Tomorrow)
+    assert cache.get_or_load(1, loader)['version'] == 3          # jours_restants changed at midnight
+
+    cache.get_or_load(2, loader)
+    cache.get_or_load(3, loader)
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+
+
+def test_cached_product_skips_database(db_app):
+    produit = Produit(nom='Lait', categorie_id=1, stock=5, prix_unitaire=1.0,
+                      date_peremption=date.today() + timedelta(days=4))
+    db.session.add(produit)
+    db.session.commit()
+    product_cache.invalidate_all()
+
+    assert get_produit_dict(produit.id)['jours_restants'] == 4
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        assert get_produit_dict(produit.id)['nom'] == 'Lait'
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements == []
+    product_cache.invalidate_all()
@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import time
+
+from flask import Flask, jsonify
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.profiling import ProfileGate, StackSampler, collapse_stack, init_profiling
+
+TOKEN = 's3cret'
+
+
+def busy_leaf(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def make_app(tmp_path, min_interval=0.0):
+    app = Flask(__name__)
+
+    @app.route('/api/kpi/slow')
+    def slow():
+        busy_leaf(0.05)
+        return jsonify({'ok': True})
+
+    gate = init_profiling(app, token=TOKEN, directory=str(tmp_path), min_interval=min_interval, sample_interval_ms=1)
+    return app.test_client(), gate
+
+
+def test_collapse_stack_root_first():
+    def inner():
+        return collapse_stack(sys._getframe())
+    stack = inner()
+    assert stack.endswith('test_profiling:test_collapse_stack_root_first;test_profiling:inner')
+
+
+def test_sampler_sees_busy_function():
+    sampler = StackSampler(threading.get_ident(), interval=0.001).start()
+    busy_leaf(0.05)
+    counts = sampler.stop()
+    assert sampler.samples > 0
+    assert any(stack.endswith('test_profiling:busy_leaf') for stack in counts)
+
+
+def test_no_token_installs_nothing(tmp_path):
+    app = Flask(__name__)
+    assert init_profiling(app, token='') is None
+    assert app.before_request_funcs == {} and 'profiling' not in app.extensions
+
+
+def test_sampled_request_writes_collapsed_file(tmp_path):
+    client, gate = make_app(tmp_path)
+    plain = client.get('/api/kpi/slow')
+    assert 'X-Profile' not in plain.headers and plain.get_json() == {'ok': True}
+    assert client.get('/api/kpi/slow', headers={'X-Profile': 'wrong'}).headers.get('X-Profile') is None
+
+    response = client.get('/api/kpi/slow', headers={'X-Profile': TOKEN})
+    assert response.get_json() == {'ok': True}
+    assert response.headers['X-Profile'] == 'sample'
+    name = response.headers['X-Profile-File']
+    assert name.endswith('slow.collapsed') and int(response.headers['X-Profile-Samples']) > 0
+    lines = (tmp_path / name).read_text().splitlines()
+    assert any('test_profiling:busy_leaf' in line for line in lines)
+    stack, count = lines[0].rsplit(' ', 1)
+    assert int(count) > 0 and ';' in stack
+    assert gate.stats()['profiles'] == 1
+
+
+def test_inline_cprofile_output(tmp_path):
+    client, _ = make_app(tmp_path)
+    response = client.get(f'/api/kpi/slow?profile={TOKEN}&profile_mode=cprofile&profile_output=inline')
+    assert response.headers['X-Profile'] == 'cprofile'
+    assert response.mimetype == 'text/plain' and 'busy_leaf' in response.get_data(as_text=True)
+    assert (tmp_path / response.headers['X-Profile-File']).exists()
+
+
+def test_rate_limit(tmp_path):
+    client, gate = make_app(tmp_path, min_interval=3600)
+    assert client.get('/api/kpi/slow', headers={'X-Profile': TOKEN}).headers['X-Profile'] == 'sample'
+    limited = client.get('/api/kpi/slow', headers={'X-Profile': TOKEN})
+    assert limited.headers['X-Profile'] == 'rate-limited' and limited.get_json() == {'ok': True}
+    assert gate.stats()['rate_limited'] == 1
+
+    busy = ProfileGate(min_interval=0)
+    assert busy.try_acquire()
+    assert not busy.try_acquire()  # one profile at a time
+    busy.release()
+    assert busy.try_acquire()
@@ -0,0 +1,103 @@
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.db import db
+from model.ecomarche_db import Produit, Promotion, PromotionArchive
+from model.promotion_scheduler import PromotionScheduler, run_promotion_lifecycle
+
+TODAY = date(2025, 3, 10)
+
+
+def add_product(nom='Pain'):
+    produit = Produit(nom=nom, categorie_id=2, stock=10, prix_unitaire=2.0, date_peremption=TODAY + timedelta(days=3))
+    db.session.add(produit)
+    db.session.commit()
+    return produit
+
+
+def add_promotion(produit, percent, start=None, end=None, active=True, created=None):
+    prom = Promotion(produit_id=produit.id, discount_percent=percent, start_date=start, end_date=end,
+                     active=active, created_at=created or datetime(2025, 3, 1))
+    db.session.add(prom)
+    db.session.commit()
+    return prom
+
+
+def test_scheduled_promotion_is_activated(db_app):
+    produit = add_product()
+    prom = add_promotion(produit, 25, start=TODAY, end=TODAY + timedelta(days=2), active=False)
+    later = add_promotion(produit, 10, start=TODAY + timedelta(days=1), active=False)
+
+    result = run_promotion_lifecycle(TODAY)
+    assert result['activated'] == 1
+    assert db.session.get(Promotion, prom.id).active is True
+    assert db.session.get(Promotion, later.id).active is False
+    assert db.session.get(Produit, produit.id).promotion_id == prom.id
+
+
+def test_expired_and_superseded_promotions_are_archived(db_app):
+    produit, other = add_product(), add_product('Lait')
+    old = add_promotion(produit, 10, created=datetime(2025, 3, 1))
+    current = add_promotion(produit, 30, created=datetime(2025, 3, 5))
+    expired = add_promotion(other, 20, end=TODAY - timedelta(days=1))
+    other.promotion_id = expired.id
+    db.session.commit()
+    old_id, current_id, expired_id = old.id, current.id, expired.id
+
+    result = run_promotion_lifecycle(TODAY)
+    assert result['superseded_products'] == 1 and result['expired_products'] == 1
+    assert [p.id for p in Promotion.query.all()] == [current_id]
+    reasons = {a.id: a.reason for a in PromotionArchive.query.all()}
+    assert reasons == {old_id: 'superseded', expired_id: 'expired'}
+    assert db.session.get(Produit, produit.id).promotion_id == current_id
+    assert db.session.get(Produit, other.id).get_active_promotion() is None
+
+    # idempotent
+    assert run_promotion_lifecycle(TODAY)['products_refreshed'] == 0
+
+
+def test_scheduled_promotion_supersedes_later_created_immediate_one(db_app):
+    produit = add_product()
+    scheduled = add_promotion(produit, 40, start=TODAY, active=False, created=datetime(2025, 3, 1))
+    immediate = add_promotion(produit, 15, created=datetime(2025, 3, 5))
+    scheduled_id, immediate_id = scheduled.id, immediate.id
+
+    result = run_promotion_lifecycle(TODAY)
+    assert result['activated'] == 1 and result['superseded_products'] == 1
+    assert [p.id for p in Promotion.query.all()] == [scheduled_id]
+    assert db.session.get(PromotionArchive, immediate_id).reason == 'superseded'
+    assert db.session.get(Produit, produit.id).promotion_id == scheduled_id
+
+
+def test_supersede_previous_and_deactivate(db_app):
+    produit = add_product()
+    first = add_promotion(produit, 10)
+    second = add_promotion(produit, 20, created=datetime(2025, 3, 2))
+    first_id, second_id = first.id, second.id
+    second.supersede_previous()
+    produit.set_active_promotion(second)
+    db.session.commit()
+    assert db.session.get(PromotionArchive, first_id).reason == 'superseded'
+
+    second.deactivate()
+    db.session.commit()
+    assert Promotion.query.count() == 0
+    assert db.session.get(PromotionArchive, second_id).reason == 'deactivated'
+    assert db.session.get(Produit, produit.id).promotion_id is None
+
+
+def test_scheduler_run_once_records_stats(db_app):
+    scheduler = PromotionScheduler(db_app, interval_seconds=60)
+    assert scheduler.run_once(TODAY) is not None
+    stats = scheduler.stats()
+    assert stats['runs'] == 1 and stats['failures'] == 0 and stats['running'] is False
+    assert stats['passes'] == 1 and stats['last_pass_at'] is not None
+
+    # forked gunicorn worker: the thread runs in the master (our parent), seen through its passes
+    scheduler._pid = os.getppid()
+    assert scheduler.stats()['running'] is True
@@ -0,0 +1,80 @@
+import os
+import sys
+from datetime import date
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import event
+
+from config.db import db
+from model.ecomarche_db import Produit, Promotion, check_promotion_consistency
+
+
+def add_product():
+    produit = Produit(nom='Yaourt', categorie_id=1, stock=10, prix_unitaire=1.0, date_peremption=date(2025, 1, 10))
+    db.session.add(produit)
+    db.session.commit()
+    return produit
+
+
+def add_promotion(produit, percent):
+    prom = Promotion(produit_id=produit.id, discount_percent=percent, active=True)
+    db.session.add(prom)
+    db.session.flush()
+    produit.set_active_promotion(prom)
+    db.session.commit()
+    return prom
+
+
+def test_to_dict_reads_promotion_without_query(db_app):
+    produit = add_product()
+    prom = add_promotion(produit, 20)
+    db.session.expire_all()
+    produits = Produit.query.all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        payload = [p.to_dict() for p in produits]
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements == []
+    assert payload[0]['promotion']['id'] == prom.id
+    assert payload[0]['promotion']['discount_percent'] == 20
+
+
+def test_deactivate_falls_back_to_previous_promotion(db_app):
+    produit = add_product()
+    first = add_promotion(produit, 10)
+    second = add_promotion(produit, 30)
+    assert produit.promotion_id == second.id
+
+    second.deactivate()
+    db.session.commit()
+    assert produit.promotion_id == first.id
+    assert produit.promotion_discount_percent == 10
+
+    first.deactivate()
+    db.session.commit()
+    assert produit.get_active_promotion() is None
+
+
+def test_consistency_check_repairs_drift(db_app):
+    produit = add_product()
+    prom = add_promotion(produit, 15)
+    other = add_product()
+    other.promotion_id, other.promotion_discount_percent = 999, 50.0
+    produit.set_active_promotion(None)
+    db.session.commit()
+
+    drift = check_promotion_consistency(repair=False)
+    assert {d['produit_id'] for d in drift} == {produit.id, other.id}
+    assert produit.promotion_id is None
+
+    check_promotion_consistency(repair=True)
+    assert produit.promotion_id == prom.id
+    assert other.promotion_id is None
+    assert check_promotion_consistency(repair=False) == []
@@ -0,0 +1,87 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import inspect, select, text
+
+from config.db import db
+from model.ecomarche_db import Produit, Promotion, superseded_promotions
+
+TODAY = date(2025, 1, 1)
+
+
+def hot_queries():
+    """Requêtes chaudes de l'application, telles que générées par l'ORM."""
+    horizon = TODAY + timedelta(days=7)
+    return {
+        'promotion_active': select(Promotion).filter_by(produit_id=1, active=True)
+                                             .order_by(Promotion.created_at.desc(), Promotion.id.desc()).limit(1),
+        'produit_par_id': select(Produit).filter_by(id=1),
+        'produits_par_ids': select(Produit).where(Produit.id.in_([1, 2, 3])).order_by(Produit.id),
+        'produits_a_risque': select(Produit).where(Produit.date_peremption <= horizon)
+                                            .order_by(Produit.date_peremption),
+        'produits_categorie_a_risque': select(Produit).where(Produit.categorie_id == 1,
+                                                             Produit.date_peremption <= horizon)
+                                                      .order_by(Produit.date_peremption),
+        'produits_fournisseur': select(Produit).where(Produit.fournisseur == 'Ferme Duval'),
+        'promotions_a_activer': select(Promotion).where(Promotion.active.is_(False), Promotion.start_date <= TODAY),
+        'promotions_expirees': select(Promotion).where(Promotion.end_date < TODAY),
+        'promotions_remplacees': select(Promotion.id).where(superseded_promotions()),
+    }
+
+
+def explain(query):
+    compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')).fetchall()
+    return [row[-1] for row in rows]
+
+
+def seed():
+    db.session.add_all([
+        Produit(nom=f'Produit {i}', categorie_id=i % 10 + 1, stock=i % 40, prix_unitaire=1.0 + i % 7,
+                fournisseur=f'Fournisseur {i % 25}', date_peremption=TODAY + timedelta(days=i % 90))
+        for i in range(500)
+    ])
+    db.session.add_all([
+        Promotion(produit_id=i % 500 + 1, discount_percent=10, active=i % 3 == 0,
+                  start_date=TODAY + timedelta(days=i % 30 - 10), end_date=TODAY + timedelta(days=i % 60 - 5))
+        for i in range(1500)
+    ])
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+
+
+@pytest.mark.parametrize('name', sorted(hot_queries()))
+def test_hot_query_uses_index(db_app, name):
+    seed()
+    plan = explain(hot_queries()[name])
+    for step in plan:
+        assert not (step.startswith('SCAN') and 'INDEX' not in step), f'{name}: full scan ({plan})'
+        assert 'USE TEMP B-TREE' not in step, f'{name}: temporary sort ({plan})'
+
+
+def test_migrations_match_models(tmp_path):
+    from flask import Flask
+    from flask_migrate import Migrate, upgrade
+    from config.db import init_db
+
+    app = Flask(__name__)
+    init_db(app, f"sqlite:///{tmp_path / 'migrated.db'}")
+    Migrate(app, db, directory=os.path.join(ROOT, 'migrations'))
+    with app.app_context():
+        upgrade()
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            expected = {ix.name for ix in table.indexes}
+            actual = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            assert expected <= actual, f'{table.name}: missing {expected - actual}'
+            columns = {c['name'] for c in inspector.get_columns(table.name)}
+            assert set(table.columns.keys()) <= columns, f'{table.name}: missing columns'
+        assert 'ix_promotions_produit_id' not in {ix['name'] for ix in inspector.get_indexes('promotions')}
+        db.engine.dispose()
@@ -0,0 +1,131 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from helpers.sales import (
+    DASHBOARD_SALES_PANELS, PandasSalesStore, SqlSalesStore, compact_sales_frame, dashboard_sales_payload,
+    load_sales_table
+)
+
+
+def make_sales(days=500, n_products=12, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2023-01-01', periods=days, freq='D')
+    rows = []
+    for p in range(n_products):
+        present = dates[rng.random(days) < 0.7]
+        rows.append(pd.DataFrame({
+            'Date': present,
+            'Product_ID': f'P{p:03d}',
+            'Product_Name': f'Produit {p}',
+            'Category': f'Categorie {p % 7}',
+            'Daily_Sales': rng.integers(0, 40, len(present)) + rng.random(len(present)),
+            'Unit_Price': np.round(rng.uniform(0.5, 12.0, len(present)), 2),
+        }))
+    df = pd.concat(rows, ignore_index=True)
+    df.loc[rng.random(len(df)) < 0.05, 'Unit_Price'] = np.nan
+    return df
+
+
+def plain_frame(frame):
+    frame = frame.reset_index(drop=True)
+    for column in frame.columns:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].astype(object)
+    return frame
+
+
+def assert_frames_equal(left, right):
+    assert isinstance(left, pd.DataFrame) and isinstance(right, pd.DataFrame)
+    pd.testing.assert_frame_equal(plain_frame(left), plain_frame(right), check_dtype=False, rtol=1e-9)
+
+
+@pytest.fixture
+def stores(db_app):
+    df = make_sales()
+    assert load_sales_table(df.copy(), chunksize=1000) == len(df)
+    return PandasSalesStore(df), SqlSalesStore()
+
+
+def test_scalar_aggregates_match(stores):
+    mem, sql = stores
+    assert sql.row_count() == mem.row_count()
+    for name in ('total_sales', 'total_revenue', 'avg_daily_sales', 'median_unit_price'):
+        assert getattr(sql, name)() == pytest.approx(getattr(mem, name)(), rel=1e-9), name
+
+
+def test_grouped_aggregates_match(stores):
+    mem, sql = stores
+    assert_frames_equal(mem.daily_totals(last=90), sql.daily_totals(last=90))
+    assert_frames_equal(mem.top_products(10), sql.top_products(10))
+    assert_frames_equal(mem.top_categories(5), sql.top_categories(5))
+    assert_frames_equal(mem.monthly_totals(last=12), sql.monthly_totals(last=12))
+    assert_frames_equal(mem.month_totals(), sql.month_totals())
+    cats = mem.top_categories(5)['Category'].tolist()
+    assert_frames_equal(mem.category_month_totals(cats), sql.category_month_totals(cats))
+    mem_season, sql_season = mem.season_top_products(5), sql.season_top_products(5)
+    for season in mem_season:
+        assert_frames_equal(mem_season[season], sql_season[season])
+    mem_avg, sql_avg = mem.product_daily_avg(), sql.product_daily_avg()
+    assert mem_avg.keys() == sql_avg.keys()
+    assert all(sql_avg[k] == pytest.approx(v) for k, v in mem_avg.items())
+
+
+def test_compact_frame_gives_same_records():
+    plain = PandasSalesStore(make_sales())
+    compact = PandasSalesStore(compact_sales_frame(make_sales()))
+    assert isinstance(compact.df['Product_Name'].dtype, pd.CategoricalDtype)
+    assert_frames_equal(plain.top_products(10), compact.top_products(10))
+    assert_frames_equal(plain.top_categories(5), compact.top_categories(5))
+    cats = plain.top_categories(3)['Category'].tolist()
+    assert_frames_equal(plain.category_month_totals(cats), compact.category_month_totals(cats))
+    plain_season, compact_season = plain.season_top_products(5), compact.season_top_products(5)
+    for season in plain_season:
+        assert_frames_equal(plain_season[season], compact_season[season])
+    assert plain.product_daily_avg() == pytest.approx(compact.product_daily_avg())
+
+
+def assert_payloads_equal(left, right):
+    if isinstance(left, dict):
+        assert left.keys() == right.keys()
+        for key in left:
+            assert_payloads_equal(left[key], right[key])
+    elif isinstance(left, pd.DataFrame):
+        assert_frames_equal(left, right)
+    elif isinstance(left, list):
+        assert len(left) == len(right)
+        for a, b in zip(left, right):
+            assert_payloads_equal(a, b)
+    elif isinstance(left, float):
+        assert right == pytest.approx(left, rel=1e-9)
+    else:
+        assert left == right
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_rollup_gives_endpoint_payloads(compact):
+    df = make_sales()
+    store = PandasSalesStore(compact_sales_frame(df) if compact else df)
+    rollup = store.rollup()
+    snapshot = dashboard_sales_payload(rollup)
+    assert snapshot.keys() == DASHBOARD_SALES_PANELS.keys()
+    for name, build in DASHBOARD_SALES_PANELS.items():
+        assert_payloads_equal(build(store), snapshot[name])
+    assert rollup.median_unit_price() == store.median_unit_price()
+    assert rollup.product_daily_avg() == pytest.approx(store.product_daily_avg())
+
+
+def test_sql_rollup_matches(stores):
+    mem, sql = stores
+    rollup = sql.rollup()
+    assert rollup.total_revenue() == pytest.approx(mem.total_revenue(), rel=1e-9)
+    for name, build in DASHBOARD_SALES_PANELS.items():
+        assert_payloads_equal(build(mem), build(rollup))
+    assert rollup.product_daily_avg() == pytest.approx(mem.product_daily_avg())
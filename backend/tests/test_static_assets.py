@@ -0,0 +1,98 @@
+import gzip
+import os
+import sys
+
+import pytest
+from flask import Flask, request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from helpers.static_assets import StaticManifest, is_hashed
+from scripts.compress_frontend import compress_dist
+
+MAIN_JS = b'console.log("ecomarche");\n' * 400
+INDEX = b'<!doctype html><html><body><app-root></app-root><script src="main-5INURTSO.js"></script></body></html>'
+
+
+@pytest.fixture
+def dist(tmp_path):
+    browser = tmp_path / 'browser'
+    (browser / 'media').mkdir(parents=True)
+    (browser / 'index.html').write_bytes(INDEX)
+    (browser / 'main-5INURTSO.js').write_bytes(MAIN_JS)
+    (browser / 'main-5INURTSO.js.br').write_bytes(b'fake-brotli')
+    (browser / 'styles-AB12CD34.css').write_bytes(b'body { color: green; }\n' * 100)
+    (browser / 'favicon.ico').write_bytes(b'\x00' * 64)
+    return tmp_path
+
+
+def client_for(manifest):
+    app = Flask(__name__)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        return manifest.response(path, request)
+
+    return app.test_client()
+
+
+def test_hashed_names():
+    assert is_hashed('main-5INURTSO.js') and is_hashed('chunk-ZX3QH2LM.js') and is_hashed('main.3f2a9c1d0b.js')
+    assert not is_hashed('index.html') and not is_hashed('favicon.ico') and not is_hashed('app.manifest.json')
+
+
+def test_manifest_reads_browser_dir_and_variants(dist):
+    manifest = StaticManifest.build(str(dist))
+    assert manifest.root == str(dist / 'browser')
+    assert manifest.index == 'index.html'
+    assert set(manifest.assets) == {'index.html', 'main-5INURTSO.js', 'styles-AB12CD34.css', 'favicon.ico'}
+    main = manifest.assets['main-5INURTSO.js']
+    assert set(main.variants) == {'identity', 'br', 'gzip'}
+    assert 'gzip' not in manifest.assets['favicon.ico'].variants
+    assert StaticManifest.build(str(dist / 'missing')) is None
+
+
+def test_encoding_negotiation_and_cache_headers(dist):
+    client = client_for(StaticManifest.build(str(dist)))
+
+    br = client.get('/main-5INURTSO.js', headers={'Accept-Encoding': 'gzip, br'})
+    assert br.headers['Content-Encoding'] == 'br' and br.data == b'fake-brotli'
+    assert br.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert 'Accept-Encoding' in br.headers['Vary']
+
+    gz = client.get('/main-5INURTSO.js', headers={'Accept-Encoding': 'gzip'})
+    assert gz.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(gz.data) == MAIN_JS
+    assert gz.headers['ETag'] != br.headers['ETag']
+
+    plain = client.get('/main-5INURTSO.js', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers and plain.data == MAIN_JS
+    assert plain.headers['Content-Type'].startswith(('text/javascript', 'application/javascript'))
+
+    assert client.get('/favicon.ico').headers['Cache-Control'] == 'public, max-age=3600'
+
+
+def test_index_etag_and_spa_fallback(dist):
+    client = client_for(StaticManifest.build(str(dist)))
+    index = client.get('/')
+    assert index.status_code == 200 and index.data == INDEX
+    assert index.headers['Cache-Control'] == 'no-cache'
+    etag = index.headers['ETag']
+
+    revalidated = client.get('/', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304 and revalidated.data == b''
+
+    route = client.get('/produits/12')
+    assert route.data == INDEX and route.headers['ETag'] == etag
+
+
+def test_precompression_script(dist):
+    totals = compress_dist(str(dist / 'browser'), use_brotli=False)
+    assert totals['files'] == 2  # main js + css; index.html and favicon are too small / not text
+    assert os.path.exists(dist / 'browser' / 'styles-AB12CD34.css.gz')
+    manifest = StaticManifest.build(str(dist))
+    assert 'styles-AB12CD34.css.gz' not in manifest.assets
+    assert gzip.decompress(manifest.assets['styles-AB12CD34.css'].variants['gzip'][0]).startswith(b'body')
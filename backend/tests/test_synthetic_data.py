@@ -0,0 +1,78 @@
+import os
+import sys
+from datetime import date
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.constant import CATEGORIES
+from helpers.sales import PandasSalesStore, load_sales_table, read_sales_file
+from helpers.synthetic_data import CATALOG, generate_products, generate_sales, load_products, write_sales
+
+TODAY = date(2024, 6, 1)
+
+
+def test_products_are_deterministic_and_realistic():
+    products = generate_products(3000, seed=4, today=TODAY)
+    assert products.equals(generate_products(3000, seed=4, today=TODAY))
+    assert len(products) == 3000 and products['nom'].is_unique
+    assert set(products['categorie_id']) == set(CATALOG)
+    assert (products['prix_unitaire'] > 0).all() and (products['stock'] >= 0).all()
+    days_left = pd.Series([(d - TODAY).days for d in products['date_peremption']])
+    assert (days_left < 0).any()  # some stock already expired
+    # short shelf life for bread and fish, months for groceries
+    by_category = days_left.groupby(products['categorie_id']).max()
+    assert by_category[2] <= CATALOG[2][3] and by_category[7] > 60
+
+
+def test_sales_history_matches_catalog():
+    products = generate_products(50, seed=1, today=TODAY)
+    sales = generate_sales(products, rows=50 * 730 + 7, start=date(2022, 1, 1), seed=1)
+    assert len(sales) == 50 * 730 + 7
+    assert list(sales.columns) == ['Date', 'Product_ID', 'Product_Name', 'Category', 'Daily_Sales', 'Unit_Price']
+    assert set(sales['Product_Name']) == set(products['nom'])
+    assert not sales.duplicated(['Date', 'Product_ID']).any()
+    assert set(sales['Category']) <= set(CATEGORIES.values())
+    assert (sales['Daily_Sales'] >= 0).all()
+
+    # summer peak for drinks, weekend boost overall
+    store = PandasSalesStore(sales)
+    drinks = sales[sales['Category'] == CATEGORIES[8]]
+    monthly = drinks.groupby(drinks['Date'].dt.month)['Daily_Sales'].mean()
+    assert monthly[7] > monthly[1]
+    weekend = sales['Date'].dt.dayofweek >= 5
+    assert sales.loc[weekend, 'Daily_Sales'].mean() > sales.loc[~weekend, 'Daily_Sales'].mean()
+    assert store.top_products(3)['Product_Name'].iloc[0] in set(products['nom'])
+
+
+def test_csv_round_trip(tmp_path):
+    sales = generate_sales(generate_products(20, seed=2, today=TODAY), rows=400, seed=2)
+    path = write_sales(sales, str(tmp_path / 'sales.csv'))
+    loaded = read_sales_file(path)
+    assert len(loaded) == 400 and loaded['Date'].dtype.kind == 'M'
+    assert loaded['Daily_Sales'].sum() == pytest.approx(sales['Daily_Sales'].sum())
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    sales = generate_sales(generate_products(20, seed=2, today=TODAY), rows=400, seed=2)
+    loaded = read_sales_file(write_sales(sales, str(tmp_path / 'sales.parquet')))
+    assert len(loaded) == 400 and loaded['Daily_Sales'].sum() == pytest.approx(sales['Daily_Sales'].sum())
+
+
+def test_bulk_load(db_app):
+    from model.ecomarche_db import Produit, Vente
+    products = generate_products(300, seed=3, today=TODAY)
+    assert load_products(products) == 300
+    assert load_products(products.head(10), replace=True) == 10
+    assert Produit.query.count() == 10
+    first = Produit.query.order_by(Produit.id).first()
+    assert first.nom == products['nom'][0] and first.date_peremption == products['date_peremption'][0]
+
+    sales = generate_sales(products.head(10), rows=200, seed=3)
+    assert load_sales_table(sales) == 200
+    assert Vente.query.count() == 200
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from ml.train_waste_model import build_features_and_label, cached_stage, cross_validate_and_save
+from model.feature_store import FEATURE_COLUMNS
+
+
+def make_sales(n_products=30, days=20, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-01-01', periods=days, freq='D')
+    rows = []
+    for p in range(n_products):
+        # a third of the products barely sell: positive proxy labels
+        rate = 0.2 if p % 3 == 0 else 5.0
+        rows.append(pd.DataFrame({
+            'Date': dates,
+            'Product_Name': f'Produit {p}',
+            'Daily_Sales': rng.poisson(rate, days),
+            'Unit_Price': 1.0 + p % 5,
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def test_cached_stage_skips_compute_on_hit(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'rows': 3}
+
+    assert cached_stage(str(tmp_path), 'load', 'abc', compute) == {'rows': 3}
+    assert cached_stage(str(tmp_path), 'load', 'abc', compute) == {'rows': 3}
+    assert len(calls) == 1
+    # another input key (dataset hash) misses
+    cached_stage(str(tmp_path), 'load', 'def', compute)
+    assert len(calls) == 2
+    assert cached_stage(None, 'load', 'abc', compute) and len(calls) == 3
+
+
+def test_cross_validation_report(tmp_path):
+    X, y, names = build_features_and_label(make_sales())
+    assert list(X.columns) == FEATURE_COLUMNS and set(y) == {0, 1}
+    grid = {'n_estimators': [5, 10], 'max_depth': [None, 3]}
+    model_path = str(tmp_path / 'model.joblib')
+    search = cross_validate_and_save(X, y, folds=3, jobs=1, param_grid=grid, model_path=model_path)
+    assert set(search.best_params_) == set(grid)
+    assert {'params', 'mean_test_score', 'std_test_score', 'rank_test_score'} <= set(search.cv_results_)
+    assert len(search.cv_results_['params']) == 4 and search.n_splits_ == 3
+    assert os.path.exists(model_path)
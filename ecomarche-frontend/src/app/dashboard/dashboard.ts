@@ -74,10 +74,35 @@ export class DashboardComponent implements OnInit {
   constructor(private apiService: ApiService) {}
 
   ngOnInit(): void {
-    this.loadProduits();
-    this.loadSalesData();
-    this.loadKpis();
-    this.loadWasteRecommendations();
+    this.loadDashboard();
+  }
+
+  // One request for every panel; falls back to the individual endpoints if the snapshot fails
+  loadDashboard(): void {
+    this.apiService.getDashboardSnapshot().subscribe({
+      next: (snap) => {
+        this.setProduits(snap.produits);
+        this.recommendations = Array.isArray(snap.waste_recommendations) ? snap.waste_recommendations : [];
+        this.salesDaily = snap.summary && Array.isArray(snap.summary.daily) ? snap.summary.daily : [];
+        this.topProducts = snap.top_products && Array.isArray(snap.top_products.top_products) ? snap.top_products.top_products : [];
+        this.kpiOverview = snap.kpi_overview;
+        this.seasonality = snap.seasonality;
+        this.popularBySeason = snap.popular_by_season;
+        this.salesByAge = snap.by_age_groups;
+        setTimeout(() => {
+          this.renderSalesChart();
+          this.renderTopProductsChart();
+          if (this.seasonality) this.renderSeasonalityChart();
+        }, 200);
+      },
+      error: (err) => {
+        console.error('Erreur chargement snapshot dashboard', err);
+        this.loadProduits();
+        this.loadSalesData();
+        this.loadKpis();
+        this.loadWasteRecommendations();
+      }
+    });
   }
 
   loadWasteRecommendations(): void {
@@ -218,25 +243,7 @@ export class DashboardComponent implements OnInit {
 
   loadProduits(): void {
     this.apiService.getProduits().subscribe({
-      next: (data) => {
-        // Ensure we always have an array (backend may wrap the response)
-        this.produits = Array.isArray(data) ? data : (data && Array.isArray((data as any).produits) ? (data as any).produits : []);
-        // Use backend as source-of-truth: remove any client-side price overrides and clear createdProduits
-        try {
-          this.produits = this.produits.map(p => {
-            // remove transient 'prix_affiche' if present so UI reads prix_unitaire from backend
-            if ((p as any).hasOwnProperty('prix_affiche')) delete (p as any).prix_affiche;
-            return p;
-          });
-          // clear any client-created products cached in sessionStorage to avoid stale duplicates overriding backend
-          sessionStorage.removeItem('createdProduits');
-        } catch(e) {
-          // ignore session storage errors
-        }
-        this.calculateExpiryDays();
-        this.computeWasteStats();
-        setTimeout(() => this.renderWasteChart(), 200);
-      },
+      next: (data) => this.setProduits(data),
       error: (error) => {
         console.error('Erreur lors du chargement des produits', error);
         // Données de test en cas d'erreur
@@ -246,6 +253,26 @@ export class DashboardComponent implements OnInit {
     });
   }
 
+  setProduits(data: any): void {
+    // Ensure we always have an array (backend may wrap the response)
+    this.produits = Array.isArray(data) ? data : (data && Array.isArray((data as any).produits) ? (data as any).produits : []);
+    // Use backend as source-of-truth: remove any client-side price overrides and clear createdProduits
+    try {
+      this.produits = this.produits.map(p => {
+        // remove transient 'prix_affiche' if present so UI reads prix_unitaire from backend
+        if ((p as any).hasOwnProperty('prix_affiche')) delete (p as any).prix_affiche;
+        return p;
+      });
+      // clear any client-created products cached in sessionStorage to avoid stale duplicates overriding backend
+      sessionStorage.removeItem('createdProduits');
+    } catch(e) {
+      // ignore session storage errors
+    }
+    this.calculateExpiryDays();
+    this.computeWasteStats();
+    setTimeout(() => this.renderWasteChart(), 200);
+  }
+
   calculateExpiryDays(): void {
     const today = new Date();
 
@@ -67,6 +67,12 @@ export class ApiService {
     );
   }
 
+  // Delta sync: products / promotions written since `since` and ids deleted since then
+  // (apply `deleted` first); pass the returned `version` to the next call. since=0: full snapshot.
+  getProduitChanges(since: number): Observable<any> {
+    return this.http.get<any>(`${this.apiUrl}/api/produits/changes`, { params: { since: String(since) } });
+  }
+
   getProduit(id: number): Observable<Produit> {
     return this.http.get<Produit>(`${this.apiUrl}/api/produits/${id}`);
   }
@@ -97,6 +103,12 @@ export class ApiService {
     return this.http.post<any>(`${this.apiUrl}/api/produits/pricing`, request);
   }
 
+  // Every dashboard panel in one request (produits, sales panels, KPIs, recommendations).
+  // Sales panels are null when the sales dataset is not available on the backend.
+  getDashboardSnapshot(): Observable<any> {
+    return this.http.get<any>(`${this.apiUrl}/api/dashboard/snapshot`);
+  }
+
   // Sales visualization endpoints
   getSalesSummary(): Observable<any[]> {
     return this.http.get<any>(`${this.apiUrl}/api/sales/summary`).pipe(